@@ -72,8 +72,9 @@ while True:
     save_rec = False
     game.reset(save_recording=save_rec)
     done = False
-    actions = [[0, 0, 0], [0, 0, 0]]
+    # Game.step takes one action per player, the other players stand still
+    actions = [[0, 0, 0] for _ in players]
     while not done:
         actions[0] = action_handle(actions[0], input_player_1)
-        actions[1] = action_handle(actions[1], input_player_2)
+        actions[team_size] = action_handle(actions[team_size], input_player_2)
         done = game.step(actions)
@@ -0,0 +1,115 @@
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+pytest.importorskip("gymnasium")
+
+from gymnasium.utils.env_checker import check_env
+
+from ursinaxball.common_values import GameState, TeamID
+from ursinaxball.env import (
+    HaxballAsyncVectorEnv,
+    HaxballEnv,
+    HaxballVectorEnv,
+    WinReward,
+    async_vector_env,
+)
+
+
+def test_env_matches_vector_env():
+    """Test that the environment and a vector environment of one agent match."""
+    env = HaxballEnv(time_limit=1, score_limit=1)
+    check_env(env, skip_render_check=True)
+    vector_env = HaxballVectorEnv(2, agents=[0], time_limit=1, score_limit=1)
+    observation, _ = env.reset(seed=0)
+    observations, _ = vector_env.reset(seed=0)
+    assert observations.shape == (2, *env.observation_space.shape)
+    assert np.array_equal(observations[0], observation)
+
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        action = rng.integers(0, [3, 3, 2])
+        observation, *_ = env.step(action)
+        observations, *_ = vector_env.step(np.stack([action, action]))
+        assert np.array_equal(observations[1], observation)
+    env.close()
+    vector_env.close()
+
+
+def test_env_reset_releases_kicks():
+    """Test that a kick held at the end of an episode is not kept by the reset."""
+    env = HaxballEnv(time_limit=1, score_limit=1)
+    env.reset(seed=0)
+    env.step(np.array([1, 1, 1]))
+    assert env.game.players[0].is_kicking()
+
+    env.reset()
+    assert not any(player.is_kicking() for player in env.game.players)
+    env.close()
+
+
+def test_vector_env_autoreset():
+    """Test that finished games are reset within the step with their outcome."""
+    vector_env = HaxballVectorEnv(2, reward=WinReward(), time_limit=1, score_limit=1)
+    initial_observations, _ = vector_env.reset(seed=0)
+    game = vector_env.vector_game.games[1]
+    game.score.red = 1
+    game.state = GameState.END
+    game.score.animation_timeout = 1
+
+    observations, rewards, terminations, _, infos = vector_env.step(
+        np.ones((4, 3), dtype=int)
+    )
+    assert terminations.tolist() == [False, False, True, True]
+    assert rewards.tolist() == [0, 0, 1, -1]
+    assert np.all(infos["winner"][2:] == TeamID.RED)
+    assert np.array_equal(observations[2:], initial_observations[2:])
+    assert not np.array_equal(infos["final_obs"][2:], initial_observations[2:])
+    vector_env.close()
+
+
+def test_async_vector_env_matches():
+    """Test that the workers of the async environment follow the local one."""
+    vector_env = HaxballVectorEnv(2, time_limit=1, score_limit=1)
+    async_env = HaxballAsyncVectorEnv(2, time_limit=1, score_limit=1)
+    try:
+        observations, _ = vector_env.reset(seed=0)
+        assert np.array_equal(async_env.reset(seed=0)[0], observations)
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            actions = rng.integers(0, [3, 3, 2], size=(4, 3))
+            async_env.step_async(actions)
+            observations, rewards, *_ = vector_env.step(actions)
+            async_observations, async_rewards, *_ = async_env.step_wait()
+            assert np.array_equal(async_observations, observations)
+            assert np.array_equal(async_rewards, rewards)
+    finally:
+        vector_env.close()
+        async_env.close()
+
+
+class FailingVectorEnv(HaxballVectorEnv):
+    def __init__(self, copy=True, **kwargs):
+        # The workers build their environment with copy=False
+        if not copy:
+            raise ValueError("failed to build the environment")
+        super().__init__(copy=copy, **kwargs)
+
+
+def test_async_vector_env_worker_failure(monkeypatch):
+    """Test that a worker failing to start releases the other workers."""
+    memories = []
+
+    def shared_memory(**kwargs):
+        memories.append(SharedMemory(**kwargs))
+        return memories[-1]
+
+    monkeypatch.setattr(async_vector_env, "HaxballVectorEnv", FailingVectorEnv)
+    monkeypatch.setattr(async_vector_env, "SharedMemory", shared_memory)
+    with pytest.raises(RuntimeError, match="failed to build the environment"):
+        HaxballAsyncVectorEnv(2, start_method="fork")
+    assert not mp.active_children()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=memories[0].name)
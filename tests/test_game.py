@@ -1,8 +1,18 @@
-from ursinaxball.common_values import TeamID
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from ursinaxball.common_values import GameState, PhysicsBackend, TeamID
 from ursinaxball.game import Game, GameScore
-from ursinaxball.modules import PlayerHandler
+from ursinaxball.modules import ObservationBuilder, PlayerHandler
 from ursinaxball.modules.bots import ConstantActionBot
 from ursinaxball.modules.systems.game_config import GameConfig
+from ursinaxball.modules.systems.game_recorder import (
+    input_translate_js_batch,
+    input_translate_py,
+)
 
 
 def test_game():
@@ -32,3 +42,224 @@ def test_game():
         done = game.step([actions_player_1, actions_player_2])
 
     assert game.score.ticks == 176
+
+
+def make_game(physics_backend: PhysicsBackend) -> Game:
+    game = Game(
+        enable_renderer=False, enable_recorder=False, physics_backend=physics_backend
+    )
+    game.score = GameScore(time_limit=1, score_limit=1)
+    game.add_players(
+        [PlayerHandler("P0", TeamID.RED), PlayerHandler("P1", TeamID.BLUE)]
+    )
+    game.start()
+    return game
+
+
+@pytest.mark.parametrize(
+    "physics_backend", [PhysicsBackend.NUMPY, PhysicsBackend.SCALAR]
+)
+def test_goal_credited(physics_backend):
+    """Test that a goal is detected from the positions saved before the tick."""
+    for team, score in ((TeamID.RED, (0, 1)), (TeamID.BLUE, (1, 0))):
+        game = make_game(physics_backend)
+        stadium = game.stadium_game
+        goal_x = stadium.goal_points[stadium.goal_teams == team][0, 0, 0]
+        start = np.array([goal_x - 3 * np.sign(goal_x), 0.0])
+        game.state = GameState.PLAYING
+        stadium.discs[0].position = start
+        stadium.discs[0].velocity = np.array([6 * np.sign(goal_x), 0.0])
+
+        assert not game.step([[0, 0, 0], [0, 0, 0]])
+        assert np.array_equal(game.previous_score_positions[0], start)
+        assert game.state == GameState.GOAL
+        assert (game.score.red, game.score.blue) == score
+
+
+def test_compiled_tick_matches():
+    """Test that the fused tick follows the Python backends up to rounding."""
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(0)
+    actions = rng.integers(-1, 2, size=(300, 2, 3))
+    actions[..., 2] = rng.integers(0, 2, size=(300, 2))
+
+    game_python = make_game(PhysicsBackend.SCALAR)
+    game_compiled = make_game(PhysicsBackend.NUMBA)
+    assert game_compiled.compiled_tick is not None
+
+    for tick_actions in actions:
+        assert game_python.step(tick_actions) == game_compiled.step(tick_actions)
+        assert np.allclose(
+            game_python.stadium_game.world.position,
+            game_compiled.stadium_game.world.position,
+            rtol=0,
+            atol=1e-6,
+        )
+    for player_python, player_compiled in zip(
+        game_python.players, game_compiled.players
+    ):
+        assert player_python.kicking == player_compiled.kicking
+        assert (
+            player_python.player_data.number_touch
+            == player_compiled.player_data.number_touch
+        )
+
+
+def test_compiled_tick_fallback(monkeypatch):
+    """Test that the numba backend falls back to Python without Numba."""
+    monkeypatch.setattr("ursinaxball.game.NUMBA_AVAILABLE", False)
+    game = make_game(PhysicsBackend.NUMBA)
+
+    assert game.compiled_tick is None
+    game.step([[1, 0, 1], [-1, 0, 0]])
+
+
+def test_snapshot_restore():
+    """Test that a restored game follows the same path as the original one."""
+    rng = np.random.default_rng(0)
+    actions = rng.integers(-1, 2, size=(400, 2, 3))
+    actions[..., 2] = rng.integers(0, 2, size=(400, 2))
+    # The red player runs into the ball so the kickoff happens after the snapshot
+    actions[:150, 0] = [1, 0, 1]
+
+    game = make_game(PhysicsBackend.NUMPY)
+    for tick_actions in actions[:100]:
+        game.step(tick_actions)
+    snapshot = game.snapshot()
+
+    def play() -> list[np.ndarray]:
+        states = []
+        for tick_actions in actions[100:]:
+            game.step(tick_actions)
+            states.append(game.snapshot())
+        return states
+
+    first_run = play()
+    game.restore(snapshot)
+    assert np.array_equal(game.snapshot(), snapshot)
+    second_run = play()
+
+    assert all(np.array_equal(a, b) for a, b in zip(first_run, second_run))
+    assert game.state == GameState.PLAYING
+    with pytest.raises(ValueError, match="Snapshot must have size"):
+        game.snapshot(np.empty(game.snapshot_size + 1))
+
+
+def test_reset_reuses_stadium():
+    """Test that a reset reuses the stadium and restores the state of a start."""
+    rng = np.random.default_rng(1)
+    actions = rng.integers(-1, 2, size=(300, 2, 3))
+    np.maximum(actions[..., 2], 0, out=actions[..., 2])
+    actions[:150, 0] = [1, 0, 1]
+
+    game = make_game(PhysicsBackend.NUMPY)
+    stadium = game.stadium_game
+    initial_snapshot = game.snapshot()
+    for tick_actions in actions:
+        game.step(tick_actions)
+    game.reset(save_recording=False)
+
+    assert game.stadium_game is stadium
+    assert np.array_equal(game.snapshot(), initial_snapshot)
+
+    game.add_player(PlayerHandler("P2", TeamID.BLUE))
+    game.reset(save_recording=False)
+    assert game.stadium_game is not stadium
+    assert len(game.stadium_game.world.position) == len(stadium.discs) + 1
+
+
+def test_headless_import():
+    """Test that a headless game never imports ursina nor Numba."""
+    code = (
+        "import sys\n"
+        "from ursinaxball import Game\n"
+        "Game(enable_renderer=False, enable_recorder=False).start()\n"
+        "assert 'ursina' not in sys.modules\n"
+        "assert 'numba' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_disc_players():
+    """Test that the discs of a started game map to their players."""
+    game = make_game(PhysicsBackend.NUMPY)
+    discs = game.stadium_game.discs
+
+    assert game.get_disc_player(discs[0]) is None
+    for player, index in zip(game.players, game.player_disc_indices):
+        assert discs[index] is player.disc
+        assert game.get_disc_player(player.disc) is player
+        assert game.get_player_by_id(player.id) is player
+
+
+def test_batched_movement_matches():
+    """Test that the batched movement matches the players resolved one by one."""
+    rng = np.random.default_rng(2)
+    actions = rng.integers(-1, 2, size=(600, 2, 3))
+    actions[..., 2] = rng.integers(0, 2, size=(600, 2))
+    actions[:150, 0] = [1, 0, 1]
+
+    batched_game = make_game(PhysicsBackend.NUMPY)
+    sequential_game = make_game(PhysicsBackend.NUMPY)
+    sequential_game.movement_resolver.sequential = True
+    for tick_actions in actions:
+        batched_game.step(tick_actions)
+        sequential_game.step(tick_actions)
+        assert np.array_equal(batched_game.snapshot(), sequential_game.snapshot())
+
+    touches = [p.player_data.number_touch for p in batched_game.players]
+    assert sum(touches) > 0
+    assert touches == [p.player_data.number_touch for p in sequential_game.players]
+
+
+def test_action_formats():
+    """Test that int8 arrays, packed inputs and lists step a game the same way."""
+    rng = np.random.default_rng(3)
+    actions = rng.integers(-1, 2, size=(300, 2, 3)).astype(np.int8)
+    actions[..., 2] = rng.integers(0, 2, size=(300, 2))
+    actions[:150, 0] = [1, 0, 1]
+    inputs = input_translate_js_batch(actions.reshape(-1, 3)).reshape(300, 2)
+    assert np.array_equal(input_translate_py(inputs), actions)
+
+    games = [make_game(PhysicsBackend.NUMPY) for _ in range(3)]
+    for tick_actions, tick_inputs in zip(actions, inputs):
+        games[0].step(tick_actions)
+        games[1].step(tick_inputs)
+        games[2].step(tick_actions.tolist())
+        snapshot = games[0].snapshot()
+        assert all(np.array_equal(game.snapshot(), snapshot) for game in games[1:])
+    assert games[1].players[1].action == actions[-1, 1].tolist()
+
+    with pytest.raises(ValueError, match="2 players"):
+        games[0].step(actions[0, :1])
+    with pytest.raises(ValueError, match="2 players"):
+        games[2].step(actions[0, :1].tolist())
+    with pytest.raises(ValueError, match="2 players"):
+        games[1].step(inputs[0, :1])
+    with pytest.raises(ValueError, match="Directions"):
+        games[0].step(np.array([[5, 0, 0], [0, 0, 0]], dtype=np.int8))
+    with pytest.raises(ValueError, match="Directions"):
+        games[0].step(np.array([[0, 0, -1], [0, 0, 0]], dtype=np.int8))
+
+
+def test_observation_builder():
+    """Test that the observations are mirrored for the blue players."""
+    game = make_game(PhysicsBackend.NUMPY)
+    builder = ObservationBuilder(game)
+    observations = builder.build(builder.new_buffer())
+    # The kickoff positions are symmetric, so both players see the same thing
+    assert np.array_equal(observations[0], observations[1])
+
+    for _ in range(30):
+        game.step([[1, 1, 0], [0, 0, 1]])
+    builder.build(observations)
+    world = game.stadium_game.world
+    red_index, blue_index = game.player_disc_indices
+    players = observations[:, builder.slices["players"]].reshape(2, 2, 4)
+    assert np.allclose(players[0, 0, :2], world.position[red_index])
+    assert np.allclose(players[1, 0, :2], world.position[blue_index] * [-1, 1])
+    assert np.allclose(players[1, 1, 2:], world.velocity[red_index] * [-1, 1])
+    assert np.array_equal(observations[:, builder.slices["kick"]], [[0, 1], [1, 0]])
+
+    with pytest.raises(ValueError, match="float32"):
+        builder.build(np.zeros((2, builder.size)))
@@ -0,0 +1,59 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from ursinaxball import Game, GamePool
+from ursinaxball.common_values import GameState, TeamID
+from ursinaxball.modules import GameScore, PlayerHandler
+from ursinaxball.modules.systems.game_config import GameConfig
+
+
+def test_game_pool_matches_game():
+    """Test that the games of the pool follow the same path as a local Game."""
+    config = GameConfig(enable_renderer=False, enable_recorder=False)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(-1, 2, size=(100, 2, 2, 3))
+    actions[..., 2] = rng.integers(0, 2, size=(100, 2, 2))
+
+    game = Game(config)
+    game.score = GameScore(time_limit=1, score_limit=1)
+    game.add_players(
+        [PlayerHandler("P0", TeamID.RED), PlayerHandler("P1", TeamID.BLUE)]
+    )
+    game.start()
+
+    with GamePool(2, config, time_limit=1, score_limit=1) as pool:
+        pool.add_player("P0", TeamID.RED)
+        pool.add_player("P1", TeamID.BLUE)
+        pool.start()
+        assert np.array_equal(pool.position[1], game.stadium_game.world.position)
+
+        for tick_actions in actions:
+            pool.step_async(tick_actions)
+            assert game.step(tick_actions[1]) == pool.step_wait()[1]
+            assert np.array_equal(pool.position[1], game.stadium_game.world.position)
+            assert np.array_equal(pool.velocity[1], game.stadium_game.world.velocity)
+        assert pool.ticks[1] == game.score.ticks
+
+        pool.winners[0] = TeamID.RED
+        pool.reset()
+        assert np.all(pool.ticks == 0)
+        assert np.all(pool.state == GameState.KICKOFF)
+        assert np.all(pool.winners == TeamID.SPECTATOR)
+        memory_name = pool.memory.name
+    assert pool.memory is None
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=memory_name)
+
+
+def test_game_pool_unlinks_unclosed_memory():
+    """Test that a pool collected without close unlinks its shared memory."""
+    pool = GamePool(1, enable_renderer=False, enable_recorder=False)
+    pool.add_player("P0", TeamID.RED)
+    pool.start()
+    memory_name = pool.memory.name
+    pool.finalizer()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=memory_name)
+    pool.close()
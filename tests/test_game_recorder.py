@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from ursinaxball.common_values import TeamID
+from ursinaxball.game import Game, GameScore
+from ursinaxball.modules import (
+    GameActionRecorder,
+    GameActionStreamRecorder,
+    GamePositionRecorder,
+    PlayerHandler,
+)
+from ursinaxball.modules.systems import game_recorder, read_position_recording
+
+
+def test_stream_recorder_matches_recorder(tmp_path):
+    """Test that streamed recordings read back like the msgpack recordings."""
+    game = Game(enable_renderer=False, enable_recorder=False)
+    game.score = GameScore(time_limit=1, score_limit=1)
+    game.add_players(
+        [PlayerHandler("P0", TeamID.RED), PlayerHandler("P1", TeamID.BLUE)]
+    )
+    (tmp_path / "stream").mkdir()
+    game.recorder = GameActionStreamRecorder(
+        game, str(tmp_path / "stream"), chunk_ticks=16
+    )
+    recorder = GameActionRecorder(game, str(tmp_path))
+    game.start()
+    recorder.start()
+
+    rng = np.random.default_rng(0)
+    actions = rng.integers(-1, 2, size=(100, 2, 3))
+    actions[..., 2] = rng.integers(0, 2, size=(100, 2))
+    for tick_actions in actions:
+        game.step(tick_actions)
+        recorder.step(tick_actions)
+    game.recorder.stop()
+    recorder.stop()
+
+    stream_recording = GameActionRecorder(game)
+    stream_file = tmp_path / "stream" / game.recorder.filename
+    assert stream_file.read_bytes().startswith(b"HBAR")
+    stream_recording.read_from_file(str(stream_file))
+    recording = GameActionRecorder(game)
+    recording.read_from_file(str(tmp_path / recorder.filename))
+    assert stream_recording.recording == recording.recording
+    assert stream_recording.inputs.shape == (100, 2)
+    assert np.array_equal(stream_recording.inputs, recording.inputs)
+    assert not list(tmp_path.glob("*/*.part"))
+
+
+def test_stream_recorder_write_error(tmp_path, monkeypatch):
+    """Test that a failing write stops the recording instead of blocking."""
+    game = Game(enable_renderer=False, enable_recorder=False)
+    game.add_players(
+        [PlayerHandler("P0", TeamID.RED), PlayerHandler("P1", TeamID.BLUE)]
+    )
+    game.recorder = GameActionStreamRecorder(
+        game, str(tmp_path), chunk_ticks=4, num_buffers=2
+    )
+    game.start()
+
+    def compress(*_args):
+        raise MemoryError
+
+    monkeypatch.setattr(game_recorder.zlib, "compress", compress)
+
+    def play():
+        # Fills both buffers, so step has to wait for the failed writes
+        for _ in range(100):
+            game.step([[1, 0, 1], [-1, 1, 0]])
+
+    with pytest.raises(RuntimeError):
+        play()
+    with pytest.raises(RuntimeError):
+        game.recorder.stop()
+    assert not list(tmp_path.iterdir())
+
+
+def test_position_recording(tmp_path):
+    """Test that the columns of a position recording map back to the game."""
+    game = Game(enable_renderer=False, enable_recorder=False)
+    game.add_players(
+        [PlayerHandler("P0", TeamID.RED), PlayerHandler("P1", TeamID.BLUE)]
+    )
+    game.start()
+    recorder = GamePositionRecorder(game, str(tmp_path), chunk_ticks=16)
+    recorder.start()
+
+    positions = []
+    for _ in range(40):
+        game.step([[1, 0, 1], [-1, 1, 0]])
+        recorder.step(None)
+        positions.append(game.stadium_game.world.position.copy())
+    recorder.stop()
+
+    recording = read_position_recording(str(tmp_path / recorder.filename))
+    assert isinstance(recording.players.base, np.memmap)
+    assert recording.players.shape == (40, 2, 6)
+    assert recording.player_info[1] == ["P1", str(game.players[1].id), TeamID.BLUE]
+    assert recording.stadium == "Classic"
+    positions = np.array(positions, dtype=np.float32)
+    assert np.array_equal(recording.ball[:, :2], positions[:, 0])
+    assert np.array_equal(
+        recording.players[..., :2], positions[:, game.player_disc_indices]
+    )
+    assert recording.players[0, 0, 4] == 1
@@ -0,0 +1,212 @@
+import copy
+import gc
+import weakref
+
+import numpy as np
+
+from ursinaxball.common_values import BaseMap, CollisionFlag, TeamID
+from ursinaxball.modules import resolve_collisions, update_discs
+from ursinaxball.modules.physics import GoalDetector, resolve_collisions_scalar
+from ursinaxball.modules.physics.batch_handler import (
+    resolve_collisions_batch,
+    update_discs_batch,
+)
+from ursinaxball.objects import BatchPhysicsWorld, Stadium, load_stadium_hbs
+
+
+def test_physics_world_views():
+    """Test that discs read and write their state through the physics world."""
+    stadium = load_stadium_hbs(BaseMap.CLASSIC)
+    ball_radius = stadium.discs[0].radius
+    world = stadium.build_world()
+
+    assert world.size == len(stadium.discs)
+    assert world.radius[0] == ball_radius
+
+    ball = stadium.discs[0]
+    ball.velocity = np.array([2.0, -1.0])
+    assert np.array_equal(world.velocity[0], [2.0, -1.0])
+
+    world.position[0] = [10.0, 5.0]
+    assert np.array_equal(ball.position, [10.0, 5.0])
+
+
+def test_update_discs():
+    """Test that the integration matches the per disc formula."""
+    stadium = load_stadium_hbs(BaseMap.CLASSIC)
+    ball = stadium.discs[0]
+    stadium.build_world()
+    ball.velocity = np.array([3.0, 1.0])
+
+    update_discs(stadium, [])
+
+    assert np.array_equal(ball.position, [3.0, 1.0])
+    assert np.array_equal(ball.velocity, np.array([3.0, 1.0]) * ball.damping)
+
+
+def test_goal_detector():
+    """Test that the first crossed goal line is credited."""
+    stadium = load_stadium_hbs(BaseMap.CLASSIC)
+    detector = GoalDetector(stadium)
+    red_goal_x = stadium.goal_points[stadium.goal_teams == TeamID.RED][0, 0, 0]
+
+    previous = np.array([[0.0, 0.0], [red_goal_x + 5, 0.0]])
+    assert detector.check(previous, previous) == TeamID.SPECTATOR
+
+    current = np.array([[0.0, 0.0], [red_goal_x - 5, 0.0]])
+    assert detector.check(previous, current) == TeamID.RED
+
+    # A disc crossing both goal lines credits the first goal of the stadium
+    previous = np.array([[-1000.0, 0.0]])
+    current = np.array([[1000.0, 0.0]])
+    assert detector.check(previous, current) == stadium.goal_teams[0]
+
+
+def test_collision_pairs_cache():
+    """Test that collision pairs are only compiled when a flag changes."""
+    stadium = load_stadium_hbs(BaseMap.CLASSIC)
+    world = stadium.build_world()
+
+    def get_pairs():
+        return stadium.get_collision_pairs(
+            world.collision_group, world.collision_mask, world.inverse_mass != 0
+        )
+
+    pairs = get_pairs()
+    assert get_pairs() is pairs
+
+    # The ball is the only movable disc of the map
+    ball_pairs = [disc_pairs for disc_pairs in pairs.discs if disc_pairs[0] == 0]
+    assert len(ball_pairs[0][3]) > 0
+
+    stadium.discs[0].collision_mask = CollisionFlag.NONE
+    assert get_pairs() is not pairs
+    assert all(disc_pairs[0] != 0 for disc_pairs in get_pairs().discs)
+
+
+def test_collision_pairs_keep_no_stadium():
+    """Test that the shared collision pairs do not keep a copy of the stadium."""
+    stadium = load_stadium_hbs(BaseMap.CLASSIC)
+    world = stadium.build_world()
+    # Flags of no other test, so the pairs are compiled from this stadium
+    movable = np.ones(world.size, dtype=bool)
+    pairs = stadium.get_collision_pairs(
+        world.collision_group, world.collision_mask, movable
+    )
+    cache = stadium.collision_pairs_cache
+    assert pairs in cache.values()
+
+    stadium_ref = weakref.ref(stadium)
+    world_ref = weakref.ref(world)
+    del stadium, world
+    gc.collect()
+    assert stadium_ref() is None
+    assert world_ref() is None
+
+
+def test_static_grid():
+    """Test that the static grid only keeps the geometry near a disc."""
+    stadium = load_stadium_hbs(BaseMap.CLASSIC)
+    world = stadium.build_world()
+    grid = stadium.static_grid
+    pairs = stadium.get_collision_pairs(
+        world.collision_group, world.collision_mask, world.inverse_mass != 0
+    )
+    ball_segments = next(
+        disc_pairs[3] for disc_pairs in pairs.discs if disc_pairs[0] == 0
+    )
+
+    segments, _ = pairs.get_nearby_static(0, grid.get_cell(0.0, 0.0))
+    assert segments == []
+
+    post = stadium.goals[0].points[0]
+    segments, _ = pairs.get_nearby_static(0, grid.get_cell(*post))
+    assert 0 < len(segments) < len(ball_segments)
+    assert segments == sorted(segments)
+
+    assert grid.get_cell(1e6, 0.0) == -1
+    assert np.array_equal(
+        grid.get_cells(np.array([[1e6, 0.0], post])), [-1, grid.get_cell(*post)]
+    )
+
+
+def test_static_grid_after_planes():
+    """Test that a disc moved by a plane still touches the vertices near it."""
+    data = {
+        "name": "Plane and vertex",
+        "traits": {},
+        "bg": {},
+        "vertexes": [{"x": 88, "y": 0}],
+        "segments": [],
+        "goals": [],
+        "discs": [],
+        "planes": [{"normal": [-1, 0], "dist": -100}],
+        "ballPhysics": {"radius": 10, "damping": 1},
+    }
+
+    for solver in (resolve_collisions, resolve_collisions_scalar):
+        stadium = Stadium(data)
+        stadium.build_world()
+        ball = stadium.discs[0]
+        ball.position = np.array([60.0, 0.0])
+        ball.velocity = np.array([70.0, 0.0])
+        update_discs(stadium, [])
+        solver(stadium, False)
+        assert np.array_equal(ball.position, [98.0, 0.0])
+        assert np.array_equal(ball.velocity, [17.5, 0.0])
+
+    stadium = Stadium(data)
+    world = BatchPhysicsWorld(2, len(stadium.discs))
+    for k in range(2):
+        stadium.build_world(world, k)
+    np.copyto(world.step_damping, world.damping)
+    world.position[:, 0] = [[60.0, 0.0], [0.0, 0.0]]
+    world.velocity[:, 0] = [[70.0, 0.0], [0.0, 0.0]]
+    update_discs_batch(world)
+    resolve_collisions_batch(world, stadium)
+    assert np.array_equal(world.position[:, 0], [[98.0, 0.0], [0.0, 0.0]])
+    assert np.array_equal(world.velocity[:, 0], [[17.5, 0.0], [0.0, 0.0]])
+
+
+def test_disc_broadphase_matches():
+    """Test that pruning disc pairs does not change the collision results."""
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-150, 150, (30, 2))
+    velocities = rng.uniform(-3, 3, (30, 2))
+
+    worlds = []
+    for disc_broadphase in (False, True):
+        stadium = load_stadium_hbs(BaseMap.CLASSIC)
+        stadium.discs.extend(copy.deepcopy(stadium.discs[0]) for _ in range(30))
+        world = stadium.build_world()
+        world.position[-len(positions) :] = positions
+        world.velocity[-len(velocities) :] = velocities
+        for _ in range(50):
+            update_discs(stadium, [])
+            resolve_collisions(stadium, disc_broadphase)
+        worlds.append(world)
+
+    assert np.array_equal(worlds[0].position, worlds[1].position)
+    assert np.array_equal(worlds[0].velocity, worlds[1].velocity)
+
+
+def test_scalar_backend_matches():
+    """Test that the scalar kernels match the NumPy kernels up to rounding."""
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(-400, 400, (30, 2))
+    velocities = rng.uniform(-3, 3, (30, 2))
+
+    worlds = []
+    for solver in (resolve_collisions, resolve_collisions_scalar):
+        stadium = load_stadium_hbs(BaseMap.ROUNDED)
+        stadium.discs.extend(copy.deepcopy(stadium.discs[0]) for _ in range(30))
+        world = stadium.build_world()
+        world.position[-len(positions) :] = positions
+        world.velocity[-len(velocities) :] = velocities
+        for _ in range(10):
+            update_discs(stadium, [])
+            solver(stadium, False)
+        worlds.append(world)
+
+    assert np.allclose(worlds[0].position, worlds[1].position, rtol=0, atol=1e-9)
+    assert np.allclose(worlds[0].velocity, worlds[1].velocity, rtol=0, atol=1e-9)
@@ -0,0 +1,62 @@
+import numpy as np
+
+from ursinaxball import Game, ReplayRunner
+from ursinaxball.common_values import TeamID
+from ursinaxball.modules import GameScore, PlayerHandler
+from ursinaxball.modules.systems.game_config import GameConfig
+from ursinaxball.replay2npz import main
+
+LIMITS = ["--workers", "1", "--time-limit", "1", "--score-limit", "1"]
+
+
+def record_games(folder, num_games, teams=(TeamID.RED, TeamID.BLUE), prefix="game"):
+    rng = np.random.default_rng(0)
+    for i in range(num_games):
+        config = GameConfig(enable_renderer=False, folder_rec=str(folder))
+        game = Game(config)
+        game.score = GameScore(time_limit=1, score_limit=1)
+        game.add_players([PlayerHandler(f"P{p}", team) for p, team in enumerate(teams)])
+        game.start()
+        actions = rng.integers(-1, 2, size=(100 + 50 * i, len(teams), 3))
+        actions[..., 2] = rng.integers(0, 2, size=actions.shape[:2])
+        for tick_actions in actions:
+            game.step(tick_actions)
+        game.stop(save_recording=True)
+        (file_name,) = folder.glob("HBR_*.hbar")
+        file_name.rename(folder / f"{prefix}{i}.hbar")
+
+
+def test_replay2npz(tmp_path):
+    """Test that the replays are converted per game and into one dataset."""
+    replay_dir = tmp_path / "replays"
+    replay_dir.mkdir()
+    record_games(replay_dir, 2)
+
+    assert main([str(replay_dir), str(tmp_path / "npz"), *LIMITS, "--every", "10"]) == 0
+    with np.load(tmp_path / "npz" / "game1.npz") as replay:
+        actions = ReplayRunner(str(replay_dir / "game1.hbar")).actions
+        assert np.array_equal(replay["actions"], actions[::10])
+        assert replay["observations"].shape[:2] == (15, 2)
+
+    assert main([str(replay_dir), str(tmp_path / "dataset"), *LIMITS, "--dataset"]) == 0
+    offsets = np.load(tmp_path / "dataset" / "game_offsets.npy")
+    assert offsets.tolist() == [0, 100, 250]
+    observations = np.load(tmp_path / "dataset" / "observations.npy", mmap_mode="r")
+    assert observations.shape[:2] == (250, 2)
+    assert np.load(tmp_path / "dataset" / "teams.npy").tolist() == [[1, 2], [1, 2]]
+    assert not (tmp_path / "dataset" / ".replays").exists()
+
+
+def test_replay2npz_other_players(tmp_path):
+    """Test that replays with other players are left out of the dataset."""
+    replay_dir = tmp_path / "replays"
+    replay_dir.mkdir()
+    # The replay of three players comes first but most replays have two
+    record_games(replay_dir, 1, (TeamID.RED, TeamID.BLUE, TeamID.BLUE), "a")
+    record_games(replay_dir, 2)
+
+    assert main([str(replay_dir), str(tmp_path / "dataset"), *LIMITS, "--dataset"]) == 1
+    files = (tmp_path / "dataset" / "files.txt").read_text()
+    assert files == "game0.hbar\ngame1.hbar\n"
+    assert np.load(tmp_path / "dataset" / "actions.npy").shape == (250, 2, 3)
+    assert not (tmp_path / "dataset" / ".replays").exists()
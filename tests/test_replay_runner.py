@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ursinaxball import Game, ReplayRunner
+from ursinaxball.common_values import TeamID
+from ursinaxball.modules import GameScore, PlayerHandler
+from ursinaxball.modules.systems.game_config import GameConfig
+
+
+@pytest.mark.parametrize("stream_recorder", [False, True])
+def test_replay_runner_follows_game(tmp_path, stream_recorder):
+    """Test that a replayed recording goes through the states of the game."""
+    config = GameConfig(
+        enable_renderer=False,
+        folder_rec=str(tmp_path),
+        stream_recorder=stream_recorder,
+    )
+    game = Game(config)
+    game.score = GameScore(time_limit=1, score_limit=1)
+    game.add_players(
+        [PlayerHandler("P0", TeamID.RED), PlayerHandler("P1", TeamID.BLUE)]
+    )
+    game.start()
+
+    rng = np.random.default_rng(0)
+    actions = rng.integers(-1, 2, size=(300, 2, 3))
+    actions[..., 2] = rng.integers(0, 2, size=(300, 2))
+    actions[:100, 0] = [1, 0, 1]
+    snapshots = []
+    for tick_actions in actions:
+        game.step(tick_actions)
+        snapshots.append(game.snapshot())
+    game.stop(save_recording=True)
+
+    (file_name,) = tmp_path.glob("*.hbar")
+    runner = ReplayRunner(str(file_name), config, time_limit=1, score_limit=1)
+    assert runner.num_ticks == 300
+    assert np.array_equal(runner.actions, actions)
+    assert np.array_equal(runner.run_snapshots(), snapshots)
+
+    ticks = [250, 10, 120]
+    assert [tick for tick, _ in runner.run(ticks)] == sorted(ticks)
+    assert np.array_equal(
+        runner.run_snapshots(ticks), np.array(snapshots)[sorted(ticks)]
+    )
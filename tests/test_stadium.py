@@ -1,5 +1,12 @@
+import copy
+import hashlib
+import importlib.resources as pkg_resources
+
+import pytest
+
+from ursinaxball import stadiums
 from ursinaxball.common_values import BaseMap
-from ursinaxball.objects import load_stadium_hbs
+from ursinaxball.objects import StadiumCache, load_stadium_compiled, load_stadium_hbs
 
 
 def test_stadium():
@@ -21,3 +28,75 @@ def test_traits():
     # Check if each post has a invMass of 0
     inv_mass = [disc.inverse_mass == 0 for disc in goal_posts]
     assert inv_mass.count(True) == 4
+
+
+def test_stadium_cache(tmp_path):
+    """Test that the stadium cache recompiles edited files and persists them."""
+    content = pkg_resources.files(stadiums).joinpath(BaseMap.CLASSIC.value)
+    map_file = tmp_path / "map.hbs"
+    map_file.write_bytes(content.read_bytes())
+
+    cache = StadiumCache(tmp_path / "cache")
+    stadium = cache.load(str(map_file))
+    assert cache.load(str(map_file)) is stadium
+    assert len(list((tmp_path / "cache").glob("*.pickle"))) == 1
+
+    other_cache = StadiumCache(tmp_path / "cache")
+    assert other_cache.load(str(map_file)).name == "Classic"
+
+    map_file.write_text(map_file.read_text().replace('"Classic"', '"Edited"'))
+    assert cache.load(str(map_file)).name == "Edited"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"cmissing_module\nStadium\n.", b"cbuiltins\nint\n(I1\nI2\nI3\ntR."],
+)
+def test_stadium_cache_bad_file(tmp_path, data):
+    """Test that a compiled stadium which cannot be unpickled is compiled again."""
+    content = pkg_resources.files(stadiums).joinpath(BaseMap.CLASSIC.value)
+    cache = StadiumCache(tmp_path)
+    cache.get_path(hashlib.sha256(content.read_bytes()).hexdigest()).write_bytes(data)
+    assert cache.load(BaseMap.CLASSIC).name == "Classic"
+
+
+def test_compiled_stadium_read_only():
+    """Test that the shared stadium is read-only but its copies are not."""
+    stadium = load_stadium_compiled(BaseMap.CLASSIC)
+    with pytest.raises(ValueError, match="read-only"):
+        stadium.discs[0].position[0] = 100
+    with pytest.raises(ValueError, match="read-only"):
+        stadium.segments[0].vertices[0].position[0] = 100
+
+    stadium_copy = load_stadium_hbs(BaseMap.CLASSIC)
+    stadium_copy.discs[0].position[0] = 100
+    assert stadium.discs[0].position[0] == 0
+
+
+def test_stadium_copy_shares_geometry():
+    """Test that copies of a stadium share the geometry but not the discs."""
+    stadium = load_stadium_hbs(BaseMap.CLASSIC)
+    stadium_copy = copy.deepcopy(stadium)
+
+    assert stadium_copy.segments is stadium.segments
+    assert stadium_copy.static_grid is stadium.static_grid
+    assert stadium_copy.discs[0] is stadium_copy.ball_physics
+    stadium_copy.discs[0].position[0] = 100
+    assert stadium.discs[0].position[0] == 0
+
+
+def test_physics_objects_slots():
+    """Test that the physics objects of a stadium have no instance dict."""
+    stadium = load_stadium_hbs(BaseMap.CLASSIC)
+    objects = [
+        *stadium.discs,
+        *stadium.segments,
+        *stadium.vertices,
+        *stadium.planes,
+        *stadium.goals,
+        *stadium.traits,
+        stadium.player_physics,
+    ]
+    assert not any(hasattr(obj, "__dict__") for obj in objects)
+    assert stadium.ball_physics.trait is None
+    assert stadium.player_physics.player_id == -1
@@ -0,0 +1,37 @@
+import numpy as np
+
+from ursinaxball import Game, VectorGame
+from ursinaxball.common_values import TeamID
+from ursinaxball.modules import GameScore, PlayerHandler
+from ursinaxball.modules.systems.game_config import GameConfig
+
+
+def test_vector_game_matches_game():
+    """Test that every game of the batch follows the same path as a Game."""
+    config = GameConfig(enable_renderer=False, enable_recorder=False)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(-1, 2, size=(300, 2, 2, 3))
+    actions[..., 2] = rng.integers(0, 2, size=(300, 2, 2))
+
+    vector_game = VectorGame(2, config, time_limit=1, score_limit=1)
+    vector_game.add_player("P0", TeamID.RED)
+    vector_game.add_player("P1", TeamID.BLUE)
+    vector_game.start()
+
+    games = []
+    for _ in range(2):
+        game = Game(config)
+        game.score = GameScore(time_limit=1, score_limit=1)
+        game.add_players(
+            [PlayerHandler("P0", TeamID.RED), PlayerHandler("P1", TeamID.BLUE)]
+        )
+        game.start()
+        games.append(game)
+
+    for tick_actions in actions:
+        dones = vector_game.step(tick_actions)
+        for k, game in enumerate(games):
+            assert game.step(tick_actions[k]) == dones[k]
+            assert np.array_equal(
+                game.stadium_game.world.position, vector_game.world.position[k]
+            )
@@ -1,3 +1,6 @@
 from .game import Game
+from .game_pool import GamePool
+from .replay_runner import ReplayRunner
+from .vector_game import VectorGame
 
-__all__ = ["Game"]
+__all__ = ["Game", "GamePool", "ReplayRunner", "VectorGame"]
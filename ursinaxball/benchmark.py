@@ -6,18 +6,21 @@ from pyinstrument import Profiler
 from pyperf import Benchmark, Runner
 
 from ursinaxball import Game
-from ursinaxball.common_values import BaseMap, TeamID
+from ursinaxball.common_values import BaseMap, PhysicsBackend, TeamID
 from ursinaxball.modules import GameScore, PlayerHandler
 
 PATH_PROJECT = Path(__file__).parent.parent
 
 
-def init_game(enable_renderer: bool) -> Game:
+def init_game(
+    enable_renderer: bool, physics_backend: PhysicsBackend = PhysicsBackend.NUMPY
+) -> Game:
     game = Game(
         folder_rec="./recordings/",
         enable_vsync=False,
         stadium_file=BaseMap.CLASSIC,
         enable_renderer=enable_renderer,
+        physics_backend=physics_backend,
     )
     game.score = GameScore(time_limit=1)
 
@@ -51,8 +54,8 @@ def generate_random_actions(rng: np.random.Generator):
     return np.concatenate((array_1, array_2))
 
 
-def single_game():
-    game = init_game(enable_renderer=False)
+def single_game(physics_backend: PhysicsBackend = PhysicsBackend.NUMPY):
+    game = init_game(enable_renderer=False, physics_backend=physics_backend)
     rng = np.random.default_rng(12345)
     nb_frames = 60 * 60 * 1  # 1 minute
 
@@ -84,6 +87,20 @@ def single_game_pyperf():
     output_pyperf(res_pyperf, output_path)
 
 
+def physics_backends_pyperf():
+    runner = Runner()
+    for physics_backend in PhysicsBackend:
+        res_pyperf = runner.bench_func(
+            f"single_game_{physics_backend.value}", single_game, physics_backend
+        )
+
+        assert isinstance(res_pyperf, Benchmark)
+        output_path = (
+            PATH_PROJECT / f"benchmarks/single_game_{physics_backend.value}_pyperf.html"
+        )
+        output_pyperf(res_pyperf, output_path)
+
+
 def multiple_games(n=5):
     game = init_game(enable_renderer=False)
     rng = np.random.default_rng(12345)
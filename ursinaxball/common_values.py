@@ -47,6 +47,12 @@ class Input(IntEnum):
     SHOOT = 16
 
 
+class PhysicsBackend(str, Enum):
+    NUMPY = "numpy"
+    SCALAR = "scalar"
+    NUMBA = "numba"
+
+
 class BaseMap(str, Enum):
     CLASSIC = "classic.hbs"
     ROUNDED = "rounded.hbs"
@@ -0,0 +1,22 @@
+import importlib.util
+
+if importlib.util.find_spec("gymnasium") is None:
+    raise ImportError(
+        "ursinaxball.env requires Gymnasium, install it with "
+        "`pip install ursinaxball[env]`"
+    )
+
+from .async_vector_env import HaxballAsyncVectorEnv
+from .haxball_env import HaxballEnv, HaxballVectorEnv
+from .rewards import CombinedReward, GoalReward, Reward, TouchReward, WinReward
+
+__all__ = [
+    "CombinedReward",
+    "GoalReward",
+    "HaxballAsyncVectorEnv",
+    "HaxballEnv",
+    "HaxballVectorEnv",
+    "Reward",
+    "TouchReward",
+    "WinReward",
+]
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import contextlib
+import multiprocessing as mp
+import traceback
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+from numpy.typing import NDArray
+
+from ursinaxball.env.haxball_env import HaxballVectorEnv
+from ursinaxball.game_pool import get_buffer_size, map_arrays
+
+Layout = dict[str, tuple[tuple[int, ...], type]]
+
+
+def get_layout(num_workers: int, num_envs: int, size: int) -> Layout:
+    """
+    Returns the shape and dtype of every array of the shared memory block,
+    num_envs being the number of environments of each worker
+    """
+    return {
+        "actions": ((num_workers, num_envs, 3), np.int64),
+        "observations": ((num_workers, num_envs, size), np.float32),
+        "final_observations": ((num_workers, num_envs, size), np.float32),
+        "rewards": ((num_workers, num_envs), np.float64),
+        "terminations": ((num_workers, num_envs), np.bool_),
+        "winners": ((num_workers, num_envs), np.int64),
+    }
+
+
+def write_step(
+    arrays: dict[str, np.ndarray],
+    index: int,
+    observations: NDArray[np.float32],
+    infos: dict[str, Any],
+) -> None:
+    arrays["observations"][index] = observations
+    if "final_obs" in infos:
+        arrays["final_observations"][index] = infos["final_obs"]
+        arrays["winners"][index] = infos["winner"]
+
+
+def run_worker(
+    index: int,
+    connection: Connection,
+    memory_name: str,
+    layout: Layout,
+    env_kwargs: dict[str, Any],
+) -> None:
+    """
+    Runs the HaxballVectorEnv of one worker, driven by the commands received
+    on connection
+    """
+    memory = SharedMemory(name=memory_name)
+    arrays = map_arrays(memory.buf, layout)
+    try:
+        env = HaxballVectorEnv(copy=False, **env_kwargs)
+        connection.send(None)
+
+        while True:
+            command, seed = connection.recv()
+            if command == "step":
+                observations, rewards, terminations, _, infos = env.step(
+                    arrays["actions"][index]
+                )
+                arrays["rewards"][index] = rewards
+                arrays["terminations"][index] = terminations
+                write_step(arrays, index, observations, infos)
+            elif command == "reset":
+                observations, infos = env.reset(seed=seed)
+                arrays["terminations"][index] = False
+                write_step(arrays, index, observations, infos)
+            elif command == "close":
+                env.close()
+                break
+            connection.send(None)
+    except Exception:
+        connection.send(traceback.format_exc())
+    finally:
+        del arrays
+        memory.close()
+        connection.close()
+
+
+class HaxballAsyncVectorEnv(VectorEnv):
+    """
+    HaxballVectorEnv split across worker processes.
+
+    Each of the num_workers workers steps its own HaxballVectorEnv of
+    games_per_worker games, built from env_kwargs like GamePool builds its
+    games. The actions and the results of the steps are exchanged through one
+    shared memory block, so the policy of the parent can run between
+    step_async and step_wait while the workers run the physics.
+    """
+
+    metadata: dict[str, Any] = {"autoreset_mode": AutoresetMode.SAME_STEP}  # noqa: RUF012
+
+    def __init__(
+        self,
+        num_workers: int,
+        games_per_worker: int = 1,
+        start_method: str | None = None,
+        copy: bool = True,
+        **env_kwargs: Any,
+    ):
+        env_kwargs["num_games"] = games_per_worker
+        # Spaces and sizes of a worker, from a local environment of one game
+        spec_env = HaxballVectorEnv(**{**env_kwargs, "num_games": 1})
+        agents_per_game = spec_env.num_envs
+        self.single_observation_space = spec_env.single_observation_space
+        self.single_action_space = spec_env.single_action_space
+        spec_env.close()
+
+        self.num_workers = num_workers
+        self.num_envs = num_workers * games_per_worker * agents_per_game
+        self.copy = copy
+        self.observation_space = batch_space(
+            self.single_observation_space, self.num_envs
+        )
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+
+        layout = get_layout(
+            num_workers,
+            games_per_worker * agents_per_game,
+            self.single_observation_space.shape[0],
+        )
+        self.memory = SharedMemory(create=True, size=get_buffer_size(layout))
+        self.arrays = map_arrays(self.memory.buf, layout)
+        for array in self.arrays.values():
+            array.fill(0)
+
+        self.context = mp.get_context(start_method)
+        self.connections: list[Connection] = []
+        self.processes: list[mp.Process] = []
+        self.waiting = False
+        try:
+            for index in range(num_workers):
+                parent_connection, worker_connection = self.context.Pipe()
+                process = self.context.Process(
+                    target=run_worker,
+                    args=(
+                        index,
+                        worker_connection,
+                        self.memory.name,
+                        layout,
+                        env_kwargs,
+                    ),
+                    daemon=True,
+                )
+                process.start()
+                worker_connection.close()
+                self.connections.append(parent_connection)
+                self.processes.append(process)
+            self._wait()
+        except Exception:
+            # Stops the workers that started and releases the shared memory
+            self.close_extras()
+            raise
+
+    def reset(
+        self,
+        *,
+        seed: int | None = None,
+        options: dict[str, Any] | None = None,  # noqa: ARG002
+    ) -> tuple[NDArray[np.float32], dict[str, Any]]:
+        super().reset(seed=seed)
+        if self.waiting:
+            self._wait()
+        for index, connection in enumerate(self.connections):
+            connection.send(("reset", None if seed is None else seed + index))
+        self.waiting = True
+        self._wait()
+        return self._get("observations"), {}
+
+    def step_async(self, actions: NDArray[np.int_]) -> None:
+        """
+        Sends the actions of shape (num_envs, 3) and starts stepping every game
+        """
+        if self.waiting:
+            raise RuntimeError("The previous step has not been waited for")
+        self.arrays["actions"].reshape(self.num_envs, 3)[:] = actions
+        for connection in self.connections:
+            connection.send(("step", None))
+        self.waiting = True
+
+    def step_wait(
+        self,
+    ) -> tuple[
+        NDArray[np.float32],
+        NDArray[np.float64],
+        NDArray[np.bool_],
+        NDArray[np.bool_],
+        dict[str, Any],
+    ]:
+        """
+        Waits for the games stepped by step_async, see HaxballVectorEnv.step
+        """
+        if not self.waiting:
+            raise RuntimeError("No step is running")
+        self._wait()
+        terminations = self._get("terminations").copy()
+        infos: dict[str, Any] = {}
+        if terminations.any():
+            infos["final_obs"] = self._get("final_observations").copy()
+            infos["_final_obs"] = terminations
+            infos["winner"] = self._get("winners").copy()
+            infos["_winner"] = terminations
+        return (
+            self._get("observations"),
+            self._get("rewards"),
+            terminations,
+            np.zeros(self.num_envs, dtype=bool),
+            infos,
+        )
+
+    def step(
+        self, actions: NDArray[np.int_]
+    ) -> tuple[
+        NDArray[np.float32],
+        NDArray[np.float64],
+        NDArray[np.bool_],
+        NDArray[np.bool_],
+        dict[str, Any],
+    ]:
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close_extras(self, **_kwargs: Any) -> None:
+        """
+        Stops the workers and releases the shared memory
+        """
+        if self.memory is None:
+            return
+        if self.waiting:
+            self._wait()
+        for connection, process in zip(self.connections, self.processes):
+            if process.is_alive():
+                # A failed worker may exit and close its end in the meantime
+                with contextlib.suppress(OSError):
+                    connection.send(("close", None))
+            process.join()
+            connection.close()
+
+        self.arrays = {}
+        self.memory.unlink()
+        self.memory.close()
+        self.memory = None
+        self.connections = []
+        self.processes = []
+
+    def _get(self, name: str) -> np.ndarray:
+        array = self.arrays[name]
+        array = array.reshape(self.num_envs, *array.shape[2:])
+        return array.copy() if self.copy else array
+
+    def _wait(self) -> None:
+        errors = [connection.recv() for connection in self.connections]
+        self.waiting = False
+        for error in errors:
+            if error is not None:
+                raise RuntimeError(f"A worker of the environment failed:\n{error}")
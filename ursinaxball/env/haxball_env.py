@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+from collections.abc import Sequence
+from copy import deepcopy
+from typing import Any
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+from numpy.typing import NDArray
+
+from ursinaxball.common_values import TeamID
+from ursinaxball.env.rewards import GoalReward, Reward
+from ursinaxball.game import Game
+from ursinaxball.modules import Bot, GameScore, ObservationBuilder, PlayerHandler
+from ursinaxball.modules.systems.game_config import GameConfig
+from ursinaxball.vector_game import VectorGame
+
+PlayerSpec = tuple[str, int]
+
+DEFAULT_PLAYERS: tuple[PlayerSpec, ...] = (("Red", TeamID.RED), ("Blue", TeamID.BLUE))
+# Actions of the action space are shifted by this offset: 0 means left or down
+ACTION_OFFSET = np.array([1, 1, 0], dtype=np.int8)
+
+
+def get_default_config() -> GameConfig:
+    return GameConfig(
+        enable_renderer=False, enable_recorder=False, logging_level=logging.WARNING
+    )
+
+
+def get_action_space() -> spaces.MultiDiscrete:
+    """
+    Direction on the x axis, direction on the y axis, kick
+    """
+    return spaces.MultiDiscrete([3, 3, 2], dtype=np.int64)
+
+
+def get_observation_space(builder: ObservationBuilder) -> spaces.Box:
+    return spaces.Box(-np.inf, np.inf, shape=(builder.size,), dtype=np.float32)
+
+
+def get_flips(teams: Sequence[int], mirror: bool) -> NDArray[np.int8]:
+    """
+    Sign of the x axis of the actions of each player, so that the mirrored
+    players act in the frame of their observations
+    """
+    return np.array(
+        [-1 if mirror and team == TeamID.BLUE else 1 for team in teams], dtype=np.int8
+    )
+
+
+class HaxballEnv(gym.Env):
+    """
+    One player of a Game as a Gymnasium environment.
+
+    The agent controls players[agent], the other players are driven by their
+    bot, or stay idle without one. The observations are the row of the agent
+    built by an ObservationBuilder. With the default mirror option, the agent
+    always sees itself attacking to the right and its actions are mirrored
+    back like Bot.symmetry_action. The episode terminates when the game is
+    done, it is never truncated.
+    """
+
+    metadata: dict[str, Any] = {"render_modes": ["human"]}  # noqa: RUF012
+
+    def __init__(
+        self,
+        players: Sequence[PlayerSpec] = DEFAULT_PLAYERS,
+        agent: int = 0,
+        bots: Sequence[Bot | None] | None = None,
+        reward: Reward | None = None,
+        config: GameConfig | None = None,
+        time_limit: int | None = None,
+        score_limit: int | None = None,
+        render_mode: str | None = None,
+        observation_kwargs: dict[str, Any] | None = None,
+    ):
+        if render_mode is not None and render_mode not in self.metadata["render_modes"]:
+            raise ValueError(f"Invalid render mode: {render_mode}")
+        if config is None:
+            config = get_default_config()
+        self.render_mode = render_mode
+        config = dataclasses.replace(config, enable_renderer=render_mode == "human")
+        bots = bots if bots is not None else [None] * len(players)
+
+        self.game = Game(config)
+        self.game.score = GameScore(time_limit=time_limit, score_limit=score_limit)
+        self.game.add_players(
+            [
+                PlayerHandler(name, team, None if p == agent else bots[p])
+                for p, (name, team) in enumerate(players)
+            ]
+        )
+        self.game.start()
+        self.agent = agent
+        self.player = self.game.players[agent]
+        self.bot_players = [
+            (p, player)
+            for p, player in enumerate(self.game.players)
+            if player.bot is not None
+        ]
+
+        observation_kwargs = observation_kwargs or {}
+        self.builder = ObservationBuilder(self.game, **observation_kwargs)
+        self.flip = get_flips(
+            [self.player.team], observation_kwargs.get("mirror", True)
+        )[0]
+        self.reward = reward if reward is not None else GoalReward()
+        self.observation_space = get_observation_space(self.builder)
+        self.action_space = get_action_space()
+
+        self.observations = self.builder.new_buffer()
+        self.actions = np.zeros((len(players), 3), dtype=np.int8)
+
+    def reset(
+        self,
+        *,
+        seed: int | None = None,
+        options: dict[str, Any] | None = None,  # noqa: ARG002
+    ) -> tuple[NDArray[np.float32], dict[str, Any]]:
+        super().reset(seed=seed)
+        self.game.reset(save_recording=self.game.recorder is not None)
+        # Game.reset keeps the kicks, which would carry over to the new episode
+        for player in self.game.players:
+            player.reset_kick()
+        self.reward.reset(self.game, self.player)
+        self.builder.build(self.observations)
+        return self.observations[self.agent].copy(), {}
+
+    def step(
+        self, action: NDArray[np.int_]
+    ) -> tuple[NDArray[np.float32], float, bool, bool, dict[str, Any]]:
+        actions = self.actions
+        for p, player in self.bot_players:
+            actions[p] = player.step(self.game)
+        np.subtract(action, ACTION_OFFSET, out=actions[self.agent], casting="unsafe")
+        actions[self.agent, 0] *= self.flip
+
+        done = self.game.step(actions)
+        reward = self.reward.get_reward(self.game, self.player, done)
+        self.builder.build(self.observations)
+        info = {"winner": self.game.score.get_winner()} if done else {}
+        return self.observations[self.agent].copy(), reward, done, False, info
+
+    def render(self) -> None:
+        # The renderer of the game draws every step by itself
+        return None
+
+    def close(self) -> None:
+        self.game.stop(save_recording=False)
+
+
+class HaxballVectorEnv(VectorEnv):
+    """
+    The players of K games stepped in lockstep by a VectorGame.
+
+    Every game holds the same players. The controlled players, `agents`, default
+    to every player without a bot, so the games can be used for self-play: the
+    environment i is the agent agents[i % A] of the game i // A. Observations
+    are built for every player of a game at once.
+
+    Games that are done are reset within the step (Gymnasium's same-step
+    autoreset): the observations of the final tick are in infos["final_obs"]
+    and the winners in infos["winner"], both masked by terminations.
+    """
+
+    metadata: dict[str, Any] = {"autoreset_mode": AutoresetMode.SAME_STEP}  # noqa: RUF012
+
+    def __init__(
+        self,
+        num_games: int,
+        players: Sequence[PlayerSpec] = DEFAULT_PLAYERS,
+        agents: Sequence[int] | None = None,
+        bots: Sequence[Bot | None] | None = None,
+        reward: Reward | None = None,
+        config: GameConfig | None = None,
+        time_limit: int | None = None,
+        score_limit: int | None = None,
+        observation_kwargs: dict[str, Any] | None = None,
+        copy: bool = True,
+    ):
+        if config is None:
+            config = get_default_config()
+        bots = bots if bots is not None else [None] * len(players)
+        if agents is None:
+            agents = [p for p in range(len(players)) if bots[p] is None]
+
+        self.vector_game = VectorGame(num_games, config, time_limit, score_limit)
+        for name, team in players:
+            self.vector_game.add_player(name, team)
+        for game in self.vector_game.games:
+            for p, player in enumerate(game.players):
+                if p not in agents and bots[p] is not None:
+                    player.bot = deepcopy(bots[p])
+        self.vector_game.start()
+
+        self.num_games = num_games
+        self.agents = np.array(agents, dtype=np.intp)
+        self.num_envs = num_games * len(agents)
+        self.copy = copy
+        self.bot_players = [
+            (p, player)
+            for p, player in enumerate(self.vector_game.games[0].players)
+            if player.bot is not None
+        ]
+
+        observation_kwargs = observation_kwargs or {}
+        self.builders = [
+            ObservationBuilder(game, **observation_kwargs)
+            for game in self.vector_game.games
+        ]
+        self.flips = get_flips(
+            [players[p][1] for p in agents], observation_kwargs.get("mirror", True)
+        )
+        reward = reward if reward is not None else GoalReward()
+        self.rewards = [[deepcopy(reward) for _ in agents] for _ in range(num_games)]
+
+        self.single_observation_space = get_observation_space(self.builders[0])
+        self.single_action_space = get_action_space()
+        self.observation_space = batch_space(
+            self.single_observation_space, self.num_envs
+        )
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+
+        size = self.builders[0].size
+        self.game_observations = np.zeros(
+            (num_games, len(players), size), dtype=np.float32
+        )
+        self.observations = np.zeros((self.num_envs, size), dtype=np.float32)
+        self.actions = np.zeros((num_games, len(players), 3), dtype=np.int8)
+        self.step_rewards = np.zeros(self.num_envs)
+
+    def reset(
+        self,
+        *,
+        seed: int | None = None,
+        options: dict[str, Any] | None = None,  # noqa: ARG002
+    ) -> tuple[NDArray[np.float32], dict[str, Any]]:
+        super().reset(seed=seed)
+        self.vector_game.reset()
+        for k in range(self.num_games):
+            self._start_episode(k)
+        self._build_observations()
+        return self._get_observations(), {}
+
+    def step(
+        self, actions: NDArray[np.int_]
+    ) -> tuple[
+        NDArray[np.float32],
+        NDArray[np.float64],
+        NDArray[np.bool_],
+        NDArray[np.bool_],
+        dict[str, Any],
+    ]:
+        vector_game = self.vector_game
+        games = vector_game.games
+        for p, _ in self.bot_players:
+            for k, game in enumerate(games):
+                self.actions[k, p] = game.players[p].step(game)
+        agent_actions = np.asarray(actions).reshape(self.num_games, len(self.agents), 3)
+        agent_actions = agent_actions - ACTION_OFFSET
+        agent_actions[..., 0] *= self.flips
+        self.actions[:, self.agents] = agent_actions
+
+        dones = vector_game.step(self.actions, autoreset=False)
+        agents = self.agents.tolist()
+        step_rewards = self.step_rewards
+        for k, (game, rewards, done) in enumerate(
+            zip(games, self.rewards, dones.tolist())
+        ):
+            for a, (p, reward) in enumerate(zip(agents, rewards)):
+                step_rewards[k * len(agents) + a] = reward.get_reward(
+                    game, game.players[p], done
+                )
+
+        terminations = np.repeat(dones, len(agents))
+        truncations = np.zeros(self.num_envs, dtype=bool)
+        infos: dict[str, Any] = {}
+        if dones.any():
+            self._build_observations()
+            infos["final_obs"] = self.observations.copy()
+            infos["_final_obs"] = terminations
+            for k in np.flatnonzero(dones).tolist():
+                vector_game.reset_game(k)
+                self._start_episode(k)
+            infos["winner"] = np.repeat(vector_game.winners, len(agents))
+            infos["_winner"] = terminations
+
+        self._build_observations()
+        return (
+            self._get_observations(),
+            step_rewards.copy() if self.copy else step_rewards,
+            terminations,
+            truncations,
+            infos,
+        )
+
+    def close_extras(self, **_kwargs: Any) -> None:
+        self.vector_game.stop()
+
+    def _start_episode(self, k: int) -> None:
+        game = self.vector_game.games[k]
+        # VectorGame keeps the kicks when a game is reset, like Game.reset
+        for player in game.players:
+            player.reset_kick()
+        self.vector_game.kicking[k] = False
+        self.vector_game.kick_cancel[k] = False
+        for p, reward in zip(self.agents.tolist(), self.rewards[k]):
+            reward.reset(game, game.players[p])
+
+    def _build_observations(self) -> None:
+        for builder, observations in zip(self.builders, self.game_observations):
+            builder.build(observations)
+        np.take(
+            self.game_observations,
+            self.agents,
+            axis=1,
+            out=self.observations.reshape(self.num_games, len(self.agents), -1),
+            mode="clip",
+        )
+
+    def _get_observations(self) -> NDArray[np.float32]:
+        return self.observations.copy() if self.copy else self.observations
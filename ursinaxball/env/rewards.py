@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from ursinaxball.common_values import TeamID
+
+if TYPE_CHECKING:
+    from ursinaxball import Game
+    from ursinaxball.modules import PlayerHandler
+
+
+class Reward(ABC):
+    """
+    Reward of one player, called once after every step of its game.
+    Rewards may keep state between the steps, reset is called at the start of
+    every episode. Environments copy the reward given to them for every player
+    they control.
+    """
+
+    def reset(self, game: Game, player: PlayerHandler) -> None:  # noqa: B027
+        pass
+
+    @abstractmethod
+    def get_reward(self, game: Game, player: PlayerHandler, done: bool) -> float:
+        raise NotImplementedError
+
+
+class GoalReward(Reward):
+    """
+    +weight for every goal scored by the team of the player, -weight for every
+    goal conceded
+    """
+
+    def __init__(self, weight: float = 1.0):
+        self.weight = weight
+        self.goals = (0, 0)
+
+    @staticmethod
+    def get_goals(game: Game, player: PlayerHandler) -> tuple[int, int]:
+        if player.team == TeamID.BLUE:
+            return game.score.blue, game.score.red
+        return game.score.red, game.score.blue
+
+    def reset(self, game: Game, player: PlayerHandler) -> None:
+        self.goals = self.get_goals(game, player)
+
+    def get_reward(self, game: Game, player: PlayerHandler, _done: bool) -> float:
+        goals = self.get_goals(game, player)
+        scored = goals[0] - self.goals[0]
+        conceded = goals[1] - self.goals[1]
+        self.goals = goals
+        return self.weight * (scored - conceded)
+
+
+class TouchReward(Reward):
+    """
+    +weight for every touch of the ball counted by the PlayerData of the player
+    """
+
+    def __init__(self, weight: float = 0.1):
+        self.weight = weight
+        self.number_touch = 0
+
+    def reset(self, _game: Game, player: PlayerHandler) -> None:
+        self.number_touch = player.player_data.number_touch
+
+    def get_reward(self, _game: Game, player: PlayerHandler, _done: bool) -> float:
+        number_touch = player.player_data.number_touch
+        touches = number_touch - self.number_touch
+        self.number_touch = number_touch
+        return self.weight * touches
+
+
+class WinReward(Reward):
+    """
+    +weight when the team of the player wins the game, -weight when it loses
+    """
+
+    def __init__(self, weight: float = 1.0):
+        self.weight = weight
+
+    def get_reward(self, game: Game, player: PlayerHandler, done: bool) -> float:
+        if not done:
+            return 0.0
+        winner = game.score.get_winner()
+        if winner == TeamID.SPECTATOR:
+            return 0.0
+        return self.weight if winner == player.team else -self.weight
+
+
+class CombinedReward(Reward):
+    """
+    Sum of several rewards
+    """
+
+    def __init__(self, *rewards: Reward):
+        self.rewards = rewards
+
+    def reset(self, game: Game, player: PlayerHandler) -> None:
+        for reward in self.rewards:
+            reward.reset(game, player)
+
+    def get_reward(self, game: Game, player: PlayerHandler, done: bool) -> float:
+        return sum(reward.get_reward(game, player, done) for reward in self.rewards)
@@ -3,23 +3,39 @@ from __future__ import annotations
 import copy
 import logging
 from collections.abc import Sequence
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 import numpy as np
 from numpy.typing import NDArray
 
-from ursinaxball.common_values import CollisionFlag, GameState, TeamID
+from ursinaxball.common_values import (
+    ActionBin,
+    CollisionFlag,
+    GameState,
+    PhysicsBackend,
+    TeamID,
+)
 from ursinaxball.modules import (
     GameActionRecorder,
-    GameRenderer,
+    GameActionStreamRecorder,
     GameScore,
     PlayerHandler,
-    resolve_collisions,
     update_discs,
 )
+from ursinaxball.modules.physics import (
+    NUMBA_AVAILABLE,
+    GoalDetector,
+    get_collision_solver,
+)
+from ursinaxball.modules.player import MovementResolver
 from ursinaxball.modules.systems.game_config import GameConfig
-from ursinaxball.objects.base import Disc
-from ursinaxball.objects.stadium_object import Stadium, load_stadium_hbs
+from ursinaxball.modules.systems.game_recorder import input_translate_py
+from ursinaxball.objects.stadium_object import Stadium, load_stadium_compiled
+
+if TYPE_CHECKING:
+    from ursinaxball.modules import GameRenderer
+    from ursinaxball.modules.physics import CompiledTick
+    from ursinaxball.objects.base import Disc
 
 log = logging.getLogger(__name__)
 
@@ -62,25 +78,50 @@ class Game:
         self.score = GameScore()
         self.state = GameState.KICKOFF
         self.players: list[PlayerHandler] = []
+        self.players_by_id: dict[int, PlayerHandler] = {}
+        # Rows of the discs of the players in the physics world, set by start
+        self.player_disc_indices: NDArray[np.intp] = np.zeros(0, dtype=np.intp)
+        # Actions of the last step, one row per player, set by start
+        self.actions: NDArray[np.int_] = np.zeros((0, len(DEFAULT_ACTION)), dtype=int)
+        self.movement_resolver: MovementResolver | None = None
         self.team_kickoff = TeamID.RED
         self.stadium_file = config.stadium_file
-        self.stadium_store: Stadium = load_stadium_hbs(self.stadium_file)
+        self.stadium_store: Stadium = load_stadium_compiled(self.stadium_file)
         self.stadium_game: Stadium = copy.deepcopy(self.stadium_store)
         self.enable_recorder = config.enable_recorder
         self.recorder: GameActionRecorder | None = (
-            GameActionRecorder(self, config.folder_rec)
-            if config.enable_recorder
-            else None
+            self.make_recorder() if config.enable_recorder else None
         )
         self.enable_renderer = config.enable_renderer
-        self.renderer: GameRenderer | None = (
-            GameRenderer(self, config.enable_vsync, config.fov)
-            if config.enable_renderer
-            else None
-        )
+        self.renderer: GameRenderer | None = None
+        if config.enable_renderer:
+            # Imported here so that headless games never load ursina
+            from ursinaxball.modules.systems.game_renderer import GameRenderer
+
+            self.renderer = GameRenderer(self, config.enable_vsync, config.fov)
+        # Scoring discs and their positions saved before each tick
+        self.score_indices: NDArray[np.intp] = np.zeros(0, dtype=np.intp)
+        self.previous_score_positions: NDArray[np.float64] = np.zeros((0, 2))
+        self.current_score_positions: NDArray[np.float64] = np.zeros((0, 2))
+        self.goal_detector = GoalDetector(self.stadium_game)
+        self.resolve_collisions = get_collision_solver(config.physics_backend)
+        self.compiled_tick: CompiledTick | None = None
+        self.enable_compiled_tick = config.physics_backend == PhysicsBackend.NUMBA
+        if self.enable_compiled_tick and not NUMBA_AVAILABLE:
+            log.warning("Numba is not installed, falling back to the scalar backend")
+            self.enable_compiled_tick = False
+        # State of the world right after start, loaded back by a cheap reset
+        self.initial_state: NDArray[np.float64] | None = None
+        self.initial_players: list[PlayerHandler] = []
+
+    def make_recorder(self) -> GameActionRecorder:
+        if self.config.stream_recorder:
+            return GameActionStreamRecorder(self, self.config.folder_rec)
+        return GameActionRecorder(self, self.config.folder_rec)
 
     def add_player(self, player: PlayerHandler) -> None:
         self.players.append(player)
+        self.players_by_id[player.id] = player
 
     def add_players(self, players: list[PlayerHandler]) -> None:
         for player in players:
@@ -91,46 +132,43 @@ class Game:
         player.resolve_movement(self.stadium_game, self.score)
 
     def get_player_by_id(self, player_id: int) -> PlayerHandler | None:
-        for player in self.players:
-            if player.id == player_id:
-                return player
-        return None
+        return self.players_by_id.get(player_id)
+
+    def get_disc_player(self, disc: Disc) -> PlayerHandler | None:
+        """
+        Returns the player controlling the disc, None for the discs of the stadium
+        """
+        return self.players_by_id.get(disc.player_id)
 
     def load_map(self, map_file: str) -> None:
         """
         Loads a map from a hbs file.
         """
         self.stadium_file = map_file
-        self.stadium_store: Stadium = load_stadium_hbs(map_file)
+        self.stadium_store: Stadium = load_stadium_compiled(map_file)
         self.stadium_game: Stadium = copy.deepcopy(self.stadium_store)
+        self.initial_state = None
 
-    def check_goal(self, previous_discs_position: list[Disc]) -> int:
-        current_disc_position = [
-            disc
-            for disc in self.stadium_game.discs
-            if disc.collision_group & CollisionFlag.SCORE != 0
-        ]
-        for previous_disc_pos, current_disc_pos in zip(
-            previous_discs_position, current_disc_position
-        ):
-            for goal in self.stadium_game.goals:
-                previous_p0 = previous_disc_pos.position - goal.points[0]
-                current_p0 = current_disc_pos.position - goal.points[0]
-                current_p1 = current_disc_pos.position - goal.points[1]
-                disc_vector = current_disc_pos.position - previous_disc_pos.position
-                goal_vector = goal.points[1] - goal.points[0]
-                if (
-                    np.cross(current_p0, disc_vector)
-                    * np.cross(current_p1, disc_vector)
-                    <= 0
-                    and np.cross(previous_p0, goal_vector)
-                    * np.cross(current_p0, goal_vector)
-                    <= 0
-                ):
-                    team_score = TeamID.RED if goal.team == "red" else TeamID.BLUE
-                    return team_score
-
-        return TeamID.SPECTATOR
+    def check_goal(self, previous_positions: np.ndarray) -> int:
+        """
+        Checks if a scoring disc crossed a goal line during the last tick.
+
+        Args:
+            previous_positions: Positions of the scoring discs before the tick,
+                in the order of self.score_indices
+
+        Returns:
+            int: Team that conceded the goal, SPECTATOR if none
+        """
+        np.take(
+            self.stadium_game.world.position,
+            self.score_indices,
+            axis=0,
+            out=self.current_score_positions,
+        )
+        return self.goal_detector.check(
+            previous_positions, self.current_score_positions
+        )
 
     def _handle_kickoff_state(self) -> None:
         """Handle the KICKOFF state logic."""
@@ -150,13 +188,12 @@ class Game:
             log.debug("Kickoff made")
             self.state = GameState.PLAYING
 
-    def _handle_playing_state(self, previous_discs_position: list[Disc]) -> None:
+    def _handle_playing_state(self, team_goal: int) -> None:
         """Handle the PLAYING state logic."""
         for player in self.players:
             if player.disc.position is not None:
                 player.disc.collision_mask = CollisionFlag.PLAYER_COLLISION
 
-        team_goal = self.check_goal(previous_discs_position)
         if team_goal != TeamID.SPECTATOR:
             team_goal_string = "Red" if team_goal == TeamID.RED else "Blue"
             log.debug(f"Team {team_goal_string} conceded a goal")
@@ -186,12 +223,29 @@ class Game:
         self.score.animation_timeout -= 1
         return not self.score.is_animation()
 
-    def handle_game_state(self, previous_discs_position: list[Disc]) -> bool:
+    def handle_game_state(self, previous_positions: np.ndarray) -> bool:
         """
         Handle the game state machine and transitions.
 
         Args:
-            previous_discs_position: List of disc positions from previous step
+            previous_positions: Positions of the scoring discs before the tick
+
+        Returns:
+            bool: True if game is done, False otherwise
+        """
+        team_goal = (
+            self.check_goal(previous_positions)
+            if self.state == GameState.PLAYING
+            else TeamID.SPECTATOR
+        )
+        return self.update_game_state(team_goal)
+
+    def update_game_state(self, team_goal: int) -> bool:
+        """
+        Advance the game state machine by one tick.
+
+        Args:
+            team_goal: Team that conceded a goal during the tick, SPECTATOR if none
 
         Returns:
             bool: True if game is done, False otherwise
@@ -201,7 +255,7 @@ class Game:
         if self.state == GameState.KICKOFF:
             self._handle_kickoff_state()
         elif self.state == GameState.PLAYING:
-            self._handle_playing_state(previous_discs_position)
+            self._handle_playing_state(team_goal)
         elif self.state == GameState.GOAL:
             self._handle_goal_state()
         elif self.state == GameState.END:
@@ -233,7 +287,6 @@ class Game:
             player.disc.collision_group |= (
                 CollisionFlag.RED if player.team == TeamID.RED else CollisionFlag.BLUE
             )
-            player.disc.player_id = player.id
             player.set_color()
 
             if player.team == TeamID.RED:
@@ -266,33 +319,93 @@ class Game:
                     )
                 blue_count += 1
 
+    def _prepare_goal_detection(self) -> None:
+        """
+        Finds the scoring discs and allocates the buffer of their positions
+        """
+        world = self.stadium_game.world
+        self.score_indices = np.flatnonzero(world.collision_group & CollisionFlag.SCORE)
+        self.previous_score_positions = np.zeros((len(self.score_indices), 2))
+        self.current_score_positions = np.zeros((len(self.score_indices), 2))
+        self.goal_detector = GoalDetector(self.stadium_game)
+
     def start(self) -> None:
         for player in self.players:
+            player.disc.player_id = player.id
             self.stadium_game.discs.append(player.disc)
+        self.stadium_game.build_world()
+        self.players_by_id = {player.id: player for player in self.players}
+        self.player_disc_indices = np.array(
+            [player.disc.index for player in self.players], dtype=np.intp
+        )
+        self.actions = np.zeros((len(self.players), len(DEFAULT_ACTION)), dtype=int)
+        for row, player in enumerate(self.players):
+            player.bind_action(self.actions, row)
         self.reset_discs_positions()
+        self._prepare_goal_detection()
+        self.movement_resolver = MovementResolver(self.stadium_game, self.players)
+        world = self.stadium_game.world
+        self.initial_state = np.empty(world.state_size)
+        world.save_state(self.initial_state)
+        self.initial_players = list(self.players)
+        if self.enable_compiled_tick:
+            from ursinaxball.modules.physics.jit_tick import CompiledTick
+
+            self.compiled_tick = CompiledTick(self.stadium_game, self.players)
         if self.recorder is not None:
             self.recorder.start()
         if self.renderer is not None:
             self.renderer.start()
 
-    def step(self, actions: ActionsType) -> bool:
-        if isinstance(actions, (list, tuple)):
+    def get_actions_array(self, actions: ActionsType) -> NDArray[np.integer]:
+        """
+        Convert the actions given to step into an integer array of shape (P, 3).
+
+        Every format must hold one row per player, in the order of the players.
+        Integer arrays of shape (P, 3), such as a preallocated int8 buffer, are
+        checked and returned as is, with directions in [-1, 1] and kicks in
+        [0, 1]. Integer arrays of shape (P,) hold the packed Input flags of each
+        player. Any other array or sequence is converted row by row with
+        normalize_action.
+        """
+        is_integer = isinstance(actions, np.ndarray) and actions.dtype.kind in "iu"
+        if is_integer and actions.ndim == 1:
+            array = input_translate_py(actions)
+        elif (
+            is_integer and actions.ndim == 2 and actions.shape[1] == len(DEFAULT_ACTION)
+        ):
+            if actions.size > 0 and (
+                actions.min() < -1
+                or actions.max() > 1
+                or actions[:, ActionBin.KICK].min() < 0
+            ):
+                raise ValueError(
+                    "Directions must be in [-1, 1] and kicks in [0, 1], "
+                    f"got {actions.tolist()}"
+                )
+            array = actions
+        else:
             # Convert sequence of actions to numpy array, handling None values
             actions_list = [normalize_action(action) for action in actions]
-            actions = np.array(actions_list, dtype=np.int_)
-
-        # At this point actions is guaranteed to be a numpy array
-        for action, player in zip(actions, self.players):
-            self.make_player_action(player, action)
-
-        previous_discs_position = [
-            copy.deepcopy(disc)
-            for disc in self.stadium_game.discs
-            if disc.collision_group & CollisionFlag.SCORE != 0
-        ]
-        update_discs(self.stadium_game, self.players)
-        resolve_collisions(self.stadium_game)
-        done = self.handle_game_state(previous_discs_position)
+            array = np.array(actions_list, dtype=np.int_).reshape(
+                -1, len(DEFAULT_ACTION)
+            )
+
+        if len(array) != len(self.players):
+            raise ValueError(
+                f"Expected the actions of {len(self.players)} players, got {len(array)}"
+            )
+        return array
+
+    def step(self, actions: ActionsType) -> bool:
+        actions = self.get_actions_array(actions)
+        # The players read their row from there when their action is needed
+        np.copyto(self.actions, actions)
+
+        if self.compiled_tick is not None:
+            done = self._step_compiled(actions)
+        else:
+            done = self._step_python(actions)
         if self.recorder is not None:
             self.recorder.step(actions)  # type: ignore
         if self.renderer is not None:
@@ -300,7 +413,29 @@ class Game:
 
         return done
 
-    def stop(self, save_recording: bool) -> None:
+    def _step_python(self, actions: NDArray[np.int_]) -> bool:
+        """Step the physics and the game state with the Python backends."""
+        self.movement_resolver.resolve(actions, self.score)
+
+        np.take(
+            self.stadium_game.world.position,
+            self.score_indices,
+            axis=0,
+            out=self.previous_score_positions,
+        )
+        update_discs(self.stadium_game, self.players, self.player_disc_indices)
+        self.resolve_collisions(self.stadium_game, self.config.enable_disc_broadphase)
+        return self.handle_game_state(self.previous_score_positions)
+
+    def _step_compiled(self, actions: NDArray[np.int_]) -> bool:
+        """Step the physics with the fused tick kernel, then the game state."""
+        team_goal = self.compiled_tick.step(
+            actions, self.score, self.state == GameState.PLAYING
+        )
+        return self.update_game_state(team_goal)
+
+    def _end_episode(self, save_recording: bool) -> None:
+        """Stop the recorder and the score of the current episode."""
         if self.recorder is not None:
             self.recorder.stop(save=save_recording)
             if save_recording:
@@ -314,15 +449,103 @@ class Game:
         self.score.stop()
         self.state = GameState.KICKOFF
         self.team_kickoff = TeamID.RED
-        self.stadium_game: Stadium = copy.deepcopy(self.stadium_store)
         if self.recorder is not None:
-            self.recorder = GameActionRecorder(self, self.config.folder_rec)
+            self.recorder = self.make_recorder()
+
+    def stop(self, save_recording: bool) -> None:
+        self._end_episode(save_recording)
+        self.stadium_game: Stadium = copy.deepcopy(self.stadium_store)
+        self.initial_state = None
         if self.renderer is not None:
             self.renderer.stop()
 
     def reset(self, save_recording: bool) -> None:
-        self.stop(save_recording)
-        self.start()
+        """
+        Stop the current episode and start a new one.
+
+        Once the game has been started, the stadium is reused: only the state
+        of the physics world is overwritten with the one saved by start, so no
+        object of the stadium is copied. The stadium is rebuilt from the stored
+        one if the players changed since the last start.
+        """
+        if self.initial_state is None or self.initial_players != self.players:
+            self.stop(save_recording)
+            self.start()
+            return
+
+        self._end_episode(save_recording)
+        self.stadium_game.world.load_state(self.initial_state)
+        if self.recorder is not None:
+            self.recorder.start()
+        if self.renderer is not None:
+            self.renderer.stop()
+            self.renderer.start()
+
+    @property
+    def snapshot_size(self) -> int:
+        """Number of values of a snapshot of the started game."""
+        return (
+            self.stadium_game.world.state_size
+            + 2 * len(self.players)
+            + len(GameScore.COUNTERS)
+            + 2
+        )
+
+    def snapshot(self, out: NDArray[np.float64] | None = None) -> NDArray[np.float64]:
+        """
+        Save the dynamic state of the started game into a flat float array.
+
+        The buffer holds the state arrays of the physics world, the kick flags
+        of every player, the counters of the score, the state of the game and
+        the team of the kickoff. It can be loaded back with restore.
+
+        Args:
+            out: Buffer of size snapshot_size to write into, allocated if None
+
+        Returns:
+            NDArray[np.float64]: The snapshot
+        """
+        if out is None:
+            out = np.empty(self.snapshot_size)
+        elif len(out) != self.snapshot_size:
+            raise ValueError(
+                f"Snapshot must have size {self.snapshot_size}, got {len(out)}"
+            )
+        world = self.stadium_game.world
+        world.save_state(out)
+        offset = world.state_size
+        for player in self.players:
+            out[offset] = player.kicking
+            out[offset + 1] = player._kick_cancel  # noqa: SLF001
+            offset += 2
+        out[offset : offset + len(GameScore.COUNTERS)] = self.score.get_counters()
+        out[-2] = self.state
+        out[-1] = self.team_kickoff
+        return out
+
+    def restore(self, snapshot: NDArray[np.float64]) -> None:
+        """
+        Load a snapshot of this game back, taken with the same players.
+
+        Args:
+            snapshot: Buffer returned by snapshot
+        """
+        if len(snapshot) != self.snapshot_size:
+            raise ValueError(
+                f"Snapshot must have size {self.snapshot_size}, got {len(snapshot)}"
+            )
+        world = self.stadium_game.world
+        world.load_state(snapshot)
+        offset = world.state_size
+        for player in self.players:
+            player.kicking = bool(snapshot[offset])
+            player._kick_cancel = bool(snapshot[offset + 1])  # noqa: SLF001
+            offset += 2
+        self.score.set_counters(
+            snapshot[offset : offset + len(GameScore.COUNTERS)].tolist()
+        )
+        self.state = GameState(int(snapshot[-2]))
+        self.team_kickoff = TeamID(int(snapshot[-1]))
 
 
 if __name__ == "__main__":
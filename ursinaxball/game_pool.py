@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import logging
+import multiprocessing as mp
+import traceback
+import weakref
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ursinaxball.common_values import TeamID
+from ursinaxball.game import Game
+from ursinaxball.modules import GameScore, PlayerHandler
+from ursinaxball.modules.systems.game_config import GameConfig
+from ursinaxball.objects import load_stadium_compiled
+
+log = logging.getLogger(__name__)
+
+GamePoolType = TypeVar("GamePoolType", bound="GamePool")
+
+
+def get_layout(
+    num_workers: int, num_players: int, num_discs: int
+) -> dict[str, tuple[tuple[int, ...], type]]:
+    """
+    Returns the shape and dtype of every array of the shared memory block
+    """
+    return {
+        "actions": ((num_workers, num_players, 3), np.int64),
+        "position": ((num_workers, num_discs, 2), np.float64),
+        "velocity": ((num_workers, num_discs, 2), np.float64),
+        "score": ((num_workers, 2), np.int64),
+        "ticks": ((num_workers,), np.int64),
+        "state": ((num_workers,), np.int64),
+        "dones": ((num_workers,), np.bool_),
+        "winners": ((num_workers,), np.int64),
+    }
+
+
+def map_arrays(
+    buffer: memoryview, layout: dict[str, tuple[tuple[int, ...], type]]
+) -> dict[str, np.ndarray]:
+    """
+    Returns the arrays of the layout, packed one after the other in the buffer
+    """
+    arrays = {}
+    offset = 0
+    for name, (shape, dtype) in layout.items():
+        array = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        arrays[name] = array
+        # Every array starts on an 8 bytes boundary
+        offset += -(-array.nbytes // 8) * 8
+    return arrays
+
+
+def get_buffer_size(layout: dict[str, tuple[tuple[int, ...], type]]) -> int:
+    return sum(
+        -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+        for shape, dtype in layout.values()
+    )
+
+
+def write_game(arrays: dict[str, np.ndarray], index: int, game: Game) -> None:
+    """
+    Writes the state of a game into its row of the shared arrays
+    """
+    world = game.stadium_game.world
+    arrays["position"][index] = world.position
+    arrays["velocity"][index] = world.velocity
+    arrays["score"][index] = (game.score.red, game.score.blue)
+    arrays["ticks"][index] = game.score.ticks
+    arrays["state"][index] = game.state
+
+
+def run_worker(
+    index: int,
+    connection: Connection,
+    memory_name: str,
+    layout: dict[str, tuple[tuple[int, ...], type]],
+    config: GameConfig,
+    players: list[tuple[str, int]],
+    time_limit: int | None,
+    score_limit: int | None,
+) -> None:
+    """
+    Runs one game of a GamePool, driven by the commands received on connection
+    """
+    memory = SharedMemory(name=memory_name)
+    arrays = map_arrays(memory.buf, layout)
+    try:
+        game = Game(config)
+        game.score = GameScore(time_limit=time_limit, score_limit=score_limit)
+        game.add_players([PlayerHandler(name, team) for name, team in players])
+        game.start()
+        write_game(arrays, index, game)
+        connection.send(None)
+
+        while True:
+            command = connection.recv()
+            if command == "step":
+                done = game.step(arrays["actions"][index])
+                arrays["dones"][index] = done
+                if done:
+                    arrays["winners"][index] = game.score.get_winner()
+                    game.reset(save_recording=False)
+            elif command == "reset":
+                arrays["dones"][index] = False
+                game.reset(save_recording=False)
+            elif command == "close":
+                game.stop(save_recording=False)
+                break
+            write_game(arrays, index, game)
+            connection.send(None)
+    except Exception:
+        connection.send(traceback.format_exc())
+    finally:
+        del arrays
+        memory.close()
+        connection.close()
+
+
+def unlink_memory(memory: SharedMemory) -> None:
+    """
+    Removes a shared memory block that was not released by its owner
+    """
+    with contextlib.suppress(FileNotFoundError):
+        memory.unlink()
+
+
+class GamePool:
+    """
+    N headless games running in separate worker processes.
+
+    Each worker builds its own Game from the config, so no stadium is ever
+    pickled. The actions, and the positions, velocities, score and state of
+    every game, are exchanged through one shared memory block; only short
+    commands go through the pipes. Games that are done are reset by their
+    worker before the step returns, the `winners` array keeps their winner
+    until the pool is reset.
+
+    Use the pool as a context manager, or call close, to stop the workers. A
+    pool collected without being closed still unlinks its shared memory.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        config: GameConfig | None = None,
+        time_limit: int | None = None,
+        score_limit: int | None = None,
+        start_method: str | None = None,
+        **kwargs,
+    ):
+        if config is None:
+            config = GameConfig(**kwargs)
+
+        self.config = dataclasses.replace(
+            config, enable_renderer=False, enable_recorder=False
+        )
+        self.num_workers = num_workers
+        self.time_limit = time_limit
+        self.score_limit = score_limit
+        self.context = mp.get_context(start_method)
+        self.players: list[tuple[str, int]] = []
+
+        self.memory: SharedMemory | None = None
+        self.arrays: dict[str, np.ndarray] = {}
+        self.connections: list[Connection] = []
+        self.processes: list[mp.Process] = []
+        self.waiting = False
+        self.finalizer: weakref.finalize | None = None
+
+    def __enter__(self: GamePoolType) -> GamePoolType:
+        return self
+
+    def __exit__(self, *_args) -> None:
+        self.close()
+
+    @property
+    def num_players(self) -> int:
+        return len(self.players)
+
+    def add_player(self, name: str, team: int) -> None:
+        """
+        Adds a player with the same name and team to every game
+        """
+        self.players.append((name, team))
+
+    def start(self) -> None:
+        """
+        Allocates the shared memory and starts the workers
+        """
+        num_discs = len(load_stadium_compiled(self.config.stadium_file).discs)
+        layout = get_layout(
+            self.num_workers, self.num_players, num_discs + self.num_players
+        )
+        self.memory = SharedMemory(create=True, size=get_buffer_size(layout))
+        self.finalizer = weakref.finalize(self, unlink_memory, self.memory)
+        self.arrays = map_arrays(self.memory.buf, layout)
+        for array in self.arrays.values():
+            array.fill(0)
+
+        try:
+            for index in range(self.num_workers):
+                parent_connection, worker_connection = self.context.Pipe()
+                process = self.context.Process(
+                    target=run_worker,
+                    args=(
+                        index,
+                        worker_connection,
+                        self.memory.name,
+                        layout,
+                        self.config,
+                        self.players,
+                        self.time_limit,
+                        self.score_limit,
+                    ),
+                    daemon=True,
+                )
+                process.start()
+                worker_connection.close()
+                self.connections.append(parent_connection)
+                self.processes.append(process)
+            self._wait()
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def position(self) -> NDArray[np.float64]:
+        """(N, D, 2) positions of the discs of every game"""
+        return self.arrays["position"]
+
+    @property
+    def velocity(self) -> NDArray[np.float64]:
+        """(N, D, 2) velocities of the discs of every game"""
+        return self.arrays["velocity"]
+
+    @property
+    def score(self) -> NDArray[np.int64]:
+        """(N, 2) red and blue scores of every game"""
+        return self.arrays["score"]
+
+    @property
+    def ticks(self) -> NDArray[np.int64]:
+        return self.arrays["ticks"]
+
+    @property
+    def state(self) -> NDArray[np.int64]:
+        return self.arrays["state"]
+
+    @property
+    def winners(self) -> NDArray[np.int64]:
+        """Winner of the last finished game of every worker, SPECTATOR if none"""
+        return self.arrays["winners"]
+
+    def step_async(self, actions: NDArray[np.int_]) -> None:
+        """
+        Sends the actions of shape (N, P, 3) and starts stepping every game
+        """
+        if self.waiting:
+            raise RuntimeError("The previous step has not been waited for")
+        expected_shape = self.arrays["actions"].shape
+        actions = np.asarray(actions)
+        if actions.shape != expected_shape:
+            raise ValueError(
+                f"Actions must have shape {expected_shape}, got {actions.shape}"
+            )
+        self.arrays["actions"][:] = actions
+        self._send("step")
+
+    def step_wait(self) -> NDArray[np.bool_]:
+        """
+        Waits for the games stepped by step_async.
+
+        Returns:
+            NDArray[np.bool_]: Array of shape (N,), True where the game is done.
+                Those games are already reset when the step returns.
+        """
+        if not self.waiting:
+            raise RuntimeError("No step is running")
+        self._wait()
+        return self.arrays["dones"].copy()
+
+    def step(self, actions: NDArray[np.int_]) -> NDArray[np.bool_]:
+        """
+        Steps every game by one tick, see step_async and step_wait
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def reset(self) -> None:
+        """
+        Resets every game
+        """
+        self._send("reset")
+        self._wait()
+        self.winners.fill(TeamID.SPECTATOR)
+
+    def close(self) -> None:
+        """
+        Stops the workers and releases the shared memory
+        """
+        if self.memory is None:
+            return
+        try:
+            if self.waiting:
+                self._wait()
+        finally:
+            for connection, process in zip(self.connections, self.processes):
+                if process.is_alive():
+                    # A failed worker may exit and close its end in the meantime
+                    with contextlib.suppress(OSError):
+                        connection.send("close")
+                process.join()
+                connection.close()
+
+            self.finalizer.detach()
+            self.arrays = {}
+            unlink_memory(self.memory)
+            try:
+                self.memory.close()
+            except BufferError:
+                log.warning("Arrays of the game pool are still referenced after close")
+            self.memory = None
+            self.connections = []
+            self.processes = []
+
+    def _send(self, command: str) -> None:
+        for connection in self.connections:
+            connection.send(command)
+        self.waiting = True
+
+    def _wait(self) -> None:
+        errors = [connection.recv() for connection in self.connections]
+        self.waiting = False
+        for error in errors:
+            if error is not None:
+                raise RuntimeError(f"A worker of the game pool failed:\n{error}")
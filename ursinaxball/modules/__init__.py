@@ -1,20 +1,42 @@
+from typing import TYPE_CHECKING
+
 from .bots import Bot, ChaseBot, ConstantActionBot, GoalkeeperBot, RandomBot
 from .physics import resolve_collisions, update_discs
 from .player import PlayerData, PlayerHandler
-from .systems import GameActionRecorder, GamePositionRecorder, GameRenderer, GameScore
+from .systems import (
+    GameActionRecorder,
+    GameActionStreamRecorder,
+    GamePositionRecorder,
+    GameScore,
+    ObservationBuilder,
+)
+
+if TYPE_CHECKING:
+    from .systems import GameRenderer
 
 __all__ = [
     "Bot",
     "ChaseBot",
     "ConstantActionBot",
     "GameActionRecorder",
+    "GameActionStreamRecorder",
     "GamePositionRecorder",
     "GameRenderer",
     "GameScore",
     "GoalkeeperBot",
+    "ObservationBuilder",
     "PlayerData",
     "PlayerHandler",
     "RandomBot",
     "resolve_collisions",
     "update_discs",
 ]
+
+
+def __getattr__(name: str):
+    # See ursinaxball.modules.systems, the renderer is imported on first use
+    if name == "GameRenderer":
+        from .systems import GameRenderer
+
+        return GameRenderer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,28 @@
+from typing import TYPE_CHECKING
+
+from .backends import NUMBA_AVAILABLE, get_collision_solver
+from .goal_detector import GoalDetector
 from .physics_handler import resolve_collisions, update_discs
+from .scalar_handler import resolve_collisions_scalar
+
+if TYPE_CHECKING:
+    from .jit_tick import CompiledTick
 
 __all__ = [
+    "NUMBA_AVAILABLE",
+    "CompiledTick",
+    "GoalDetector",
+    "get_collision_solver",
     "resolve_collisions",
+    "resolve_collisions_scalar",
     "update_discs",
 ]
+
+
+def __getattr__(name: str):
+    # The fused kernel imports Numba, so it is only loaded once it is used
+    if name == "CompiledTick":
+        from .jit_tick import CompiledTick
+
+        return CompiledTick
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import importlib.util
+from collections.abc import Callable
+
+from ursinaxball.common_values import PhysicsBackend
+from ursinaxball.modules.physics.physics_handler import resolve_collisions
+from ursinaxball.modules.physics.scalar_handler import resolve_collisions_scalar
+from ursinaxball.objects import Stadium
+
+CollisionSolver = Callable[[Stadium, bool], None]
+
+# Numba takes a while to import, so it is only looked up here and imported by
+# jit_tick once a game uses the fused kernel
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+COLLISION_SOLVERS: dict[PhysicsBackend, CollisionSolver] = {
+    PhysicsBackend.NUMPY: resolve_collisions,
+    PhysicsBackend.SCALAR: resolve_collisions_scalar,
+    # Used for the ticks the fused kernel cannot step, or without Numba
+    PhysicsBackend.NUMBA: resolve_collisions_scalar,
+}
+
+
+def get_collision_solver(backend: PhysicsBackend) -> CollisionSolver:
+    """
+    Returns the function resolving the collisions of a stadium with a backend
+    """
+    return COLLISION_SOLVERS[PhysicsBackend(backend)]
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import numpy as np
+
+from ursinaxball.modules.physics.fn_batch import (
+    resolve_disc_disc_collision_batch,
+    resolve_disc_plane_collision_batch,
+    resolve_disc_segment_collision_curve_batch,
+    resolve_disc_segment_collision_no_curve_batch,
+    resolve_disc_segment_final_batch,
+    resolve_disc_vertex_collision_batch,
+    segment_apply_bias_batch,
+)
+from ursinaxball.modules.physics.physics_handler import DISC_PRUNE_MARGIN
+from ursinaxball.objects import BatchPhysicsWorld, Stadium
+from ursinaxball.objects.base import Segment
+
+
+def can_collide(
+    group_a: np.ndarray, mask_a: np.ndarray, group_b: int, mask_b: int
+) -> np.ndarray:
+    """
+    Returns where the collision flags of two objects let them collide
+    """
+    return ((group_a & mask_b) != 0) & ((mask_a & group_b) != 0)
+
+
+def resolve_segment_collision_batch(
+    segment: Segment,
+    position: np.ndarray,
+    velocity: np.ndarray,
+    radius: np.ndarray,
+    bouncing: np.ndarray,
+    active: np.ndarray,
+) -> None:
+    """
+    Resolves the collision between a segment and one disc of every stadium
+    """
+    if segment.curve == 0:
+        facing, dist, normal = resolve_disc_segment_collision_no_curve_batch(
+            position,
+            segment.vertices[0].position,
+            segment.vertices[1].position,
+            active,
+        )
+    else:
+        facing, dist, normal = resolve_disc_segment_collision_curve_batch(
+            position,
+            segment.circle_center,
+            segment.circle_radius,
+            segment.circle_tangeant[0],
+            segment.circle_tangeant[1],
+            segment.curve,
+            active,
+        )
+
+    if len(facing) == 0:
+        return
+
+    dist, normal = segment_apply_bias_batch(segment.bias, dist, normal)
+    resolve_disc_segment_final_batch(
+        facing,
+        dist,
+        normal,
+        position,
+        velocity,
+        radius,
+        bouncing,
+        segment.bouncing_coefficient,
+    )
+
+
+def prune_partners_batch(
+    x: np.ndarray, reach: np.ndarray, index: int, partners: np.ndarray
+) -> np.ndarray:
+    """
+    Returns, in order, the partners whose extent overlaps the one of the disc
+    `index` along the x axis in any of the stadiums
+    """
+    near = np.abs(x[:, partners] - x[:, index, np.newaxis]) <= (
+        reach[:, partners] + reach[:, index, np.newaxis]
+    )
+    return partners[near.any(axis=0)]
+
+
+def resolve_collisions_batch(
+    world: BatchPhysicsWorld, stadium: Stadium, disc_broadphase: bool = False
+) -> None:
+    """
+    Resolves the collisions of K stadiums sharing the static objects of `stadium`.
+    Pairs are visited in the same order as resolve_collisions, each pair being
+    resolved across the whole batch at once. Segments and vertices are narrowed
+    down to the ones near the disc in any of the stadiums, and with
+    `disc_broadphase` so are the partners of the disc.
+    """
+    position = world.position
+    velocity = world.velocity
+    radius = world.radius
+    inverse_mass = world.inverse_mass
+    bouncing = world.bouncing_coefficient
+    group = world.collision_group
+    mask = world.collision_mask
+
+    # Pairs that cannot collide in any stadium are skipped entirely
+    movable = inverse_mass != 0
+    pairs = stadium.get_collision_pairs(
+        np.bitwise_or.reduce(group, axis=0),
+        np.bitwise_or.reduce(mask, axis=0),
+        movable.any(axis=0),
+    )
+    x = position[..., 0]
+    reach = radius + DISC_PRUNE_MARGIN / 2
+
+    def resolve_pair(i: int, j: int) -> bool:
+        return resolve_disc_disc_collision_batch(
+            position[:, i],
+            position[:, j],
+            velocity[:, i],
+            velocity[:, j],
+            radius[:, i],
+            radius[:, j],
+            inverse_mass[:, i],
+            inverse_mass[:, j],
+            bouncing[:, i],
+            bouncing[:, j],
+            can_collide(group[:, i], mask[:, i], group[:, j], mask[:, j]),
+        )
+
+    for i, partners, planes, segments, vertices in pairs.discs:
+        group_i = group[:, i]
+        mask_i = mask[:, i]
+        position_i = position[:, i]
+        velocity_i = velocity[:, i]
+        radius_i = radius[:, i]
+        bouncing_i = bouncing[:, i]
+
+        if disc_broadphase and partners:
+            partner_array = pairs.partner_arrays[i]
+            candidates = prune_partners_batch(x, reach, i, partner_array)
+            while len(candidates) > 0:
+                j = int(candidates[0])
+                if resolve_pair(i, j):
+                    # The partners left are pruned again from the new positions
+                    candidates = prune_partners_batch(
+                        x, reach, i, partner_array[partner_array > j]
+                    )
+                else:
+                    candidates = candidates[1:]
+        else:
+            for j in partners:
+                resolve_pair(i, j)
+
+        movable_i = movable[:, i]
+        for p in planes:
+            resolve_disc_plane_collision_batch(
+                position_i,
+                p.normal,
+                velocity_i,
+                p.distance_origin,
+                radius_i,
+                bouncing_i,
+                p.bouncing_coefficient,
+                movable_i
+                & can_collide(group_i, mask_i, p.collision_group, p.collision_mask),
+            )
+        static = pairs.iter_nearby_static_batch(
+            i, position_i, radius_i, segments, vertices
+        )
+        for is_vertex, o in static:
+            active = movable_i & can_collide(
+                group_i, mask_i, o.collision_group, o.collision_mask
+            )
+            if is_vertex:
+                resolve_disc_vertex_collision_batch(
+                    position_i,
+                    o.position,
+                    velocity_i,
+                    radius_i,
+                    bouncing_i,
+                    o.bouncing_coefficient,
+                    active,
+                )
+            else:
+                resolve_segment_collision_batch(
+                    o, position_i, velocity_i, radius_i, bouncing_i, active
+                )
+
+
+def update_discs_batch(world: BatchPhysicsWorld) -> None:
+    """
+    Updates the position and velocity of the discs of every stadium.
+    The damping of the tick must already be stored in world.step_damping.
+    """
+    world.position += world.velocity
+    world.velocity += world.gravity
+    world.velocity *= world.step_damping[..., np.newaxis]
@@ -0,0 +1,261 @@
+"""
+Collision kernels of fn_base vectorized over a leading batch axis.
+
+Each kernel resolves one pair of objects in K stadiums at once. Disc state is
+given as (K, 2) and (K,) views into a batch world and updated in place, only
+for the stadiums where `active` is True. The arithmetic follows fn_base step
+by step, so the results are bit-identical to the per-stadium kernels.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+
+def dot(
+    vector_a: npt.NDArray[np.float64], vector_b: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Row-wise dot product of (..., 2) arrays.
+    A stacked matmul computes each row exactly like np.dot on 2-element vectors,
+    which an element-wise multiply-add does not (np.dot may fuse it).
+    """
+    vector_a, vector_b = np.broadcast_arrays(vector_a, vector_b)
+    return (vector_a[..., np.newaxis, :] @ vector_b[..., :, np.newaxis])[..., 0, 0]
+
+
+def norm(vector: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """
+    Row-wise norm of a (..., 2) array, computed like np.linalg.norm on each row
+    """
+    return np.sqrt(dot(vector, vector))
+
+
+def cross(
+    vector_a: npt.NDArray[np.float64], vector_b: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Row-wise cross product of (..., 2) arrays, computed like np.cross
+    """
+    return vector_a[..., 0] * vector_b[..., 1] - vector_a[..., 1] * vector_b[..., 0]
+
+
+def resolve_disc_disc_collision_batch(
+    position_a: npt.NDArray[np.float64],
+    position_b: npt.NDArray[np.float64],
+    velocity_a: npt.NDArray[np.float64],
+    velocity_b: npt.NDArray[np.float64],
+    radius_a: npt.NDArray[np.float64],
+    radius_b: npt.NDArray[np.float64],
+    inverse_mass_a: npt.NDArray[np.float64],
+    inverse_mass_b: npt.NDArray[np.float64],
+    bouncing_a: npt.NDArray[np.float64],
+    bouncing_b: npt.NDArray[np.float64],
+    active: npt.NDArray[np.bool_],
+) -> bool:
+    """
+    Returns whether the discs collided in any stadium
+    """
+    difference = position_a - position_b
+    dist = norm(difference)
+    radius_sum = radius_a + radius_b
+    hit = np.flatnonzero(active & (dist > 0) & (dist <= radius_sum))
+    if len(hit) == 0:
+        return False
+
+    dist = dist[hit, np.newaxis]
+    normal = difference[hit] / dist
+    mass_factor = (inverse_mass_a[hit] / (inverse_mass_a[hit] + inverse_mass_b[hit]))[
+        :, np.newaxis
+    ]
+    overlap = radius_sum[hit, np.newaxis] - dist
+    position_a[hit] += normal * overlap * mass_factor
+    position_b[hit] -= normal * overlap * (1 - mass_factor)
+    relative_velocity = velocity_a[hit] - velocity_b[hit]
+    normal_velocity = dot(relative_velocity, normal)
+
+    bounce = normal_velocity < 0
+    if bounce.any():
+        hit = hit[bounce]
+        normal = normal[bounce]
+        normal_velocity = normal_velocity[bounce, np.newaxis]
+        mass_factor = mass_factor[bounce]
+        bouncing_factor = -(1 + bouncing_a[hit] * bouncing_b[hit])[:, np.newaxis]
+        velocity_a[hit] += normal * normal_velocity * bouncing_factor * mass_factor
+        velocity_b[hit] -= (
+            normal * normal_velocity * bouncing_factor * (1 - mass_factor)
+        )
+
+    return True
+
+
+def resolve_disc_vertex_collision_batch(
+    position_disc: npt.NDArray[np.float64],
+    position_vertex: npt.NDArray[np.float64],
+    velocity: npt.NDArray[np.float64],
+    radius: npt.NDArray[np.float64],
+    bouncing_disc: npt.NDArray[np.float64],
+    bouncing_vertex: float,
+    active: npt.NDArray[np.bool_],
+) -> None:
+    difference = position_disc - position_vertex
+    dist = norm(difference)
+    hit = np.flatnonzero(active & (dist > 0) & (dist <= radius))
+    if len(hit) == 0:
+        return
+
+    dist = dist[hit, np.newaxis]
+    normal = difference[hit] / dist
+    position_disc[hit] += normal * (radius[hit, np.newaxis] - dist)
+    resolve_bounce_batch(
+        hit, normal, velocity, bouncing_disc[hit] * bouncing_vertex, normal
+    )
+
+
+def resolve_disc_segment_collision_no_curve_batch(
+    position_disc: npt.NDArray[np.float64],
+    position_vertex_0: npt.NDArray[np.float64],
+    position_vertex_1: npt.NDArray[np.float64],
+    active: npt.NDArray[np.bool_],
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Returns the stadiums where the disc faces the segment, with the signed
+    distance and the normal for each of them
+    """
+    normal_segment = position_vertex_1 - position_vertex_0
+    normal_disc_v0 = position_disc - position_vertex_0
+    normal_disc_v1 = position_disc - position_vertex_1
+    facing = np.flatnonzero(
+        active
+        & (dot(normal_segment, normal_disc_v0) > 0)
+        & (dot(normal_segment, normal_disc_v1) < 0)
+    )
+    normal = np.array([-normal_segment[1], normal_segment[0]]) / np.linalg.norm(
+        normal_segment
+    )
+    dist = dot(normal, normal_disc_v1[facing])
+    normal = np.broadcast_to(normal, (len(facing), 2))
+
+    return facing, dist, normal
+
+
+def resolve_disc_segment_collision_curve_batch(
+    position_disc: npt.NDArray[np.float64],
+    circle_center: npt.NDArray[np.float64],
+    circle_radius: float,
+    circle_tangeant_0: npt.NDArray[np.float64],
+    circle_tangeant_1: npt.NDArray[np.float64],
+    curve: float,
+    active: npt.NDArray[np.bool_],
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Returns the stadiums where the disc faces the arc, with the signed
+    distance and the normal for each of them
+    """
+    normal_circle = position_disc - circle_center
+    inside = (dot(normal_circle, circle_tangeant_0) > 0) & (
+        dot(normal_circle, circle_tangeant_1) > 0
+    )
+    dist_norm = norm(normal_circle)
+    facing = np.flatnonzero(active & (inside != (curve < 0)) & (dist_norm > 0))
+    dist_norm = dist_norm[facing]
+    dist = dist_norm - circle_radius
+    normal = normal_circle[facing] / dist_norm[:, np.newaxis]
+
+    return facing, dist, normal
+
+
+def segment_apply_bias_batch(
+    bias: float, dist: npt.NDArray[np.float64], normal: npt.NDArray[np.float64]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Applies the bias of a segment, the distance is infinite where it is ignored
+    """
+    if bias == 0:
+        flip = dist < 0
+        dist = np.where(flip, -dist, dist)
+        normal = np.where(flip[:, np.newaxis], -normal, normal)
+    elif bias < 0:
+        bias = -bias
+        dist = -dist
+        normal = -normal
+
+    dist = np.where(dist < -bias, np.inf, dist)
+
+    return dist, normal
+
+
+def resolve_disc_segment_final_batch(
+    facing: npt.NDArray[np.intp],
+    dist: npt.NDArray[np.float64],
+    normal: npt.NDArray[np.float64],
+    position_disc: npt.NDArray[np.float64],
+    velocity: npt.NDArray[np.float64],
+    radius: npt.NDArray[np.float64],
+    bouncing_disc: npt.NDArray[np.float64],
+    bouncing_segment: float,
+) -> None:
+    close = dist < radius[facing]
+    if not close.any():
+        return
+
+    hit = facing[close]
+    normal = normal[close]
+    position_disc[hit] += normal * (radius[hit] - dist[close])[:, np.newaxis]
+    resolve_bounce_batch(
+        hit, normal, velocity, bouncing_disc[hit] * bouncing_segment, normal
+    )
+
+
+def resolve_disc_plane_collision_batch(
+    position_disc: npt.NDArray[np.float64],
+    normal_plane: npt.NDArray[np.float64],
+    velocity: npt.NDArray[np.float64],
+    distance_plane: float,
+    radius: npt.NDArray[np.float64],
+    bouncing_disc: npt.NDArray[np.float64],
+    bouncing_plane: float,
+    active: npt.NDArray[np.bool_],
+) -> None:
+    norm_plane = normal_plane / np.linalg.norm(normal_plane)
+    dist = distance_plane - dot(position_disc, norm_plane) + radius
+    hit = np.flatnonzero(active & (dist > 0))
+    if len(hit) == 0:
+        return
+
+    position_disc[hit] += norm_plane * dist[hit, np.newaxis]
+    resolve_bounce_batch(
+        hit,
+        np.broadcast_to(norm_plane, (len(hit), 2)),
+        velocity,
+        bouncing_disc[hit] * bouncing_plane,
+        normal_plane,
+    )
+
+
+def resolve_bounce_batch(
+    hit: npt.NDArray[np.intp],
+    normal: npt.NDArray[np.float64],
+    velocity: npt.NDArray[np.float64],
+    bouncing: npt.NDArray[np.float64],
+    normal_impulse: npt.NDArray[np.float64],
+) -> None:
+    """
+    Reflects the velocity along the normal where the disc moves towards it.
+    The impulse is applied along `normal_impulse`, which differs from the
+    normal only for planes, whose normal is not unit length.
+    """
+    normal_velocity = dot(velocity[hit], normal)
+    bounce = normal_velocity < 0
+    if not bounce.any():
+        return
+
+    if normal_impulse.ndim > 1:
+        normal_impulse = normal_impulse[bounce]
+    bouncing_factor = -(1 + bouncing[bounce])
+    velocity[hit[bounce]] += (
+        normal_impulse
+        * normal_velocity[bounce, np.newaxis]
+        * bouncing_factor[:, np.newaxis]
+    )
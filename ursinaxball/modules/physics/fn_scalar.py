@@ -0,0 +1,231 @@
+"""
+Collision kernels of fn_base written with Python floats.
+
+A disc is given as a mutable [x, y, velocity_x, velocity_y] list, updated in
+place. The static objects are given as tuples of floats, compiled once by
+plane_params, segment_params and vertex_params. For 2-element vectors this
+avoids the overhead of the NumPy calls, which is far larger than the math.
+
+The arithmetic follows fn_base step by step, except that dot products and
+norms are computed as plain sums of products while np.dot may fuse them, so
+the results match the NumPy kernels up to rounding.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ursinaxball.objects.base import Plane, Segment, Vertex
+
+PlaneParams = tuple[float, float, float, float, float, float]
+SegmentParams = tuple[float, ...]
+VertexParams = tuple[float, float, float]
+
+
+def plane_params(plane: Plane) -> PlaneParams:
+    """
+    Returns the normal, unit normal, distance and bouncing of a plane
+    """
+    norm_plane = plane.normal / np.linalg.norm(plane.normal)
+    return (
+        *plane.normal.tolist(),
+        *norm_plane.tolist(),
+        float(plane.distance_origin),
+        float(plane.bouncing_coefficient),
+    )
+
+
+def segment_params(segment: Segment) -> SegmentParams:
+    """
+    Returns the curve, bias and bouncing of a segment, followed by its vertices,
+    vector and unit normal when straight or its circle and tangents when curved
+    """
+    header = (
+        float(segment.curve),
+        float(segment.bias),
+        float(segment.bouncing_coefficient),
+    )
+    if segment.curve == 0:
+        position_0 = segment.vertices[0].position
+        position_1 = segment.vertices[1].position
+        normal_segment = position_1 - position_0
+        normal = np.array([-normal_segment[1], normal_segment[0]]) / np.linalg.norm(
+            normal_segment
+        )
+        return (
+            *header,
+            *position_0.tolist(),
+            *position_1.tolist(),
+            *normal_segment.tolist(),
+            *normal.tolist(),
+        )
+
+    return (
+        *header,
+        *segment.circle_center.tolist(),
+        float(segment.circle_radius),
+        *segment.circle_tangeant[0].tolist(),
+        *segment.circle_tangeant[1].tolist(),
+    )
+
+
+def vertex_params(vertex: Vertex) -> VertexParams:
+    """
+    Returns the position and bouncing of a vertex
+    """
+    return (*vertex.position.tolist(), float(vertex.bouncing_coefficient))
+
+
+def resolve_disc_disc_collision_scalar(
+    disc_a: list[float],
+    disc_b: list[float],
+    radius_a: float,
+    radius_b: float,
+    inverse_mass_a: float,
+    inverse_mass_b: float,
+    bouncing_a: float,
+    bouncing_b: float,
+) -> bool:
+    """
+    Returns whether the discs collided
+    """
+    difference_x = disc_a[0] - disc_b[0]
+    difference_y = disc_a[1] - disc_b[1]
+    dist = math.sqrt(difference_x * difference_x + difference_y * difference_y)
+    radius_sum = radius_a + radius_b
+    if not 0 < dist <= radius_sum:
+        return False
+
+    normal_x = difference_x / dist
+    normal_y = difference_y / dist
+    mass_factor = inverse_mass_a / (inverse_mass_a + inverse_mass_b)
+    overlap = radius_sum - dist
+    disc_a[0] += normal_x * overlap * mass_factor
+    disc_a[1] += normal_y * overlap * mass_factor
+    disc_b[0] -= normal_x * overlap * (1 - mass_factor)
+    disc_b[1] -= normal_y * overlap * (1 - mass_factor)
+    normal_velocity = (disc_a[2] - disc_b[2]) * normal_x + (
+        disc_a[3] - disc_b[3]
+    ) * normal_y
+    if normal_velocity < 0:
+        bouncing_factor = -(1 + bouncing_a * bouncing_b)
+        disc_a[2] += normal_x * normal_velocity * bouncing_factor * mass_factor
+        disc_a[3] += normal_y * normal_velocity * bouncing_factor * mass_factor
+        disc_b[2] -= normal_x * normal_velocity * bouncing_factor * (1 - mass_factor)
+        disc_b[3] -= normal_y * normal_velocity * bouncing_factor * (1 - mass_factor)
+    return True
+
+
+def resolve_disc_vertex_collision_scalar(
+    disc: list[float],
+    vertex: VertexParams,
+    radius: float,
+    bouncing_disc: float,
+) -> None:
+    vertex_x, vertex_y, bouncing_vertex = vertex
+    difference_x = disc[0] - vertex_x
+    difference_y = disc[1] - vertex_y
+    dist = math.sqrt(difference_x * difference_x + difference_y * difference_y)
+    if 0 < dist <= radius:
+        normal_x = difference_x / dist
+        normal_y = difference_y / dist
+        disc[0] += normal_x * (radius - dist)
+        disc[1] += normal_y * (radius - dist)
+        normal_velocity = disc[2] * normal_x + disc[3] * normal_y
+        if normal_velocity < 0:
+            bouncing_factor = -(1 + bouncing_disc * bouncing_vertex)
+            disc[2] += normal_x * normal_velocity * bouncing_factor
+            disc[3] += normal_y * normal_velocity * bouncing_factor
+
+
+def resolve_disc_segment_collision_scalar(
+    disc: list[float],
+    segment: SegmentParams,
+    radius: float,
+    bouncing_disc: float,
+) -> None:
+    curve, bias, bouncing_segment = segment[:3]
+    x, y = disc[0], disc[1]
+    if curve == 0:
+        (
+            x_0,
+            y_0,
+            x_1,
+            y_1,
+            segment_x,
+            segment_y,
+            normal_x,
+            normal_y,
+        ) = segment[3:]
+        if not (
+            segment_x * (x - x_0) + segment_y * (y - y_0) > 0
+            and segment_x * (x - x_1) + segment_y * (y - y_1) < 0
+        ):
+            return
+        dist = normal_x * (x - x_1) + normal_y * (y - y_1)
+    else:
+        center_x, center_y, circle_radius, t0_x, t0_y, t1_x, t1_y = segment[3:]
+        circle_x = x - center_x
+        circle_y = y - center_y
+        if (
+            circle_x * t0_x + circle_y * t0_y > 0
+            and circle_x * t1_x + circle_y * t1_y > 0
+        ) == (curve < 0):
+            return
+        dist_norm = math.sqrt(circle_x * circle_x + circle_y * circle_y)
+        if not dist_norm > 0:
+            return
+        dist = dist_norm - circle_radius
+        normal_x = circle_x / dist_norm
+        normal_y = circle_y / dist_norm
+
+    if bias == 0:
+        if dist < 0:
+            dist = -dist
+            normal_x = -normal_x
+            normal_y = -normal_y
+    elif bias < 0:
+        bias = -bias
+        dist = -dist
+        normal_x = -normal_x
+        normal_y = -normal_y
+
+    if dist < -bias or not dist < radius:
+        return
+
+    disc[0] += normal_x * (radius - dist)
+    disc[1] += normal_y * (radius - dist)
+    normal_velocity = disc[2] * normal_x + disc[3] * normal_y
+    if normal_velocity < 0:
+        bouncing_factor = -(1 + bouncing_disc * bouncing_segment)
+        disc[2] += normal_x * normal_velocity * bouncing_factor
+        disc[3] += normal_y * normal_velocity * bouncing_factor
+
+
+def resolve_disc_plane_collision_scalar(
+    disc: list[float],
+    plane: PlaneParams,
+    radius: float,
+    bouncing_disc: float,
+) -> None:
+    (
+        normal_x,
+        normal_y,
+        norm_plane_x,
+        norm_plane_y,
+        distance_plane,
+        bouncing_plane,
+    ) = plane
+    dist = distance_plane - (disc[0] * norm_plane_x + disc[1] * norm_plane_y) + radius
+    if dist > 0:
+        disc[0] += norm_plane_x * dist
+        disc[1] += norm_plane_y * dist
+        normal_velocity = disc[2] * norm_plane_x + disc[3] * norm_plane_y
+        if normal_velocity < 0:
+            bouncing_factor = -(1 + bouncing_disc * bouncing_plane)
+            disc[2] += normal_x * normal_velocity * bouncing_factor
+            disc[3] += normal_y * normal_velocity * bouncing_factor
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from ursinaxball.common_values import TeamID
+from ursinaxball.modules.physics.fn_batch import cross
+from ursinaxball.objects import Stadium
+
+
+class GoalDetector:
+    """
+    Detects the goal line crossings of every scoring disc against every goal.
+
+    The goal segments are read once from the stadium as a (G, 2, 2) array, the
+    motion segment of each scoring disc is then tested against all of them in
+    one vectorized segment intersection pass. When several goals are crossed in
+    one tick, the first scoring disc and then the first goal in stadium order is
+    credited, like a loop over the discs and the goals would.
+    """
+
+    def __init__(self, stadium: Stadium):
+        self.goal_points = stadium.goal_points
+        self.goal_teams = stadium.goal_teams
+        self.goal_vectors = self.goal_points[:, 1] - self.goal_points[:, 0]
+
+    def check(
+        self,
+        previous_positions: npt.NDArray[np.float64],
+        current_positions: npt.NDArray[np.float64],
+    ) -> int:
+        """
+        Returns the team that conceded a goal, SPECTATOR if none.
+
+        Args:
+            previous_positions: (S, 2) positions of the scoring discs before the tick
+            current_positions: (S, 2) positions of the scoring discs after the tick
+        """
+        team_goals = self.check_batch(
+            previous_positions[np.newaxis], current_positions[np.newaxis]
+        )
+        return int(team_goals[0])
+
+    def check_batch(
+        self,
+        previous_positions: npt.NDArray[np.float64],
+        current_positions: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.int_]:
+        """
+        Returns the team that conceded a goal in each of K stadiums.
+
+        Args:
+            previous_positions: (K, S, 2) positions of the scoring discs before the tick
+            current_positions: (K, S, 2) positions of the scoring discs after the tick
+        """
+        num_stadiums, num_discs = previous_positions.shape[:2]
+        team_goals = np.full(num_stadiums, TeamID.SPECTATOR, dtype=int)
+        if len(self.goal_points) == 0 or num_discs == 0:
+            return team_goals
+
+        point_0 = self.goal_points[:, 0]
+        point_1 = self.goal_points[:, 1]
+        previous_positions = previous_positions[:, :, np.newaxis]
+        current_positions = current_positions[:, :, np.newaxis]
+        # Shapes are (K, S, G, 2) for every scoring disc and goal pair
+        previous_p0 = previous_positions - point_0
+        current_p0 = current_positions - point_0
+        current_p1 = current_positions - point_1
+        disc_vectors = current_positions - previous_positions
+
+        crossed = (
+            cross(current_p0, disc_vectors) * cross(current_p1, disc_vectors) <= 0
+        ) & (
+            cross(previous_p0, self.goal_vectors) * cross(current_p0, self.goal_vectors)
+            <= 0
+        )
+        crossed = crossed.reshape(num_stadiums, -1)
+
+        scored = crossed.any(axis=1)
+        first_pair = crossed[scored].argmax(axis=1)
+        team_goals[scored] = self.goal_teams[first_pair % len(self.goal_teams)]
+        return team_goals
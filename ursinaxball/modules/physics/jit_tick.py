@@ -0,0 +1,539 @@
+"""
+One tick of the physics of a game fused into a single compiled call.
+
+The movement of the players, the integration of the discs, the collisions and
+the goal check run on the arrays of the physics world, with the static objects
+compiled to float arrays once. The kernels are compiled with Numba when
+backends.NUMBA_AVAILABLE finds it, Game falls back to the Python backends
+otherwise.
+
+The arithmetic follows the scalar backend: dot products and norms are plain
+sums of products, so the results match the NumPy kernels up to rounding.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ursinaxball.common_values import CollisionFlag, TeamID
+from ursinaxball.modules.physics.backends import NUMBA_AVAILABLE
+from ursinaxball.modules.physics.fn_scalar import (
+    plane_params,
+    segment_params,
+    vertex_params,
+)
+from ursinaxball.objects.collision_pairs import static_flags
+
+if TYPE_CHECKING:
+    from ursinaxball.modules import GameScore, PlayerHandler
+    from ursinaxball.objects import Stadium
+
+if NUMBA_AVAILABLE:
+    import numba
+else:
+    numba = None
+
+log = logging.getLogger(__name__)
+
+KICK = int(CollisionFlag.KICK)
+SCORE = int(CollisionFlag.SCORE)
+SPECTATOR = int(TeamID.SPECTATOR)
+SEGMENT_PARAMS_SIZE = 11
+
+
+def jit(function):
+    """
+    Compiles a function with Numba, returns it unchanged without Numba
+    """
+    if numba is None:
+        return function
+    return numba.njit(cache=True)(function)
+
+
+@jit
+def can_collide(group_a, mask_a, group_b, mask_b):
+    return (group_a & mask_b) != 0 and (mask_a & group_b) != 0
+
+
+@jit
+def move_players(
+    position,
+    velocity,
+    radius,
+    inverse_mass,
+    collision_group,
+    player_indices,
+    player_params,
+    actions,
+    kicking,
+    kick_cancel,
+    touches,
+):
+    for p in range(len(player_indices)):
+        i = player_indices[p]
+        kick_strength = player_params[p, 0]
+        kickback = player_params[p, 1]
+        acceleration = player_params[p, 2]
+        kicking_acceleration = player_params[p, 3]
+        kicking[p] = actions[p, 2] == 1
+        if actions[p, 2] == 0:
+            kick_cancel[p] = False
+        is_kicking = kicking[p] and not kick_cancel[p]
+
+        has_kicked = False
+        touches[p] = 0
+        for d in range(len(radius)):
+            if (collision_group[d] & KICK) == 0 or d == i:
+                continue
+            difference_x = position[d, 0] - position[i, 0]
+            difference_y = position[d, 1] - position[i, 1]
+            dist = np.sqrt(difference_x * difference_x + difference_y * difference_y)
+            if dist - radius[i] - radius[d] < 4:
+                touches[p] += 1
+                if is_kicking:
+                    normal_x = difference_x / dist
+                    normal_y = difference_y / dist
+                    velocity[d, 0] += normal_x * kick_strength
+                    velocity[d, 1] += normal_y * kick_strength
+                    velocity[i, 0] += normal_x * -kickback * inverse_mass[i]
+                    velocity[i, 1] += normal_y * -kickback * inverse_mass[i]
+                    has_kicked = True
+
+        if has_kicked:
+            kick_cancel[p] = True
+        is_kicking = kicking[p] and not kick_cancel[p]
+
+        input_x = float(actions[p, 0])
+        input_y = float(actions[p, 1])
+        input_norm = np.sqrt(input_x * input_x + input_y * input_y)
+        if input_norm > 0:
+            input_x /= input_norm
+            input_y /= input_norm
+        player_acceleration = kicking_acceleration if is_kicking else acceleration
+        velocity[i, 0] += input_x * player_acceleration
+        velocity[i, 1] += input_y * player_acceleration
+
+
+@jit
+def integrate(
+    position,
+    velocity,
+    gravity,
+    damping,
+    player_indices,
+    player_params,
+    kicking,
+    kick_cancel,
+):
+    for i in range(len(damping)):
+        step_damping = damping[i]
+        for p in range(len(player_indices)):
+            if player_indices[p] == i and kicking[p] and not kick_cancel[p]:
+                step_damping = player_params[p, 4]
+        for axis in range(2):
+            position[i, axis] += velocity[i, axis]
+            velocity[i, axis] += gravity[i, axis]
+            velocity[i, axis] *= step_damping
+
+
+@jit
+def resolve_disc_disc(position, velocity, radius, inverse_mass, bouncing, i, j):
+    difference_x = position[i, 0] - position[j, 0]
+    difference_y = position[i, 1] - position[j, 1]
+    dist = np.sqrt(difference_x * difference_x + difference_y * difference_y)
+    radius_sum = radius[i] + radius[j]
+    if not (dist > 0 and dist <= radius_sum):
+        return
+
+    normal_x = difference_x / dist
+    normal_y = difference_y / dist
+    mass_factor = inverse_mass[i] / (inverse_mass[i] + inverse_mass[j])
+    overlap = radius_sum - dist
+    position[i, 0] += normal_x * overlap * mass_factor
+    position[i, 1] += normal_y * overlap * mass_factor
+    position[j, 0] -= normal_x * overlap * (1 - mass_factor)
+    position[j, 1] -= normal_y * overlap * (1 - mass_factor)
+    normal_velocity = (velocity[i, 0] - velocity[j, 0]) * normal_x + (
+        velocity[i, 1] - velocity[j, 1]
+    ) * normal_y
+    if normal_velocity < 0:
+        bouncing_factor = -(1 + bouncing[i] * bouncing[j])
+        velocity[i, 0] += normal_x * normal_velocity * bouncing_factor * mass_factor
+        velocity[i, 1] += normal_y * normal_velocity * bouncing_factor * mass_factor
+        velocity[j, 0] -= (
+            normal_x * normal_velocity * bouncing_factor * (1 - mass_factor)
+        )
+        velocity[j, 1] -= (
+            normal_y * normal_velocity * bouncing_factor * (1 - mass_factor)
+        )
+
+
+@jit
+def push_disc(position, velocity, i, normal_x, normal_y, depth, bounce_x, bounce_y, b):
+    """
+    Moves disc i along the normal by depth, then bounces its velocity along the
+    normal with the bouncing factor b, using the bounce vector as impulse direction
+    """
+    position[i, 0] += normal_x * depth
+    position[i, 1] += normal_y * depth
+    normal_velocity = velocity[i, 0] * normal_x + velocity[i, 1] * normal_y
+    if normal_velocity < 0:
+        bouncing_factor = -(1 + b)
+        velocity[i, 0] += bounce_x * normal_velocity * bouncing_factor
+        velocity[i, 1] += bounce_y * normal_velocity * bouncing_factor
+
+
+@jit
+def resolve_plane(position, velocity, radius, bouncing, i, plane):
+    dist = (
+        plane[4] - (position[i, 0] * plane[2] + position[i, 1] * plane[3]) + radius[i]
+    )
+    if dist > 0:
+        push_disc(
+            position,
+            velocity,
+            i,
+            plane[2],
+            plane[3],
+            dist,
+            plane[0],
+            plane[1],
+            bouncing[i] * plane[5],
+        )
+
+
+@jit
+def resolve_segment(position, velocity, radius, bouncing, i, segment):
+    curve = segment[0]
+    bias = segment[1]
+    x = position[i, 0]
+    y = position[i, 1]
+    if curve == 0:
+        if not (
+            segment[7] * (x - segment[3]) + segment[8] * (y - segment[4]) > 0
+            and segment[7] * (x - segment[5]) + segment[8] * (y - segment[6]) < 0
+        ):
+            return
+        normal_x = segment[9]
+        normal_y = segment[10]
+        dist = normal_x * (x - segment[5]) + normal_y * (y - segment[6])
+    else:
+        circle_x = x - segment[3]
+        circle_y = y - segment[4]
+        facing = (
+            circle_x * segment[6] + circle_y * segment[7] > 0
+            and circle_x * segment[8] + circle_y * segment[9] > 0
+        )
+        if facing == (curve < 0):
+            return
+        dist_norm = np.sqrt(circle_x * circle_x + circle_y * circle_y)
+        if not dist_norm > 0:
+            return
+        dist = dist_norm - segment[5]
+        normal_x = circle_x / dist_norm
+        normal_y = circle_y / dist_norm
+
+    if bias == 0:
+        if dist < 0:
+            dist = -dist
+            normal_x = -normal_x
+            normal_y = -normal_y
+    elif bias < 0:
+        bias = -bias
+        dist = -dist
+        normal_x = -normal_x
+        normal_y = -normal_y
+
+    if dist < -bias or not dist < radius[i]:
+        return
+    push_disc(
+        position,
+        velocity,
+        i,
+        normal_x,
+        normal_y,
+        radius[i] - dist,
+        normal_x,
+        normal_y,
+        bouncing[i] * segment[2],
+    )
+
+
+@jit
+def resolve_vertex(position, velocity, radius, bouncing, i, vertex):
+    difference_x = position[i, 0] - vertex[0]
+    difference_y = position[i, 1] - vertex[1]
+    dist = np.sqrt(difference_x * difference_x + difference_y * difference_y)
+    if dist > 0 and dist <= radius[i]:
+        normal_x = difference_x / dist
+        normal_y = difference_y / dist
+        push_disc(
+            position,
+            velocity,
+            i,
+            normal_x,
+            normal_y,
+            radius[i] - dist,
+            normal_x,
+            normal_y,
+            bouncing[i] * vertex[2],
+        )
+
+
+@jit
+def resolve_all(
+    position,
+    velocity,
+    radius,
+    inverse_mass,
+    bouncing,
+    collision_group,
+    collision_mask,
+    planes,
+    plane_flags,
+    segments,
+    segment_flags,
+    vertices,
+    vertex_flags,
+):
+    num_discs = len(radius)
+    for i in range(num_discs):
+        group_i = collision_group[i]
+        mask_i = collision_mask[i]
+        for j in range(i + 1, num_discs):
+            if can_collide(group_i, mask_i, collision_group[j], collision_mask[j]):
+                resolve_disc_disc(
+                    position, velocity, radius, inverse_mass, bouncing, i, j
+                )
+
+        if inverse_mass[i] == 0:
+            continue
+        for k in range(len(planes)):
+            if can_collide(group_i, mask_i, plane_flags[k, 0], plane_flags[k, 1]):
+                resolve_plane(position, velocity, radius, bouncing, i, planes[k])
+        for k in range(len(segments)):
+            if can_collide(group_i, mask_i, segment_flags[k, 0], segment_flags[k, 1]):
+                resolve_segment(position, velocity, radius, bouncing, i, segments[k])
+        for k in range(len(vertices)):
+            if can_collide(group_i, mask_i, vertex_flags[k, 0], vertex_flags[k, 1]):
+                resolve_vertex(position, velocity, radius, bouncing, i, vertices[k])
+
+
+@jit
+def check_goal(previous_positions, position, score_indices, goal_points, goal_teams):
+    for s in range(len(score_indices)):
+        current_x = position[score_indices[s], 0]
+        current_y = position[score_indices[s], 1]
+        disc_x = current_x - previous_positions[s, 0]
+        disc_y = current_y - previous_positions[s, 1]
+        for g in range(len(goal_teams)):
+            x_0, y_0 = goal_points[g, 0, 0], goal_points[g, 0, 1]
+            x_1, y_1 = goal_points[g, 1, 0], goal_points[g, 1, 1]
+            goal_x = x_1 - x_0
+            goal_y = y_1 - y_0
+            cross_0 = (current_x - x_0) * disc_y - (current_y - y_0) * disc_x
+            cross_1 = (current_x - x_1) * disc_y - (current_y - y_1) * disc_x
+            cross_previous = (previous_positions[s, 0] - x_0) * goal_y - (
+                previous_positions[s, 1] - y_0
+            ) * goal_x
+            cross_current = (current_x - x_0) * goal_y - (current_y - y_0) * goal_x
+            if cross_0 * cross_1 <= 0 and cross_previous * cross_current <= 0:
+                return goal_teams[g]
+    return SPECTATOR
+
+
+@jit
+def tick(
+    position,
+    velocity,
+    gravity,
+    radius,
+    inverse_mass,
+    damping,
+    bouncing,
+    collision_group,
+    collision_mask,
+    player_indices,
+    player_params,
+    actions,
+    kicking,
+    kick_cancel,
+    touches,
+    planes,
+    plane_flags,
+    segments,
+    segment_flags,
+    vertices,
+    vertex_flags,
+    score_indices,
+    previous_positions,
+    goal_points,
+    goal_teams,
+    goal_check,
+):
+    """
+    Steps the physics world by one tick, returns the team that conceded a goal
+    """
+    move_players(
+        position,
+        velocity,
+        radius,
+        inverse_mass,
+        collision_group,
+        player_indices,
+        player_params,
+        actions,
+        kicking,
+        kick_cancel,
+        touches,
+    )
+    for s in range(len(score_indices)):
+        previous_positions[s, 0] = position[score_indices[s], 0]
+        previous_positions[s, 1] = position[score_indices[s], 1]
+    integrate(
+        position,
+        velocity,
+        gravity,
+        damping,
+        player_indices,
+        player_params,
+        kicking,
+        kick_cancel,
+    )
+    resolve_all(
+        position,
+        velocity,
+        radius,
+        inverse_mass,
+        bouncing,
+        collision_group,
+        collision_mask,
+        planes,
+        plane_flags,
+        segments,
+        segment_flags,
+        vertices,
+        vertex_flags,
+    )
+    if not goal_check:
+        return SPECTATOR
+    return check_goal(
+        previous_positions, position, score_indices, goal_points, goal_teams
+    )
+
+
+def compile_segments(stadium: Stadium) -> np.ndarray:
+    """
+    Returns the (S, 11) array of the params of the segments, padded with zeros
+    """
+    segments = np.zeros((len(stadium.segments), SEGMENT_PARAMS_SIZE))
+    for k, segment in enumerate(stadium.segments):
+        params = segment_params(segment)
+        segments[k, : len(params)] = params
+    return segments
+
+
+class CompiledTick:
+    """
+    A class to step the physics of a started game with the fused tick kernel.
+
+    The static objects of the stadium and the parameters of the players are
+    compiled to arrays once, the kicking state of the players is copied in and
+    out of the kernel every tick and their touches are accounted afterwards.
+    """
+
+    def __init__(self, stadium: Stadium, players: list[PlayerHandler]):
+        self.stadium = stadium
+        self.players = players
+        world = stadium.world
+
+        self.planes = np.array(
+            [plane_params(p) for p in stadium.planes], dtype=float
+        ).reshape(-1, 6)
+        self.segments = compile_segments(stadium)
+        self.vertices = np.array(
+            [vertex_params(v) for v in stadium.vertices], dtype=float
+        ).reshape(-1, 3)
+        self.plane_flags = np.ascontiguousarray(static_flags(stadium.planes).T)
+        self.segment_flags = np.ascontiguousarray(static_flags(stadium.segments).T)
+        self.vertex_flags = np.ascontiguousarray(static_flags(stadium.vertices).T)
+        # A copy, the arrays of the stadium may be read-only
+        self.goal_points = np.array(stadium.goal_points, dtype=float)
+        self.goal_teams = stadium.goal_teams.astype(np.int64)
+
+        self.player_indices = np.array([p.disc.index for p in players], dtype=np.int64)
+        self.player_params = np.array(
+            [
+                [
+                    p.disc.kick_strength,
+                    p.disc.kickback,
+                    p.disc.acceleration,
+                    p.disc.kicking_acceleration,
+                    p.disc.kicking_damping,
+                ]
+                for p in players
+            ],
+            dtype=float,
+        ).reshape(-1, 5)
+        self.score_indices = np.flatnonzero(world.collision_group & SCORE)
+        self.previous_positions = np.zeros((len(self.score_indices), 2))
+        self.kicking = np.zeros(len(players), dtype=bool)
+        self.kick_cancel = np.zeros(len(players), dtype=bool)
+        self.touches = np.zeros(len(players), dtype=np.int64)
+
+    def step(self, actions: np.ndarray, score: GameScore, goal_check: bool) -> int:
+        """
+        Steps the physics by one tick, returns the team that conceded a goal.
+
+        Args:
+            actions: (P, 3) actions of the players, in the order of the players
+            score: Score of the game, for the touches of the players
+            goal_check: Whether goals are checked during this tick
+        """
+        for p, player in enumerate(self.players):
+            self.kick_cancel[p] = player._kick_cancel  # noqa: SLF001
+
+        world = self.stadium.world
+        team_goal = tick(
+            world.position,
+            world.velocity,
+            world.gravity,
+            world.radius,
+            world.inverse_mass,
+            world.damping,
+            world.bouncing_coefficient,
+            world.collision_group,
+            world.collision_mask,
+            self.player_indices,
+            self.player_params,
+            np.ascontiguousarray(actions, dtype=np.int64),
+            self.kicking,
+            self.kick_cancel,
+            self.touches,
+            self.planes,
+            self.plane_flags,
+            self.segments,
+            self.segment_flags,
+            self.vertices,
+            self.vertex_flags,
+            self.score_indices,
+            self.previous_positions,
+            self.goal_points,
+            self.goal_teams,
+            goal_check,
+        )
+
+        for player, kicking, kick_cancel, touches in zip(
+            self.players,
+            self.kicking.tolist(),
+            self.kick_cancel.tolist(),
+            self.touches.tolist(),
+        ):
+            player.kicking = kicking
+            player._kick_cancel = kick_cancel  # noqa: SLF001
+            for _ in range(touches):
+                player.player_data.update_touch(self.stadium, score)
+        return int(team_goal)
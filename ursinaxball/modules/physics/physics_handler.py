@@ -10,12 +10,16 @@ from ursinaxball.modules.physics.fn_base import (
     resolve_disc_segment_final_fn,
     resolve_disc_vertex_collision_fn,
 )
-from ursinaxball.objects import Stadium
+from ursinaxball.objects import PhysicsWorld, Stadium
 from ursinaxball.objects.base import Disc, Plane, Segment, Vertex
 
 if TYPE_CHECKING:
     from ursinaxball.modules import PlayerHandler
 
+# Slack added to the sum of the radii of two discs by the disc broadphase, so
+# that a pair whose distance is rounded down to it is never skipped
+DISC_PRUNE_MARGIN = 1.0
+
 
 def resolve_disc_disc_collision(disc_a: Disc, disc_b: Disc) -> None:
     """
@@ -106,24 +110,49 @@ def resolve_disc_segment_collision(disc: Disc, segment: Segment) -> None:
     """
     Resolves the collision between a disc and a segment
     """
+    resolve_segment_collision(
+        segment, disc.position, disc.velocity, disc.radius, disc.bouncing_coefficient
+    )
+
+
+def resolve_segment_collision(
+    segment: Segment,
+    position: np.ndarray,
+    velocity: np.ndarray,
+    radius: float,
+    bouncing: float,
+) -> None:
+    """
+    Resolves the collision between a segment and the disc state given as arrays,
+    the position and velocity are updated in place
+    """
     if segment.curve == 0:
-        dist, normal = resolve_disc_segment_collision_no_curve(disc, segment)
+        dist, normal = resolve_disc_segment_collision_no_curve_fn(
+            position,
+            segment.vertices[0].position,
+            segment.vertices[1].position,
+        )
     else:
-        dist, normal = resolve_disc_segment_collision_curve(disc, segment)
+        dist, normal = resolve_disc_segment_collision_curve_fn(
+            position,
+            segment.circle_center,
+            segment.circle_radius,
+            segment.circle_tangeant[0],
+            segment.circle_tangeant[1],
+            segment.curve,
+        )
 
     if dist is not None and normal is not None:
         dist, normal = segment_apply_bias(segment, dist, normal)
-        res = resolve_disc_segment_final_fn(
+        resolve_disc_segment_final_fn(
             dist,
             normal,
-            disc.position,
-            disc.velocity,
-            disc.radius,
-            disc.bouncing_coefficient,
+            position,
+            velocity,
+            radius,
+            bouncing,
             segment.bouncing_coefficient,
         )
-        disc.position = res[0]
-        disc.velocity = res[1]
 
 
 def resolve_disc_plane_collision(disc: Disc, plane: Plane) -> None:
@@ -143,48 +172,130 @@ def resolve_disc_plane_collision(disc: Disc, plane: Plane) -> None:
     disc.velocity = disc_res[1]
 
 
-def resolve_collisions(stadium_game: Stadium) -> None:
-    """
-    Function that resolves the collisions between the discs and the other objects
-    """
-    for i in range(len(stadium_game.discs)):
-        d_a = stadium_game.discs[i]
-        for j in range(i + 1, len(stadium_game.discs)):
-            d_b = stadium_game.discs[j]
-            if ((d_a.collision_group & d_b.collision_mask) != 0) and (
-                (d_a.collision_mask & d_b.collision_group) != 0
-            ):
-                resolve_disc_disc_collision(d_a, d_b)
-        if d_a.inverse_mass != 0:
-            for p in stadium_game.planes:
-                if ((d_a.collision_group & p.collision_mask) != 0) and (
-                    (d_a.collision_mask & p.collision_group) != 0
-                ):
-                    resolve_disc_plane_collision(d_a, p)
-            for s in stadium_game.segments:
-                if ((d_a.collision_group & s.collision_mask) != 0) and (
-                    (d_a.collision_mask & s.collision_group) != 0
-                ):
-                    resolve_disc_segment_collision(d_a, s)
-            for v in stadium_game.vertices:
-                if ((d_a.collision_group & v.collision_mask) != 0) and (
-                    (d_a.collision_mask & v.collision_group) != 0
-                ):
-                    resolve_disc_vertex_collision(d_a, v)
-
-
-def update_discs(stadium_game: Stadium, players: "list[PlayerHandler]") -> None:
-    """
-    Function that updates the position and velocity of the discs
-    """
-    for disc in stadium_game.discs:
-        if hasattr(disc, "player_id"):
-            continue
-        disc.position += disc.velocity
-        disc.velocity = (disc.velocity + disc.gravity) * disc.damping
-
-    for player in players:
-        disc = player.disc
-        disc.position += disc.velocity
-        damping = disc.kicking_damping if player.is_kicking() else disc.damping
-        disc.velocity = (disc.velocity + disc.gravity) * damping
+def get_world(stadium_game: Stadium) -> PhysicsWorld:
+    """
+    Returns the physics world of the stadium, rebuilt if the discs changed
+    """
+    world = stadium_game.world
+    if world is None or world.size != len(stadium_game.discs):
+        world = stadium_game.build_world()
+    return world
+
+
+def prune_partners(
+    x: np.ndarray, reach: np.ndarray, index: int, partners: np.ndarray
+) -> np.ndarray:
+    """
+    Returns, in order, the partners whose extent overlaps the one of the disc
+    `index` along the x axis
+    """
+    return partners[np.abs(x[partners] - x[index]) <= reach[partners] + reach[index]]
+
+
+def resolve_collisions(stadium_game: Stadium, disc_broadphase: bool = False) -> None:
+    """
+    Function that resolves the collisions between the discs and the other objects.
+
+    With `disc_broadphase`, the partners of a disc that are too far from it
+    along the x axis are skipped. They are pruned again every time the disc
+    moves, so the pairs are resolved in the same order with the same result.
+    """
+    world = get_world(stadium_game)
+    position = world.position
+    velocity = world.velocity
+    # Python scalars are much cheaper to read than numpy scalars in the loops
+    radius = world.radius.tolist()
+    inverse_mass = world.inverse_mass.tolist()
+    bouncing = world.bouncing_coefficient.tolist()
+    x = position[:, 0]
+    reach = world.radius + DISC_PRUNE_MARGIN / 2
+
+    pairs = stadium_game.get_collision_pairs(
+        world.collision_group, world.collision_mask, world.inverse_mass != 0
+    )
+
+    def resolve_pair(i: int, j: int) -> None:
+        resolve_disc_disc_collision_fn(
+            position[i],
+            position[j],
+            velocity[i],
+            velocity[j],
+            radius[i],
+            radius[j],
+            inverse_mass[i],
+            inverse_mass[j],
+            bouncing[i],
+            bouncing[j],
+        )
+
+    for i, partners, planes, segments, vertices in pairs.discs:
+        if disc_broadphase and partners:
+            partner_array = pairs.partner_arrays[i]
+            candidates = prune_partners(x, reach, i, partner_array)
+            while len(candidates) > 0:
+                j = int(candidates[0])
+                x_i = x[i]
+                resolve_pair(i, j)
+                if x[i] == x_i:
+                    candidates = candidates[1:]
+                else:
+                    # The partners left are pruned again from the new position
+                    candidates = prune_partners(
+                        x, reach, i, partner_array[partner_array > j]
+                    )
+        else:
+            for j in partners:
+                resolve_pair(i, j)
+        position_i = position[i]
+        velocity_i = velocity[i]
+        for p in planes:
+            resolve_disc_plane_collision_fn(
+                position_i,
+                p.normal,
+                velocity_i,
+                p.distance_origin,
+                radius[i],
+                bouncing[i],
+                p.bouncing_coefficient,
+            )
+        static = pairs.iter_nearby_static(i, position_i, radius[i], segments, vertices)
+        for is_vertex, o in static:
+            if is_vertex:
+                resolve_disc_vertex_collision_fn(
+                    position_i,
+                    o.position,
+                    velocity_i,
+                    radius[i],
+                    bouncing[i],
+                    o.bouncing_coefficient,
+                )
+            else:
+                resolve_segment_collision(
+                    o, position_i, velocity_i, radius[i], bouncing[i]
+                )
+
+
+def update_discs(
+    stadium_game: Stadium,
+    players: "list[PlayerHandler]",
+    player_indices: np.ndarray | None = None,
+) -> None:
+    """
+    Function that updates the position and velocity of the discs.
+    `player_indices` holds the rows of the discs of the players in the world,
+    they are looked up on the discs if not given.
+    """
+    world = get_world(stadium_game)
+    np.copyto(world.step_damping, world.damping)
+    if player_indices is None:
+        player_indices = [
+            player.disc.index if player.disc.world is world else -1
+            for player in players
+        ]
+    for player, index in zip(players, player_indices):
+        if index >= 0 and player.is_kicking():
+            world.step_damping[index] = player.disc.kicking_damping
+
+    world.position += world.velocity
+    world.velocity += world.gravity
+    world.velocity *= world.step_damping[:, np.newaxis]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import numpy as np
+
+from ursinaxball.modules.physics.fn_scalar import (
+    PlaneParams,
+    SegmentParams,
+    VertexParams,
+    plane_params,
+    resolve_disc_disc_collision_scalar,
+    resolve_disc_plane_collision_scalar,
+    resolve_disc_segment_collision_scalar,
+    resolve_disc_vertex_collision_scalar,
+    segment_params,
+    vertex_params,
+)
+from ursinaxball.modules.physics.physics_handler import DISC_PRUNE_MARGIN, get_world
+from ursinaxball.objects import Stadium
+from ursinaxball.objects.base import Plane, Segment, Vertex
+from ursinaxball.objects.collision_pairs import CollisionPairs
+
+
+def get_static_params(
+    pairs: CollisionPairs,
+    index: int,
+    planes: list[Plane],
+    segments: list[Segment],
+    vertices: list[Vertex],
+) -> tuple[list[PlaneParams], list[SegmentParams], list[VertexParams]]:
+    """
+    Returns the compiled static objects of the disc `index`
+    """
+    params = pairs.scalar_cache.get(index)
+    if params is None:
+        params = (
+            [plane_params(p) for p in planes],
+            [segment_params(s) for s in segments],
+            [vertex_params(v) for v in vertices],
+        )
+        pairs.scalar_cache[index] = params
+    return params
+
+
+def resolve_collisions_scalar(
+    stadium_game: Stadium, disc_broadphase: bool = False
+) -> None:
+    """
+    Resolves the collisions like resolve_collisions, with the kernels of fn_scalar.
+    The state of the discs is read from the physics world as Python floats once,
+    then written back at the end of the tick.
+    """
+    world = get_world(stadium_game)
+    pairs = stadium_game.get_collision_pairs(
+        world.collision_group, world.collision_mask, world.inverse_mass != 0
+    )
+    if not pairs.discs:
+        return
+
+    discs = np.concatenate((world.position, world.velocity), axis=1).tolist()
+    radius = world.radius.tolist()
+    inverse_mass = world.inverse_mass.tolist()
+    bouncing = world.bouncing_coefficient.tolist()
+
+    for i, partners, planes, segments, vertices in pairs.discs:
+        disc_i = discs[i]
+        radius_i = radius[i]
+        for j in partners:
+            disc_j = discs[j]
+            if (
+                disc_broadphase
+                and abs(disc_j[0] - disc_i[0])
+                > radius_i + radius[j] + DISC_PRUNE_MARGIN
+            ):
+                continue
+            resolve_disc_disc_collision_scalar(
+                disc_i,
+                disc_j,
+                radius_i,
+                radius[j],
+                inverse_mass[i],
+                inverse_mass[j],
+                bouncing[i],
+                bouncing[j],
+            )
+
+        plane_list, segment_list, vertex_list = get_static_params(
+            pairs, i, planes, segments, vertices
+        )
+        bouncing_i = bouncing[i]
+        for p in plane_list:
+            resolve_disc_plane_collision_scalar(disc_i, p, radius_i, bouncing_i)
+        static = pairs.iter_nearby_static(
+            i, disc_i, radius_i, segment_list, vertex_list
+        )
+        for is_vertex, o in static:
+            if is_vertex:
+                resolve_disc_vertex_collision_scalar(disc_i, o, radius_i, bouncing_i)
+            else:
+                resolve_disc_segment_collision_scalar(disc_i, o, radius_i, bouncing_i)
+
+    discs = np.array(discs)
+    world.position[:] = discs[:, :2]
+    world.velocity[:] = discs[:, 2:]
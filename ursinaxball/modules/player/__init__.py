@@ -1,7 +1,8 @@
 from .player_data import PlayerData
-from .player_handler import PlayerHandler
+from .player_handler import MovementResolver, PlayerHandler
 
 __all__ = [
+    "MovementResolver",
     "PlayerData",
     "PlayerHandler",
 ]
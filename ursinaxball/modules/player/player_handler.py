@@ -4,6 +4,7 @@ import itertools
 from typing import TYPE_CHECKING
 
 import numpy as np
+from numpy.typing import NDArray
 
 from ursinaxball.common_values import (
     ActionBin,
@@ -12,6 +13,7 @@ from ursinaxball.common_values import (
     TeamID,
 )
 from ursinaxball.modules.bots import Bot
+from ursinaxball.modules.physics.fn_batch import norm
 from ursinaxball.modules.player.player_data import PlayerData
 from ursinaxball.modules.systems.game_score import GameScore
 from ursinaxball.objects.base.player_physics import PlayerPhysics
@@ -31,7 +33,11 @@ class PlayerHandler:
         self.name = name
         self.team = team
         self.bot = bot
-        self.action: list[int] = []
+        self._action: list[int] = []
+        # Actions of the players of the game and the row of this player, see
+        # bind_action
+        self._actions: NDArray[np.int_] | None = None
+        self._action_row = 0
         self.kicking = False
         # kick_cancel is used to make sure you stop kicking after hitting the ball
         self._kick_cancel = False
@@ -44,18 +50,51 @@ class PlayerHandler:
         elif self.team == TeamID.BLUE:
             self.disc.color = TeamColor.BLUE
 
+    @property
+    def action(self) -> list[int]:
+        """
+        The last action of the player, read from the actions of its game once
+        it is bound to them
+        """
+        if self._actions is None:
+            return self._action
+        return self._actions[self._action_row].tolist()
+
+    @action.setter
+    def action(self, action: list[int]) -> None:
+        if self._actions is None:
+            self._action = action
+        else:
+            self._actions[self._action_row] = action
+
+    def bind_action(self, actions: NDArray[np.int_], row: int) -> None:
+        """
+        Reads the action of the player from a row of the (P, 3) actions its
+        game writes every step, instead of copying it to every player
+        """
+        self._actions = actions
+        self._action_row = row
+
     def is_kicking(self) -> bool:
         return self.kicking and not self._kick_cancel
 
+    def reset_kick(self) -> None:
+        """
+        Releases the kick, for a new episode
+        """
+        self.kicking = False
+        self._kick_cancel = False
+
     def step(self, game: Game) -> list[int] | None:
         if self.bot is not None:
             return self.bot.step(self, game)
         return None
 
     def resolve_movement(self, stadium_game: Stadium, game_score: GameScore) -> None:
+        action = self.action
         if self.disc is not None:
-            self.kicking = self.action[ActionBin.KICK] == 1
-            if self.action[ActionBin.KICK] == 0:
+            self.kicking = action[ActionBin.KICK] == 1
+            if action[ActionBin.KICK] == 0:
                 self._kick_cancel = False
 
         player_has_kicked = False
@@ -80,8 +119,8 @@ class PlayerHandler:
             self._kick_cancel = True
 
         input_direction = (
-            self.action[:2] / np.linalg.norm(self.action[:2])
-            if np.linalg.norm(self.action[:2]) > 0
+            action[:2] / np.linalg.norm(action[:2])
+            if np.linalg.norm(action[:2]) > 0
             else np.array([0.0, 0.0])
         )
         player_acceleration = (
@@ -90,3 +129,128 @@ class PlayerHandler:
             else self.disc.acceleration
         )
         self.disc.velocity += input_direction * player_acceleration
+
+
+class MovementResolver:
+    """
+    Batched version of PlayerHandler.resolve_movement for every player of a
+    started game, built once the discs of the players are in the physics world.
+
+    The distances between the players and the kickable discs are computed as one
+    (P, D) matrix, and the kicks are added to the velocities in the order of
+    the players and of the discs, so the results match the sequential version.
+    When a player disc is kickable itself, the kicks of a player move the discs
+    the next players read, and the players are resolved one by one instead.
+    """
+
+    def __init__(self, stadium_game: Stadium, players: list[PlayerHandler]):
+        self.stadium_game = stadium_game
+        self.players = players
+        world = stadium_game.world
+        self.player_indices = np.array(
+            [player.disc.index for player in players], dtype=np.intp
+        )
+        self.kick_indices = np.flatnonzero(world.collision_group & CollisionFlag.KICK)
+        self.sequential = bool(np.isin(self.player_indices, self.kick_indices).any())
+
+        discs = [player.disc for player in players]
+        self.kick_strength = np.array([disc.kick_strength for disc in discs])
+        self.kickback = np.array([-disc.kickback for disc in discs])
+        self.acceleration = np.array([disc.acceleration for disc in discs])
+        self.kicking_acceleration = np.array(
+            [disc.kicking_acceleration for disc in discs]
+        )
+
+    def resolve(self, actions: NDArray[np.int_], game_score: GameScore) -> None:
+        """
+        Applies the kicks and the movement of the (P, 3) actions of the players
+        """
+        if self.sequential:
+            for player in self.players:
+                player.resolve_movement(self.stadium_game, game_score)
+            return
+
+        world = self.stadium_game.world
+        player_indices = self.player_indices
+        kicking = actions[:, ActionBin.KICK] == 1
+        kick_cancel = np.array(
+            [player._kick_cancel for player in self.players],  # noqa: SLF001
+            dtype=bool,
+        )
+        kick_cancel &= actions[:, ActionBin.KICK] != 0
+        is_kicking = kicking & ~kick_cancel
+
+        difference = (
+            world.position[self.kick_indices]
+            - world.position[player_indices, np.newaxis]
+        )
+        dist = norm(difference)
+        # Subtracted one radius after the other like the sequential version
+        touch = (
+            dist
+            - world.radius[player_indices, np.newaxis]
+            - world.radius[self.kick_indices]
+        ) < 4
+        if touch.any():
+            kick_cancel |= self._resolve_kicks(
+                touch & is_kicking[:, np.newaxis], difference, dist
+            )
+            for p, count in enumerate(np.count_nonzero(touch, axis=1).tolist()):
+                for _ in range(count):
+                    self.players[p].player_data.update_touch(
+                        self.stadium_game, game_score
+                    )
+
+        input_vector = actions[:, :2].astype(float)
+        input_norm = norm(input_vector)[:, np.newaxis]
+        input_direction = np.divide(
+            input_vector,
+            input_norm,
+            out=np.zeros_like(input_vector),
+            where=input_norm > 0,
+        )
+        player_acceleration = np.where(
+            kicking & ~kick_cancel, self.kicking_acceleration, self.acceleration
+        )
+        world.velocity[player_indices] += (
+            input_direction * player_acceleration[:, np.newaxis]
+        )
+
+        for player, player_kicking, player_kick_cancel in zip(
+            self.players, kicking.tolist(), kick_cancel.tolist()
+        ):
+            player.kicking = player_kicking
+            player._kick_cancel = player_kick_cancel  # noqa: SLF001
+
+    def _resolve_kicks(
+        self,
+        kick: NDArray[np.bool_],
+        difference: NDArray[np.float64],
+        dist: NDArray[np.float64],
+    ) -> NDArray[np.bool_]:
+        """
+        Applies the (P, D) kicks of the players, returns which players kicked
+        """
+        world = self.stadium_game.world
+        kick_players, kick_discs = np.nonzero(kick)
+        if len(kick_players) == 0:
+            return np.zeros(len(self.players), dtype=bool)
+        normal = (
+            difference[kick_players, kick_discs]
+            / dist[kick_players, kick_discs, np.newaxis]
+        )
+        kicker_indices = self.player_indices[kick_players]
+        # Added in the order of the players then of the discs
+        np.add.at(
+            world.velocity,
+            self.kick_indices[kick_discs],
+            normal * self.kick_strength[kick_players, np.newaxis],
+        )
+        np.add.at(
+            world.velocity,
+            kicker_indices,
+            normal
+            * self.kickback[kick_players, np.newaxis]
+            * world.inverse_mass[kicker_indices, np.newaxis],
+        )
+        return kick.any(axis=1)
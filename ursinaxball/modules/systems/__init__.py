@@ -1,5 +1,35 @@
-from .game_recorder import GameActionRecorder, GamePositionRecorder
-from .game_renderer import GameRenderer
+from typing import TYPE_CHECKING
+
+from .game_recorder import (
+    GameActionRecorder,
+    GameActionStreamRecorder,
+    GamePositionRecorder,
+    PositionRecording,
+    read_position_recording,
+)
 from .game_score import GameScore
+from .observation_builder import ObservationBuilder
+
+if TYPE_CHECKING:
+    from .game_renderer import GameRenderer
+
+__all__ = [
+    "GameActionRecorder",
+    "GameActionStreamRecorder",
+    "GamePositionRecorder",
+    "GameRenderer",
+    "GameScore",
+    "ObservationBuilder",
+    "PositionRecording",
+    "read_position_recording",
+]
+
+
+def __getattr__(name: str):
+    # The renderer imports ursina, so it is only loaded once it is used and
+    # headless games never import the graphics libraries
+    if name == "GameRenderer":
+        from .game_renderer import GameRenderer
 
-__all__ = ["GameActionRecorder", "GamePositionRecorder", "GameRenderer", "GameScore"]
+        return GameRenderer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,7 @@
 import logging
 from dataclasses import dataclass
 
-from ursinaxball.common_values import BaseMap
+from ursinaxball.common_values import BaseMap, PhysicsBackend
 
 
 @dataclass
@@ -15,6 +15,10 @@ class GameConfig:
     enable_renderer: bool = True
     fov: int = 550
     enable_recorder: bool = True
+    # Write the action recordings while the game runs, see GameActionStreamRecorder
+    stream_recorder: bool = False
+    enable_disc_broadphase: bool = False
+    physics_backend: PhysicsBackend = PhysicsBackend.NUMPY
 
     def __post_init__(self):
         logging.basicConfig(
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import logging
+import queue
+import struct
+import threading
 import time
+import zlib
+from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -12,6 +18,20 @@ from ursinaxball.common_values import Input
 if TYPE_CHECKING:
     from ursinaxball import Game
 
+log = logging.getLogger(__name__)
+
+# Action recordings starting with this magic are streamed recordings, of the
+# version given by the next byte. Older recordings are one msgpack object.
+ACTION_RECORDING_MAGIC = b"HBAR"
+ACTION_RECORDING_VERSION = 2
+
+# Position recordings of version 2 start with the magic, the version byte and
+# the size of the msgpack header, see GamePositionRecorder
+POSITION_RECORDING_MAGIC = b"HBPR"
+POSITION_RECORDING_VERSION = 2
+POSITION_RECORDING_ALIGNMENT = 64
+POSITION_HEADER_PREFIX = struct.Struct("<4sB3xI")
+
 # This is temporary, until we have a proper game recorder system
 # In the meantime, we will use the same recording system than my JS version
 
@@ -35,6 +55,58 @@ def input_translate_js(actions: np.ndarray) -> int:
     return result
 
 
+# Input flags of the x and y directions from -2 to 2, the directions out of
+# [-1, 1] press no key like in input_translate_js
+X_INPUTS = np.array([0, Input.LEFT, 0, Input.RIGHT, 0], dtype=np.uint8)
+Y_INPUTS = np.array([0, Input.DOWN, 0, Input.UP, 0], dtype=np.uint8)
+
+
+def input_translate_js_batch(actions: np.ndarray) -> np.ndarray:
+    """
+    Vectorized input_translate_js, returns the (P,) uint8 inputs of (P, 3)
+    actions
+    """
+    actions = np.asarray(actions)
+    # mode="clip" maps the directions out of the tables to their ends
+    return (
+        np.take(X_INPUTS, actions[:, 0] + 2, mode="clip")
+        + np.take(Y_INPUTS, actions[:, 1] + 2, mode="clip")
+        + (actions[:, 2] != 0) * np.uint8(Input.SHOOT)
+    )
+
+
+def get_input_actions() -> np.ndarray:
+    """
+    Returns the (32, 3) actions of every combination of the Input flags
+    """
+    inputs = np.arange(32)
+    input_actions = np.zeros((32, 3), dtype=np.int8)
+    input_actions[:, 0] = ((inputs & Input.RIGHT) != 0).astype(np.int8) - (
+        (inputs & Input.LEFT) != 0
+    )
+    input_actions[:, 1] = ((inputs & Input.UP) != 0).astype(np.int8) - (
+        (inputs & Input.DOWN) != 0
+    )
+    input_actions[:, 2] = (inputs & Input.SHOOT) != 0
+    return input_actions
+
+
+# Actions of the inputs, indexed by the packed Input flags
+INPUT_ACTIONS = get_input_actions()
+
+
+def input_translate_py(inputs: np.ndarray) -> np.ndarray:
+    """
+    Inverse of input_translate_js_batch, returns the (P, 3) int8 actions of the
+    (P,) packed Input flags. Opposite directions cancel each other out.
+    """
+    inputs = np.asarray(inputs)
+    # Negative inputs and inputs above the flags both have higher bits set
+    if (inputs >> len(Input)).any():
+        raise ValueError(f"Inputs must be in [0, {len(INPUT_ACTIONS)}), got {inputs}")
+    return INPUT_ACTIONS[inputs]
+
+
 class GameActionRecorder:
     def __init__(self, game: Game, folder_rec: str = ""):
         self.game = game
@@ -45,6 +117,8 @@ class GameActionRecorder:
         self.player_info = []
         self.player_action = []
         self.options = []
+        # (T, P) inputs of the recording read by read_from_file
+        self.inputs = np.zeros((0, 0), dtype=np.uint8)
 
     def generate_replay_name(self):
         """
@@ -66,8 +140,8 @@ class GameActionRecorder:
         self.options = [self.game.team_kickoff * 8]
 
     def step(self, actions: np.ndarray):
-        for i, action in enumerate(actions):
-            self.player_action[i].append(input_translate_js(action))
+        for i, value in enumerate(input_translate_js_batch(actions).tolist()):
+            self.player_action[i].append(value)
 
     def stop(self, save: bool = True):
         players_list = [
@@ -85,28 +159,261 @@ class GameActionRecorder:
         self.options = []
 
     def save(self, file_name: str) -> None:
-        with (Path(__file__).parent / self.folder_rec / file_name).open("wb+") as f:
+        with self.get_path(file_name).open("wb+") as f:
             encoded_recording = msgpack.packb(self.recording)
             f.write(encoded_recording)
 
+    def get_path(self, file_name: str) -> Path:
+        return Path(__file__).parent / self.folder_rec / file_name
+
     def read_from_file(self, file_name: str) -> None:
+        """
+        Reads a recording of any version. The inputs of the players are also
+        stored as a (T, P) uint8 array in self.inputs.
+        """
         with Path(file_name).open("rb") as f:
-            self.recording = msgpack.unpackb(f.read())
-            self.options = [self.recording[0]]
+            data = f.read()
+
+        if data.startswith(ACTION_RECORDING_MAGIC):
+            options, self.player_info, self.inputs = read_action_stream(data)
+            self.player_action = self.inputs.T.tolist()
+            self.recording = [
+                options,
+                [
+                    [info, action]
+                    for info, action in zip(self.player_info, self.player_action)
+                ],
+            ]
+        else:
+            self.recording = msgpack.unpackb(data)
             self.player_info = [info for info, _ in self.recording[1]]
             self.player_action = [action for _, action in self.recording[1]]
+            self.inputs = np.array(self.player_action, dtype=np.uint8).T.reshape(
+                -1, len(self.player_info)
+            )
+        self.options = [self.recording[0]]
+
+
+def read_action_stream(data: bytes) -> tuple[int, list, np.ndarray]:
+    """
+    Parses a streamed action recording, see GameActionStreamRecorder
+
+    Returns:
+        tuple[int, list, np.ndarray]: The options, the player infos and the
+            (T, P) uint8 inputs of the players
+    """
+    version = data[len(ACTION_RECORDING_MAGIC)]
+    if version != ACTION_RECORDING_VERSION:
+        raise ValueError(f"Unsupported action recording version: {version}")
+
+    unpacker = msgpack.Unpacker()
+    unpacker.feed(data[len(ACTION_RECORDING_MAGIC) + 1 :])
+    options, player_info = next(unpacker)
+    chunks = [
+        np.frombuffer(zlib.decompress(chunk), dtype=np.uint8).reshape(
+            -1, len(player_info)
+        )
+        for chunk in unpacker
+    ]
+    if not chunks:
+        return options, player_info, np.zeros((0, len(player_info)), dtype=np.uint8)
+    return options, player_info, np.concatenate(chunks)
+
+
+class GameActionStreamRecorder(GameActionRecorder):
+    """
+    GameActionRecorder writing the recording to disk while the game runs.
+
+    The inputs of the players are packed into uint8 buffers of chunk_ticks
+    ticks. Full buffers are compressed and appended to a temporary file by a
+    background thread, then given back for reuse, so the memory used does not
+    grow with the length of the game and stop only has to flush the last
+    chunk. The file gets its final name, which holds the score, on stop.
+
+    A recording is ACTION_RECORDING_MAGIC, the version byte, then a sequence of
+    msgpack objects: [options, player_info], followed by one zlib compressed
+    bin per chunk holding its (ticks, P) inputs in row-major order.
+    """
+
+    def __init__(
+        self,
+        game: Game,
+        folder_rec: str = "",
+        chunk_ticks: int = 4096,
+        num_buffers: int = 4,
+        compression_level: int = 6,
+    ):
+        super().__init__(game, folder_rec)
+        self.chunk_ticks = chunk_ticks
+        self.num_buffers = num_buffers
+        self.compression_level = compression_level
+
+        self.path: Path | None = None
+        self.file = None
+        self.thread: threading.Thread | None = None
+        self.error: Exception | None = None
+        self.free_buffers: queue.Queue = queue.Queue()
+        self.full_buffers: queue.Queue = queue.Queue()
+        self.buffer = np.zeros((0, 0), dtype=np.uint8)
+        self.buffer_ticks = 0
+
+    def start(self):
+        super().start()
+        self.player_action = []
+        num_players = len(self.player_info)
+        self.free_buffers = queue.Queue()
+        self.full_buffers = queue.Queue()
+        for _ in range(self.num_buffers):
+            self.free_buffers.put(
+                np.zeros((self.chunk_ticks, num_players), dtype=np.uint8)
+            )
+        self.buffer = self.free_buffers.get()
+        self.buffer_ticks = 0
+        self.error = None
+
+        self.path = self.get_path(f"HBR_{time.time_ns()}.hbar.part")
+        self.file = self.path.open("wb")
+        self.file.write(ACTION_RECORDING_MAGIC)
+        self.file.write(bytes([ACTION_RECORDING_VERSION]))
+        self.file.write(msgpack.packb([self.options[0], self.player_info]))
+        self.thread = threading.Thread(target=self._write_chunks, daemon=True)
+        self.thread.start()
+
+    def step(self, actions: np.ndarray):
+        if self.error is not None:
+            raise RuntimeError("The recording could not be written") from self.error
+        self.buffer[self.buffer_ticks] = input_translate_js_batch(actions)
+        self.buffer_ticks += 1
+        if self.buffer_ticks == self.chunk_ticks:
+            self.full_buffers.put((self.buffer, self.buffer_ticks))
+            # Waits for the writer if every buffer is still queued
+            self.buffer = self.free_buffers.get()
+            self.buffer_ticks = 0
+
+    def stop(self, save: bool = True):
+        if self.file is not None:
+            if self.buffer_ticks > 0:
+                self.full_buffers.put((self.buffer, self.buffer_ticks))
+            self.full_buffers.put(None)
+            self.thread.join()
+            self.file.close()
+            self.file = None
+
+            self.filename = self.generate_replay_name()
+            if save and self.error is None:
+                self.path.replace(self.get_path(self.filename))
+            else:
+                self.path.unlink()
+            if self.error is not None:
+                raise RuntimeError("The recording could not be written") from self.error
+
+        self.recording = []
+        self.player_info = []
+        self.player_action = []
+        self.options = []
+
+    def _write_chunks(self) -> None:
+        """
+        Compresses and writes the full buffers until stop, runs in self.thread
+        """
+        while (item := self.full_buffers.get()) is not None:
+            buffer, ticks = item
+            try:
+                if self.error is None:
+                    chunk = zlib.compress(
+                        buffer[:ticks].tobytes(), self.compression_level
+                    )
+                    self.file.write(msgpack.packb(chunk))
+            except Exception as error:
+                log.exception("Failed to write the recording")
+                self.error = error
+            finally:
+                # The buffer is given back even on failure, or step would wait
+                self.free_buffers.put(buffer)
+
+
+@dataclass
+class PositionRecording:
+    """
+    Columns of a position recording, memory-mapped read-only for version 2.
+
+    players holds the x, y, x velocity, y velocity, kicking and kick cancel
+    flag of every player at every tick, ball the x, y, x velocity and y
+    velocity of the ball and state the GameState.
+    """
+
+    options: int
+    player_info: list
+    stadium: str
+    players: np.ndarray  # (T, P, 6) float32
+    ball: np.ndarray  # (T, 4) float32
+    state: np.ndarray  # (T,) int8
+
+    @property
+    def ticks(self) -> int:
+        return len(self.players)
+
+
+def align(offset: int) -> int:
+    return -(-offset // POSITION_RECORDING_ALIGNMENT) * POSITION_RECORDING_ALIGNMENT
+
+
+def read_position_recording(file_name: str) -> PositionRecording:
+    """
+    Maps the columns of a position recording of version 2 without parsing them
+    """
+    with Path(file_name).open("rb") as f:
+        prefix = f.read(POSITION_HEADER_PREFIX.size)
+        magic, version, header_size = POSITION_HEADER_PREFIX.unpack(prefix)
+        if magic != POSITION_RECORDING_MAGIC:
+            raise ValueError(f"{file_name} is not a position recording of version 2")
+        if version != POSITION_RECORDING_VERSION:
+            raise ValueError(f"Unsupported position recording version: {version}")
+        header = msgpack.unpackb(f.read(header_size))
+
+    data = np.memmap(file_name, dtype=np.uint8, mode="r")
+    start = align(POSITION_HEADER_PREFIX.size + header_size)
+    columns = {}
+    for name, dtype_name, shape, offset in header["columns"]:
+        dtype = np.dtype(dtype_name)
+        size = int(np.prod(shape)) * dtype.itemsize
+        column = data[start + offset : start + offset + size]
+        columns[name] = column.view(dtype).reshape(shape)
+    return PositionRecording(
+        options=header["options"],
+        player_info=header["player_info"],
+        stadium=header["stadium"],
+        **columns,
+    )
 
 
 class GamePositionRecorder:
-    def __init__(self, game: Game, folder_rec: str = ""):
+    """
+    Records the discs of the players and of the ball at every tick.
+
+    The values are written into numpy chunks of chunk_ticks ticks and saved as
+    a version 2 .hbpr file: POSITION_HEADER_PREFIX (magic, version and size of
+    the header), a msgpack header with the players, the stadium and the name,
+    dtype, shape and offset of every column, then the little-endian columns,
+    each one starting on a POSITION_RECORDING_ALIGNMENT boundary. The offsets
+    are relative to the first column, which starts on the first boundary after
+    the header. read_position_recording maps the columns back without parsing.
+    """
+
+    def __init__(self, game: Game, folder_rec: str = "", chunk_ticks: int = 4096):
         self.game = game
         self.folder_rec = folder_rec
+        self.chunk_ticks = chunk_ticks
 
         self.filename = ""
-        self.recording = []
         self.player_info = []
-        self.player_action = []
         self.options = []
+        self.chunks: list[dict[str, np.ndarray]] = []
+        self.ticks = 0
+        # Recording read by read_from_file
+        self.positions: PositionRecording | None = None
+        self.recording = []
+        self.player_action = []
 
     def generate_replay_name(self):
         """
@@ -124,53 +431,93 @@ class GamePositionRecorder:
         self.player_info = [
             [player.name, f"{player.id}", player.team] for player in self.game.players
         ]
-        self.player_info.append(["ball", "0", 0])
-        self.player_action = [[] for _ in self.game.players]
-        self.player_action.append([])
         self.options = [self.game.team_kickoff * 8]
+        self.chunks = [self._new_chunk()]
+        self.ticks = 0
+
+    def _new_chunk(self) -> dict[str, np.ndarray]:
+        return {
+            "players": np.zeros(
+                (self.chunk_ticks, len(self.player_info), 6), dtype="<f4"
+            ),
+            "ball": np.zeros((self.chunk_ticks, 4), dtype="<f4"),
+            "state": np.zeros(self.chunk_ticks, dtype="i1"),
+        }
 
     def step(self, _actions: np.ndarray):
-        for i, player in enumerate(self.game.players):
-            disc = player.disc
-            disc_value = [
-                disc.position[0],
-                disc.position[1],
-                disc.velocity[0],
-                disc.velocity[1],
-                int(player.kicking),
-                int(player._kick_cancel),  # noqa: SLF001
-            ]
-            self.player_action[i].append(disc_value)
-        ball = self.game.stadium_game.discs[0]
-        ball_value = [
-            ball.position[0],
-            ball.position[1],
-            ball.velocity[0],
-            ball.velocity[1],
-        ]
-        self.player_action[-1].append(ball_value)
+        index = self.ticks % self.chunk_ticks
+        if index == 0 and self.ticks > 0:
+            self.chunks.append(self._new_chunk())
+        chunk = self.chunks[-1]
+        world = self.game.stadium_game.world
+        player_indices = self.game.player_disc_indices
+        players = chunk["players"][index]
+        players[:, 0:2] = world.position[player_indices]
+        players[:, 2:4] = world.velocity[player_indices]
+        for values, player in zip(players, self.game.players):
+            values[4] = player.kicking
+            values[5] = player._kick_cancel  # noqa: SLF001
+        chunk["ball"][index, 0:2] = world.position[0]
+        chunk["ball"][index, 2:4] = world.velocity[0]
+        chunk["state"][index] = self.game.state
+        self.ticks += 1
 
     def stop(self, save: bool = True):
-        players_list = [
-            [info, action] for info, action in zip(self.player_info, self.player_action)
-        ]
         if len(self.options) > 0:
-            self.recording = [self.options[0], players_list]
             self.filename = self.generate_replay_name()
             if save:
                 self.save(self.filename)
 
-        self.recording = []
         self.player_info = []
-        self.player_action = []
         self.options = []
+        self.chunks = []
+        self.ticks = 0
 
     def save(self, file_name: str) -> None:
+        columns = []
+        offset = 0
+        for name, column in self.chunks[0].items():
+            shape = [self.ticks, *column.shape[1:]]
+            columns.append([name, column.dtype.str, shape, offset])
+            offset = align(offset + self.ticks * column[0].nbytes)
+        header = msgpack.packb(
+            {
+                "options": self.options[0],
+                "player_info": self.player_info,
+                "stadium": self.game.stadium_game.name,
+                "columns": columns,
+            }
+        )
+
         with (Path(__file__).parent / self.folder_rec / file_name).open("wb+") as f:
-            encoded_recording = msgpack.packb(self.recording)
-            f.write(encoded_recording)
+            f.write(
+                POSITION_HEADER_PREFIX.pack(
+                    POSITION_RECORDING_MAGIC, POSITION_RECORDING_VERSION, len(header)
+                )
+            )
+            f.write(header)
+            start = align(f.tell())
+            for name, _, _, column_offset in columns:
+                f.seek(start + column_offset)
+                for i, chunk in enumerate(self.chunks):
+                    ticks = min(self.ticks - i * self.chunk_ticks, self.chunk_ticks)
+                    f.write(chunk[name][:ticks].tobytes())
 
     def read_from_file(self, file_name: str) -> None:
+        """
+        Reads a recording of any version. Version 2 recordings are mapped into
+        self.positions, older ones are parsed into self.recording.
+        """
+        with Path(file_name).open("rb") as f:
+            is_mapped = (
+                f.read(len(POSITION_RECORDING_MAGIC)) == POSITION_RECORDING_MAGIC
+            )
+        if is_mapped:
+            self.positions = read_position_recording(file_name)
+            self.options = [self.positions.options]
+            self.player_info = [*self.positions.player_info, ["ball", "0", 0]]
+            return
+
         with Path(file_name).open("rb") as f:
             self.recording = msgpack.unpackb(f.read())
             self.options = [self.recording[0]]
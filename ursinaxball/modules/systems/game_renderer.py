@@ -23,9 +23,7 @@ class GameRenderer:
         self.fov = fov
 
     def get_disc_player(self, disc: Disc):
-        if not hasattr(disc, "player_id"):
-            return None
-        return self.game.get_player_by_id(disc.player_id)
+        return self.game.get_disc_player(disc)
 
     def handle_shooting(self, disc: Disc, entity: Entity) -> None:
         player = self.get_disc_player(disc)
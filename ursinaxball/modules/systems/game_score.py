@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from ursina import Entity, Quad, Text, Vec2, Vec3, camera
+from typing import TYPE_CHECKING
 
 from ursinaxball.common_values import GameState, TeamColor, TeamID
 from ursinaxball.objects.base import PhysicsObject
 
+if TYPE_CHECKING:
+    from ursina import Entity
+
 
 class GameScore:
+    # Counters saved by the snapshots of a game, in order
+    COUNTERS = ("ticks", "total_ticks", "time", "red", "blue", "animation_timeout")
+
     def __init__(self, time_limit: int | None = None, score_limit: int | None = None):
         # The GameScore object is used to keep track of the score of the game.
         # Score limit = 0 means no score limit, same for time limit.
@@ -35,6 +41,13 @@ class GameScore:
         self.blue = 0
         self.animation_timeout = 0
 
+    def get_counters(self) -> list[float]:
+        return [getattr(self, name) for name in self.COUNTERS]
+
+    def set_counters(self, values: list[float]) -> None:
+        for name, value in zip(self.COUNTERS, values):
+            setattr(self, name, value if name == "time" else int(value))
+
     def update_score(self, team_id: int) -> None:
         if team_id == TeamID.BLUE:
             self.red += 1
@@ -78,6 +91,8 @@ class GameScore:
         return f"{self.red} - {self.blue}"
 
     def get_time_entity(self) -> Entity:
+        from ursina import Text, Vec2
+
         text_time = self.get_time_string()
         text_time_width = Text.get_width(text_time)
 
@@ -91,6 +106,8 @@ class GameScore:
         return time_text_entity
 
     def get_fixed_entities(self) -> Entity:
+        from ursina import Entity, Quad, Text, Vec2, Vec3, camera
+
         background_score = Entity(
             parent=camera.ui,
             position=Vec3(0, 0.5 - Text.size * 1.25, 1),
@@ -127,6 +144,8 @@ class GameScore:
         return [background_score, red_score_square, blue_score_square]
 
     def get_string_entities(self) -> Entity:
+        from ursina import Text, Vec2
+
         score_text_entity = Text(
             position=Vec2(-0.175, 0.5 - Text.size * 1.35),
             origin=Vec2(0, 0),
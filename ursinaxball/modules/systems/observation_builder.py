@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ursinaxball.common_values import GameState, TeamID
+
+if TYPE_CHECKING:
+    from ursinaxball import Game
+
+
+class ObservationBuilder:
+    """
+    Builds the observations of every player of a started game into a float32
+    buffer of shape (P, size), straight from the arrays of the physics world.
+
+    The features are written in the order of FEATURES, each one at
+    slices[feature] of a row. The players are listed from the point of view of
+    the row: the player itself, its teammates, then its opponents, each group in
+    the order of game.players.
+
+        ball: position and velocity of the ball (4)
+        players: position and velocity of every player (4 * P)
+        relative: ball and other players relative to the player (2 * P)
+        goals: distance from the ball then from the player to the centre of
+            their own goal and of the opponent goal (4)
+        kick: whether each player is kicking (P)
+        score: goals of the team of the player, then of the opponents (2)
+        time: elapsed time and time limit in seconds (2)
+        state: one-hot encoding of the GameState (4)
+
+    With mirror, the x axis is flipped for the blue players like
+    Bot.symmetry_action, so every player sees itself attacking to the right.
+    Build a new ObservationBuilder when the players of the game change.
+    """
+
+    FEATURES = (
+        "ball",
+        "players",
+        "relative",
+        "goals",
+        "kick",
+        "score",
+        "time",
+        "state",
+    )
+
+    def __init__(
+        self,
+        game: Game,
+        features: tuple[str, ...] = FEATURES,
+        mirror: bool = True,
+        position_scale: float = 1.0,
+        velocity_scale: float = 1.0,
+        time_scale: float = 1.0,
+    ):
+        unknown = set(features) - set(self.FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown observation features: {sorted(unknown)}")
+
+        self.game = game
+        self.features = tuple(f for f in self.FEATURES if f in features)
+        self.time_scale = time_scale
+        players = game.players
+        num_players = len(players)
+        self.num_players = num_players
+
+        sizes = {
+            "ball": 4,
+            "players": 4 * num_players,
+            "relative": 2 * num_players,
+            "goals": 4,
+            "kick": num_players,
+            "score": 2,
+            "time": 2,
+            "state": len(GameState),
+        }
+        self.slices: dict[str, slice] = {}
+        self.size = 0
+        for feature in self.features:
+            self.slices[feature] = slice(self.size, self.size + sizes[feature])
+            self.size += sizes[feature]
+
+        # Players seen by each row: itself, its teammates then its opponents
+        teams = [player.team for player in players]
+        self.player_order = np.array(
+            [
+                [p]
+                + [q for q in range(num_players) if q != p and teams[q] == teams[p]]
+                + [q for q in range(num_players) if teams[q] != teams[p]]
+                for p in range(num_players)
+            ],
+            dtype=np.intp,
+        ).reshape(num_players, num_players)
+        # Disc rows of the ball then of the players in the order of each row
+        self.rows = np.concatenate(
+            [
+                np.zeros((num_players, 1), dtype=np.intp),
+                game.player_disc_indices[self.player_order],
+            ],
+            axis=1,
+        )
+
+        flip = np.array(
+            [-1.0 if mirror and team == TeamID.BLUE else 1.0 for team in teams]
+        )
+        axes = np.stack([flip, np.ones(num_players)], axis=1)[:, np.newaxis]
+        self.position_factor = axes / position_scale
+        self.velocity_factor = axes / velocity_scale
+
+        stadium = game.stadium_game
+        goal_centres = np.zeros((num_players, 2, 2))
+        for p, team in enumerate(teams):
+            opponent = TeamID.RED if team == TeamID.BLUE else TeamID.BLUE
+            for g, goal_team in enumerate((team, opponent)):
+                points = stadium.goal_points[stadium.goal_teams == goal_team]
+                if len(points) > 0:
+                    goal_centres[p, g] = points.mean(axis=(0, 1))
+        self.goal_centres = goal_centres * self.position_factor
+        self.score_order = np.array(
+            [[0, 1] if team != TeamID.BLUE else [1, 0] for team in teams],
+            dtype=np.intp,
+        ).reshape(num_players, 2)
+
+        # Scratch arrays reused by every build
+        self.positions = np.zeros((num_players, num_players + 1, 2))
+        self.velocities = np.zeros((num_players, num_players + 1, 2))
+        self.goal_difference = np.zeros((num_players, 2, 2, 2))
+        self.kicking = np.zeros(num_players, dtype=np.float32)
+        self.score_values = np.zeros(2, dtype=np.float32)
+
+    def new_buffer(self) -> NDArray[np.float32]:
+        return np.zeros((self.num_players, self.size), dtype=np.float32)
+
+    def build(self, out: NDArray[np.float32]) -> NDArray[np.float32]:
+        """
+        Writes the observations of the current tick into out
+
+        Args:
+            out: C-contiguous float32 array of shape (P, size)
+
+        Returns:
+            NDArray[np.float32]: out
+        """
+        if (
+            out.shape != (self.num_players, self.size)
+            or out.dtype != np.float32
+            or not out.flags.c_contiguous
+        ):
+            raise ValueError(
+                f"Observations must be a C-contiguous float32 array of shape "
+                f"{(self.num_players, self.size)}"
+            )
+        if len(self.game.players) != self.num_players:
+            raise ValueError("The players of the game changed since the builder")
+
+        game = self.game
+        world = game.stadium_game.world
+        num_players = self.num_players
+        positions = self.positions
+        velocities = self.velocities
+        # mode="clip" does not buffer out, the rows are always in range
+        np.take(world.position, self.rows, axis=0, out=positions, mode="clip")
+        np.take(world.velocity, self.rows, axis=0, out=velocities, mode="clip")
+        positions *= self.position_factor
+        velocities *= self.velocity_factor
+
+        slices = self.slices
+        if "ball" in slices:
+            ball = out[:, slices["ball"]].reshape(num_players, 2, 2)
+            ball[:, 0] = positions[:, 0]
+            ball[:, 1] = velocities[:, 0]
+        if "players" in slices:
+            discs = out[:, slices["players"]].reshape(num_players, num_players, 4)
+            discs[..., :2] = positions[:, 1:]
+            discs[..., 2:] = velocities[:, 1:]
+        if "relative" in slices:
+            relative = out[:, slices["relative"]].reshape(num_players, num_players, 2)
+            np.subtract(positions[:, 0], positions[:, 1], out=relative[:, 0])
+            np.subtract(positions[:, 2:], positions[:, 1:2], out=relative[:, 1:])
+        if "goals" in slices:
+            difference = self.goal_difference
+            np.subtract(
+                positions[:, :2, np.newaxis],
+                self.goal_centres[:, np.newaxis],
+                out=difference,
+            )
+            np.square(difference, out=difference)
+            distances = out[:, slices["goals"]].reshape(num_players, 2, 2)
+            np.sum(difference, axis=-1, out=distances)
+            np.sqrt(distances, out=distances)
+        if "kick" in slices:
+            kicking = self.kicking
+            for p, player in enumerate(game.players):
+                kicking[p] = player.is_kicking()
+            np.take(kicking, self.player_order, out=out[:, slices["kick"]], mode="clip")
+        if "score" in slices:
+            self.score_values[0] = game.score.red
+            self.score_values[1] = game.score.blue
+            np.take(
+                self.score_values,
+                self.score_order,
+                out=out[:, slices["score"]],
+                mode="clip",
+            )
+        if "time" in slices:
+            time = out[:, slices["time"]]
+            time[:, 0] = game.score.time * self.time_scale
+            time[:, 1] = game.score.time_limit * self.time_scale
+        if "state" in slices:
+            state = out[:, slices["state"]]
+            state.fill(0)
+            state[:, game.state] = 1
+        return out
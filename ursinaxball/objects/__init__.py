@@ -1,8 +1,20 @@
 from .base import PhysicsObject
-from .stadium_object import Stadium, load_stadium_hbs
+from .physics_world import BatchPhysicsWorld, PhysicsWorld
+from .stadium_object import (
+    STADIUM_CACHE,
+    Stadium,
+    StadiumCache,
+    load_stadium_compiled,
+    load_stadium_hbs,
+)
 
 __all__ = [
+    "STADIUM_CACHE",
+    "BatchPhysicsWorld",
     "PhysicsObject",
+    "PhysicsWorld",
     "Stadium",
+    "StadiumCache",
+    "load_stadium_compiled",
     "load_stadium_hbs",
 ]
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from numpy import pi
-from ursina import Entity, Mesh, Pipe, Sky
 
 from ursinaxball.common_values import (
     DEFAULT_BORDER_COLOR,
@@ -13,6 +14,9 @@ from ursinaxball.common_values import (
 )
 from ursinaxball.objects.base.physics_object import PhysicsObject
 
+if TYPE_CHECKING:
+    from ursina import Entity
+
 
 class Background:
     def __init__(self, data_object: dict | None = None):
@@ -36,6 +40,8 @@ class Background:
             self.fill_color = DEFAULT_FILL_COLOR
 
     def get_limit_entity(self) -> Entity | None:
+        from ursina import Entity, Mesh
+
         if self.type not in ("grass", "hockey"):
             return None
 
@@ -63,6 +69,8 @@ class Background:
             return limit_entity
 
     def get_kickoff_circle_entity(self) -> Entity | None:
+        from ursina import Entity, Pipe
+
         if self.type in ("grass", "hockey"):
             circle_vertices = PhysicsObject.arc(
                 x=0,
@@ -87,6 +95,8 @@ class Background:
             return kickoff_circle_entity
 
     def get_kickoff_line_entity(self) -> Entity | None:
+        from ursina import Entity, Mesh
+
         if self.type not in ("grass", "hockey"):
             return None
 
@@ -108,6 +118,8 @@ class Background:
             return limit_entity
 
     def get_fill_canvas(self) -> Entity:
+        from ursina import Entity, Sky
+
         color = self.color if self.color is not None else self.fill_color
         sky = Sky()
         sky = Entity(
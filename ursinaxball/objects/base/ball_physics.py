@@ -11,6 +11,8 @@ class BallPhysics(Disc):
     A class to represent the state of a ball from the game.
     """
 
+    __slots__ = ()
+
     def __init__(self, data_object: dict | None, data_stadium: dict):
         if data_object is None:
             data_object = {}
@@ -26,7 +28,7 @@ class BallPhysics(Disc):
         self.collision_mask = (
             self.collision_mask ^ CollisionFlag.REDKO ^ CollisionFlag.BLUEKO
         )
-        del self.trait
+        self.trait = None
 
     def apply_default_values(self):
         """
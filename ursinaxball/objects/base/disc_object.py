@@ -1,25 +1,116 @@
 from __future__ import annotations
 
 import copy
+from typing import TYPE_CHECKING
 
 import numpy as np
-from ursina import Entity
 
 from ursinaxball.common_values import CollisionFlag
 from ursinaxball.objects.base.physics_object import PhysicsObject
 
+if TYPE_CHECKING:
+    from ursina import Entity
+
+    from ursinaxball.objects.physics_world import PhysicsWorld
+
+
+def world_vector(name: str) -> property:
+    """
+    Returns a property reading a (2,) row of the world array `name`.
+    The value is stored on the disc itself while it is not bound to a world.
+    """
+    local_name = f"_{name}"
+
+    def getter(self: Disc) -> np.ndarray:
+        if self._world is None:
+            return getattr(self, local_name)
+        return getattr(self._world, name)[self._index]
+
+    def setter(self: Disc, value: np.ndarray) -> None:
+        if self._world is None:
+            setattr(self, local_name, value)
+        else:
+            getattr(self._world, name)[self._index] = value
+
+    return property(getter, setter)
+
+
+def world_scalar(name: str) -> property:
+    """
+    Returns a property reading a scalar entry of the world array `name`.
+    The value is stored on the disc itself while it is not bound to a world.
+    """
+    local_name = f"_{name}"
+
+    def getter(self: Disc) -> float:
+        if self._world is None:
+            return getattr(self, local_name)
+        return getattr(self._world, name)[self._index].item()
+
+    def setter(self: Disc, value: float) -> None:
+        if self._world is None:
+            setattr(self, local_name, value)
+        else:
+            getattr(self._world, name)[self._index] = value
+
+    return property(getter, setter)
+
 
 class Disc(PhysicsObject):
     """
     A class to represent the state of a disc from the game.
     """
 
+    # The fields of the world are stored in the underscored slots while the disc
+    # is not bound to a world
+    __slots__ = (
+        "_bouncing_coefficient",
+        "_collision_group",
+        "_collision_mask",
+        "_damping",
+        "_gravity",
+        "_index",
+        "_inverse_mass",
+        "_position",
+        "_radius",
+        "_velocity",
+        "_world",
+        "color",
+        "player_id",
+    )
+
+    WORLD_FIELDS = (
+        "position",
+        "velocity",
+        "gravity",
+        "radius",
+        "inverse_mass",
+        "damping",
+        "bouncing_coefficient",
+        "collision_group",
+        "collision_mask",
+    )
+
+    position = world_vector("position")
+    velocity = world_vector("velocity")
+    gravity = world_vector("gravity")
+    radius = world_scalar("radius")
+    inverse_mass = world_scalar("inverse_mass")
+    damping = world_scalar("damping")
+    bouncing_coefficient = world_scalar("bouncing_coefficient")
+    collision_group = world_scalar("collision_group")
+    collision_mask = world_scalar("collision_mask")
+
     def __init__(
         self, data_object: dict | None = None, data_stadium: dict | None = None
     ):
         if data_object is None:
             data_object = {}
 
+        self._world: PhysicsWorld | None = None
+        self._index = -1
+        # Id of the player controlling the disc, -1 for the discs of the stadium
+        self.player_id = -1
         self.collision_group: int = self.transform_collision_dict(
             data_object.get("cGroup")
         )
@@ -60,6 +151,30 @@ class Disc(PhysicsObject):
         if self.color is None:
             self.color = "FFFFFF"
 
+    @property
+    def world(self) -> PhysicsWorld | None:
+        """
+        Returns the physics world storing the state of the disc, if any
+        """
+        return self._world
+
+    @property
+    def index(self) -> int:
+        """
+        Returns the row of the disc in its physics world, -1 if it is not bound
+        """
+        return self._index
+
+    def bind(self, world: PhysicsWorld, index: int) -> None:
+        """
+        Moves the state of the disc into the row `index` of the physics world
+        """
+        values = [getattr(self, name) for name in self.WORLD_FIELDS]
+        self._world = world
+        self._index = index
+        for name, value in zip(self.WORLD_FIELDS, values):
+            setattr(self, name, value)
+
     def copy(self, other: Disc) -> None:
         self.collision_group = copy.copy(other.collision_group)
         self.collision_mask = copy.copy(other.collision_mask)
@@ -81,6 +196,8 @@ class Disc(PhysicsObject):
             self.gravity[1] *= -1
 
     def get_entity(self) -> Entity:
+        from ursina import Entity
+
         disc_parent = Entity(
             x=self.position[0],
             y=self.position[1],
@@ -10,6 +10,8 @@ class Goal(PhysicsObject):
     A class to represent the state of a goal from the game.
     """
 
+    __slots__ = ("points", "team")
+
     def __init__(self, data_object: dict | None, data_stadium: dict):
         if data_object is None:
             data_object = {}
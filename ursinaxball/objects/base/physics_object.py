@@ -1,17 +1,22 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
 
 from numpy import cos, sin
-from ursina.color import Color, rgba
 
 from ursinaxball.common_values import DICT_COLLISION, DICT_KEYS
 
+if TYPE_CHECKING:
+    from ursina.color import Color
+
 
 class PhysicsObject(ABC):
     """Base class for all physics objects in the game."""
 
-    trait: str | None = None
+    # Physics objects have a fixed set of attributes, declared as slots for
+    # fast access and small instances
+    __slots__ = ("trait",)
 
     @abstractmethod
     def __init__(self, data_object: dict | None, data_stadium: dict):
@@ -64,6 +69,9 @@ class PhysicsObject(ABC):
 
     @staticmethod
     def parse_color_entity(color: str) -> Color:
+        # Imported here so that headless games never load ursina
+        from ursina.color import rgba
+
         if color == "transparent":
             return rgba(0, 0, 0, 0)
 
@@ -11,6 +11,14 @@ class Plane(PhysicsObject):
     A class to represent the state of a plane from the game.
     """
 
+    __slots__ = (
+        "bouncing_coefficient",
+        "collision_group",
+        "collision_mask",
+        "distance_origin",
+        "normal",
+    )
+
     def __init__(self, data_object: dict | None, data_stadium: dict):
         if data_object is None:
             data_object = {}
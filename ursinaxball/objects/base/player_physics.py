@@ -13,11 +13,18 @@ class PlayerPhysics(Disc):
     A class to represent the player disc object from the game.
     """
 
+    __slots__ = (
+        "acceleration",
+        "kick_strength",
+        "kickback",
+        "kicking_acceleration",
+        "kicking_damping",
+    )
+
     def __init__(self, data_object: dict | None = None, data_stadium=None):
         if data_object is None:
             data_object = {}
 
-        self.player_id = -1
         self.acceleration: float = data_object.get("acceleration")
         self.kicking_acceleration: float = data_object.get("kickingAcceleration")
         self.kicking_damping: float = data_object.get("kickingDamping")
@@ -29,7 +36,7 @@ class PlayerPhysics(Disc):
         self.position = np.array([0, 0], dtype=float)
         self.velocity = np.array([0, 0], dtype=float)
         self.color = "FFFFFF"
-        del self.trait
+        self.trait = None
 
     def apply_default_values(self):
         """
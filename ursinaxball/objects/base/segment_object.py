@@ -1,20 +1,40 @@
 from __future__ import annotations
 
 from math import pi, tan
+from typing import TYPE_CHECKING
 
 import numpy as np
-from ursina import Entity, Pipe
 
 from ursinaxball.common_values import CollisionFlag
 from ursinaxball.objects.base.physics_object import PhysicsObject
 from ursinaxball.objects.base.vertex_object import Vertex
 
+if TYPE_CHECKING:
+    from ursina import Entity
+
 
 class Segment(PhysicsObject):
     """
     A class to represent the state of a segment from the game.
     """
 
+    __slots__ = (
+        "_curveF",
+        "bias",
+        "bouncing_coefficient",
+        "circle_angle",
+        "circle_center",
+        "circle_radius",
+        "circle_tangeant",
+        "collision_group",
+        "collision_mask",
+        "color",
+        "curve",
+        "vertices",
+        "vertices_index",
+        "visible",
+    )
+
     def __init__(self, data_object: dict | None, data_stadium: dict):
         if data_object is None:
             data_object = {}
@@ -153,6 +173,8 @@ class Segment(PhysicsObject):
         self.circle_tangeant = [self.circle_tangeant[1], self.circle_tangeant[0]]
 
     def get_entity(self) -> Entity:
+        from ursina import Entity, Pipe
+
         if self.visible is False:
             return None
 
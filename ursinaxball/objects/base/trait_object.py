@@ -8,6 +8,17 @@ class Trait(PhysicsObject):
     A class to represent the state of a Trait from the game.
     """
 
+    __slots__ = (
+        "bouncing_coefficient",
+        "collision_group",
+        "collision_mask",
+        "color",
+        "damping",
+        "inverse_mass",
+        "name",
+        "radius",
+    )
+
     def __init__(self, data_object: dict | None, name: str):
         if data_object is None:
             data_object = {}
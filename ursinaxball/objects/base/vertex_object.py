@@ -11,6 +11,13 @@ class Vertex(PhysicsObject):
     A class to represent the state of a vertex from the game.
     """
 
+    __slots__ = (
+        "bouncing_coefficient",
+        "collision_group",
+        "collision_mask",
+        "position",
+    )
+
     def __init__(self, data_object: dict | None, data_stadium: dict):
         if data_object is None:
             data_object = {}
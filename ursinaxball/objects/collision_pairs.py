@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Sequence
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ursinaxball.objects.base import Plane, Segment, Vertex
+    from ursinaxball.objects.stadium_object import Stadium
+
+
+def collision_matrix(
+    group_a: np.ndarray, mask_a: np.ndarray, group_b: np.ndarray, mask_b: np.ndarray
+) -> np.ndarray:
+    """
+    Returns the (A, B) matrix of the pairs whose collision flags let them collide
+    """
+    return ((group_a[:, np.newaxis] & mask_b[np.newaxis, :]) != 0) & (
+        (mask_a[:, np.newaxis] & group_b[np.newaxis, :]) != 0
+    )
+
+
+def static_flags(objects: list[Plane] | list[Segment] | list[Vertex]) -> np.ndarray:
+    """
+    Returns the (2, M) array of the collision group and mask of static objects
+    """
+    return np.array(
+        [[o.collision_group for o in objects], [o.collision_mask for o in objects]],
+        dtype=np.int64,
+    ).reshape(2, -1)
+
+
+def iter_static(
+    segments: Sequence[Any],
+    vertices: Sequence[Any],
+    nearby: tuple[list[int], list[int]] | None = None,
+    moved: Callable[[], bool] | None = None,
+) -> Iterator[tuple[bool, Any]]:
+    """
+    Yields the segments then the vertices a disc is resolved against, in order,
+    as (is_vertex, object) tuples.
+
+    nearby holds the indices of the segments and vertices near the disc, see
+    CollisionPairs.get_nearby_static, every object is yielded if None. Only
+    those are yielded until moved returns True, checked after each object: the
+    disc may then touch any object that was too far from where it was looked
+    up, and every object left is yielded.
+    """
+    if nearby is None:
+        for segment in segments:
+            yield False, segment
+        for vertex in vertices:
+            yield True, vertex
+        return
+
+    segment_indices, vertex_indices = nearby
+    for k in segment_indices:
+        yield False, segments[k]
+        if moved():
+            for segment in segments[k + 1 :]:
+                yield False, segment
+            for vertex in vertices:
+                yield True, vertex
+            return
+    for k in vertex_indices:
+        yield True, vertices[k]
+        if moved():
+            for vertex in vertices[k + 1 :]:
+                yield True, vertex
+            return
+
+
+def has_moved(position: Sequence[float], x: float, y: float, limit: float) -> bool:
+    """
+    Whether the point is further than limit from (x, y)
+    """
+    return (position[0] - x) ** 2 + (position[1] - y) ** 2 > limit**2
+
+
+def has_moved_batch(
+    position: np.ndarray, origin: np.ndarray, limit: np.ndarray
+) -> bool:
+    """
+    Whether any of the (K, 2) points is further than its limit from its origin
+    """
+    return bool((((position - origin) ** 2).sum(axis=1) > limit**2).any())
+
+
+class CollisionPairs:
+    """
+    A class to store the objects each disc can collide with, for one
+    configuration of the collision flags of the discs.
+
+    `discs` lists, in resolution order, a tuple per disc that can collide with
+    anything: its index, the indices of the discs after it, then the planes,
+    segments and vertices it collides with.
+
+    `partner_arrays` holds the same partners as arrays for the disc broadphase,
+    and `scalar_cache` the static objects compiled by the scalar backend.
+    The segments and vertices can be narrowed down to the ones near a disc with
+    the static grid of the stadium, in the same order, see iter_static.
+
+    The pairs are shared by the copies of the stadium, so they only keep its
+    static objects and never the stadium, its discs or its world.
+    """
+
+    def __init__(
+        self,
+        stadium: Stadium,
+        collision_group: np.ndarray,
+        collision_mask: np.ndarray,
+        movable: np.ndarray,
+    ):
+        disc_pairs = np.triu(
+            collision_matrix(
+                collision_group, collision_mask, collision_group, collision_mask
+            ),
+            k=1,
+        )
+        static_pairs = []
+        for objects in (stadium.planes, stadium.segments, stadium.vertices):
+            groups, masks = static_flags(objects)
+            static_pairs.append(
+                collision_matrix(collision_group, collision_mask, groups, masks)
+                & movable[:, np.newaxis]
+            )
+        plane_pairs, segment_pairs, vertex_pairs = static_pairs
+        self.static_grid = stadium.static_grid
+        self.segment_pairs = segment_pairs
+        self.vertex_pairs = vertex_pairs
+        self.nearby_cache: dict[tuple[int, int], tuple[list[int], list[int]]] = {}
+        # Indices in the stadium of the segments and vertices of each disc
+        self.segment_indices: dict[int, np.ndarray] = {}
+        self.vertex_indices: dict[int, np.ndarray] = {}
+        self.partner_arrays: dict[int, np.ndarray] = {}
+        self.scalar_cache: dict[int, tuple] = {}
+
+        self.discs: list[
+            tuple[int, list[int], list[Plane], list[Segment], list[Vertex]]
+        ] = []
+        for i in range(len(collision_group)):
+            partners = np.flatnonzero(disc_pairs[i]).tolist()
+            planes = [stadium.planes[k] for k in np.flatnonzero(plane_pairs[i])]
+            segment_indices = np.flatnonzero(segment_pairs[i])
+            vertex_indices = np.flatnonzero(vertex_pairs[i])
+            segments = [stadium.segments[k] for k in segment_indices]
+            vertices = [stadium.vertices[k] for k in vertex_indices]
+            if partners or planes or segments or vertices:
+                self.discs.append((i, partners, planes, segments, vertices))
+                self.partner_arrays[i] = np.array(partners, dtype=int)
+                self.segment_indices[i] = segment_indices
+                self.vertex_indices[i] = vertex_indices
+
+    def iter_nearby_static(
+        self,
+        index: int,
+        position: Sequence[float],
+        radius: float,
+        segments: Sequence[Any],
+        vertices: Sequence[Any],
+    ) -> Iterator[tuple[bool, Any]]:
+        """
+        Iterates over the segments and vertices of the disc `index` with
+        iter_static, narrowed down to the cell of the static grid containing
+        its position when it fits in the grid. The disc must be at the position
+        it is resolved from, after the planes. segments and vertices may be
+        compiled versions of the ones of the disc, in the same order.
+        """
+        grid = self.static_grid
+        nearby = moved = None
+        if (segments or vertices) and radius <= grid.max_radius:
+            x, y = float(position[0]), float(position[1])
+            cell = grid.get_cell(x, y)
+            if cell >= 0:
+                nearby = self.get_nearby_static(index, cell)
+                moved = partial(has_moved, position, x, y, grid.margin - radius)
+        return iter_static(segments, vertices, nearby, moved)
+
+    def iter_nearby_static_batch(
+        self,
+        index: int,
+        position: np.ndarray,
+        radius: np.ndarray,
+        segments: Sequence[Any],
+        vertices: Sequence[Any],
+    ) -> Iterator[tuple[bool, Any]]:
+        """
+        Like iter_nearby_static for the (K, 2) positions of the disc `index` in
+        K stadiums, narrowed down to the objects near it in any of them
+        """
+        grid = self.static_grid
+        nearby = moved = None
+        if (segments or vertices) and (radius <= grid.max_radius).all():
+            cells = grid.get_cells(position)
+            if (cells >= 0).all():
+                nearby = self.get_nearby_static_batch(index, cells)
+                limit = grid.margin - radius
+                moved = partial(has_moved_batch, position, position.copy(), limit)
+        return iter_static(segments, vertices, nearby, moved)
+
+    def get_nearby_static(self, index: int, cell: int) -> tuple[list[int], list[int]]:
+        """
+        Returns the indices, in the segments and vertices of the disc `index`,
+        of the ones it can touch from a cell of the static grid
+        """
+        key = (index, cell)
+        nearby = self.nearby_cache.get(key)
+        if nearby is None:
+            nearby = self.get_nearby_static_batch(index, np.array([cell]))
+            self.nearby_cache[key] = nearby
+        return nearby
+
+    def get_nearby_static_batch(
+        self, index: int, cells: np.ndarray
+    ) -> tuple[list[int], list[int]]:
+        """
+        Returns the indices, in the segments and vertices of the disc `index`,
+        of the ones it can touch from any of the cells of the static grid. The
+        cells must be inside the grid.
+        """
+        grid = self.static_grid
+        segment_cells = grid.segment_cells[cells][:, self.segment_indices[index]]
+        vertex_cells = grid.vertex_cells[cells][:, self.vertex_indices[index]]
+        return (
+            np.flatnonzero(segment_cells.any(0)).tolist(),
+            np.flatnonzero(vertex_cells.any(0)).tolist(),
+        )
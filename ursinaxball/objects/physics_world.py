@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ursinaxball.objects.base import Disc
+
+# Name, trailing shape and dtype of every array of a physics world
+WORLD_ARRAYS: tuple[tuple[str, tuple[int, ...], type], ...] = (
+    ("position", (2,), float),
+    ("velocity", (2,), float),
+    ("gravity", (2,), float),
+    ("radius", (), float),
+    ("inverse_mass", (), float),
+    ("damping", (), float),
+    ("bouncing_coefficient", (), float),
+    ("collision_group", (), np.int64),
+    ("collision_mask", (), np.int64),
+    # Damping applied during the current tick, kicking players use their own
+    ("step_damping", (), float),
+)
+# Arrays holding the state of a world between two ticks, saved by snapshots
+STATE_ARRAYS: tuple[str, ...] = tuple(
+    name for name, _, _ in WORLD_ARRAYS if name != "step_damping"
+)
+
+
+class PhysicsWorld:
+    """
+    A class to store the dynamic state of every disc of a stadium.
+
+    The state is kept as a structure of arrays: one contiguous (N, 2) array per
+    vector property and one (N,) array per scalar property, the row i holding
+    the values of the disc i. Once bound, the discs become thin views into
+    these arrays, so integration can run as a handful of array operations.
+
+    A world can also be a slot of a BatchPhysicsWorld, in which case its arrays
+    are views into the (K, N, ...) arrays of the batch.
+    """
+
+    def __init__(
+        self,
+        discs: list[Disc],
+        batch: BatchPhysicsWorld | None = None,
+        batch_index: int = 0,
+    ):
+        self.size = len(discs)
+
+        for name, shape, dtype in WORLD_ARRAYS:
+            if batch is None:
+                array = np.zeros((self.size, *shape), dtype=dtype)
+            else:
+                array = getattr(batch, name)[batch_index]
+            setattr(self, name, array)
+
+        for index, disc in enumerate(discs):
+            disc.bind(self, index)
+
+    @property
+    def state_size(self) -> int:
+        """
+        Number of values of the state of the world, see save_state
+        """
+        return sum(getattr(self, name).size for name in STATE_ARRAYS)
+
+    def save_state(self, out: np.ndarray) -> None:
+        """
+        Writes the state arrays of the world one after the other into the flat
+        float array `out`, of size at least state_size
+        """
+        offset = 0
+        for name in STATE_ARRAYS:
+            array = getattr(self, name)
+            out[offset : offset + array.size] = array.ravel()
+            offset += array.size
+
+    def load_state(self, state: np.ndarray) -> None:
+        """
+        Overwrites the state arrays of the world with the values of save_state
+        """
+        offset = 0
+        for name in STATE_ARRAYS:
+            array = getattr(self, name)
+            array[...] = state[offset : offset + array.size].reshape(array.shape)
+            offset += array.size
+
+
+class BatchPhysicsWorld:
+    """
+    A class to store the dynamic state of K stadiums sharing the same layout.
+
+    Every array has shape (K, N, ...), where N is the number of discs per
+    stadium, so a physics step can run once across the whole batch.
+    """
+
+    def __init__(self, num_worlds: int, size: int):
+        self.num_worlds = num_worlds
+        self.size = size
+
+        for name, shape, dtype in WORLD_ARRAYS:
+            setattr(self, name, np.zeros((num_worlds, size, *shape), dtype=dtype))
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import importlib.resources as pkg_resources
 import json
+import logging
+import os
+import pickle
 from pathlib import Path
 
+import numpy as np
+
 from ursinaxball import stadiums
-from ursinaxball.common_values import BaseMap
+from ursinaxball.common_values import BaseMap, TeamID
 from ursinaxball.objects.base import (
     Background,
     BallPhysics,
@@ -17,13 +24,48 @@ from ursinaxball.objects.base import (
     Trait,
     Vertex,
 )
+from ursinaxball.objects.collision_pairs import CollisionPairs
+from ursinaxball.objects.physics_world import BatchPhysicsWorld, PhysicsWorld
+from ursinaxball.objects.static_grid import StaticGrid
+
+log = logging.getLogger(__name__)
+
+# Number of collision flag configurations kept by a stadium
+COLLISION_PAIRS_CACHE_SIZE = 32
+# Version of the compiled stadiums pickled on disk, to bump whenever the
+# attributes of the stadium objects change so stale files are never loaded
+STADIUM_CACHE_VERSION = 2
+# Environment variable holding the folder of the compiled stadiums on disk
+STADIUM_CACHE_DIR_ENV = "URSINAXBALL_STADIUM_CACHE"
 
 
 class Stadium:
     """
     A class to represent the state of a stadium from the game.
+
+    The static geometry never changes once the stadium is built, so it is
+    shared by every copy of the stadium: a deep copy only duplicates the discs,
+    their physics world and the small per-stadium lists. The compiled collision
+    pairs only depend on the geometry and on the flags, their cache is shared
+    as well.
     """
 
+    # Attributes referenced by every copy of the stadium instead of being copied
+    SHARED_ATTRIBUTES = frozenset(
+        (
+            "traits",
+            "background",
+            "vertices",
+            "segments",
+            "goals",
+            "goal_points",
+            "goal_teams",
+            "planes",
+            "static_grid",
+            "collision_pairs_cache",
+        )
+    )
+
     def __init__(self, data: dict):
         self.name: str = data.get("name")
         self.spawn_distance: float = data.get("spawnDistance")
@@ -46,6 +88,14 @@ class Stadium:
         self.vertices: list[Vertex] = [Vertex(v, data) for v in data.get("vertexes")]
         self.segments: list[Segment] = [Segment(s, data) for s in data.get("segments")]
         self.goals: list[Goal] = [Goal(g, data) for g in data.get("goals")]
+        # Goal lines packed as arrays for the goal detection
+        self.goal_points: np.ndarray = np.array(
+            [goal.points for goal in self.goals], dtype=float
+        ).reshape(-1, 2, 2)
+        self.goal_teams: np.ndarray = np.array(
+            [TeamID.RED if goal.team == "red" else TeamID.BLUE for goal in self.goals],
+            dtype=int,
+        )
         self.discs: list[Disc] = [Disc(d, data) for d in data.get("discs")]
         self.planes: list[Plane] = [Plane(p, data) for p in data.get("planes")]
 
@@ -55,9 +105,51 @@ class Stadium:
         self.ball_physics: BallPhysics = BallPhysics(data.get("ballPhysics"), data)
 
         self.discs.insert(0, self.ball_physics)
+        self.static_grid: StaticGrid = StaticGrid(self)
+        self.world: PhysicsWorld | None = None
+        self.collision_pairs_cache: dict[bytes, CollisionPairs] = {}
 
         self.get_y_symmetry()
 
+    def __deepcopy__(self, memo: dict) -> Stadium:
+        stadium = copy.copy(self)
+        memo[id(self)] = stadium
+        for name, value in vars(self).items():
+            if name not in self.SHARED_ATTRIBUTES:
+                setattr(stadium, name, copy.deepcopy(value, memo))
+        return stadium
+
+    def build_world(
+        self, batch: BatchPhysicsWorld | None = None, batch_index: int = 0
+    ) -> PhysicsWorld:
+        """
+        Packs the state of the current discs into a new physics world, stored in
+        the slot `batch_index` of `batch` if given.
+        Must be called again every time a disc is added or removed.
+        """
+        self.world = PhysicsWorld(self.discs, batch, batch_index)
+        return self.world
+
+    def get_collision_pairs(
+        self,
+        collision_group: np.ndarray,
+        collision_mask: np.ndarray,
+        movable: np.ndarray,
+    ) -> CollisionPairs:
+        """
+        Returns the collidable pairs for the given flags of the discs.
+        The pairs are only compiled again when one of the flags changes, the
+        kickoff and playing configurations are kept in the cache.
+        """
+        key = collision_group.tobytes() + collision_mask.tobytes() + movable.tobytes()
+        pairs = self.collision_pairs_cache.get(key)
+        if pairs is None:
+            if len(self.collision_pairs_cache) >= COLLISION_PAIRS_CACHE_SIZE:
+                self.collision_pairs_cache.clear()
+            pairs = CollisionPairs(self, collision_group, collision_mask, movable)
+            self.collision_pairs_cache[key] = pairs
+        return pairs
+
     def get_y_symmetry(self):
         for point in self.red_spawn_points:
             point[1] *= -1
@@ -65,30 +157,143 @@ class Stadium:
             point[1] *= -1
 
 
-def load_stadium_hbs_str(file_name: str):
-    with Path(file_name).open("r") as f:
-        data = json.load(f)
-    return Stadium(data)
+def set_read_only(value: object, seen: set[int] | None = None) -> None:
+    """
+    Makes every NumPy array reachable from value through the containers and the
+    objects of ursinaxball read-only. Their copies are writeable again.
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            set_read_only(item, seen)
+    elif isinstance(value, dict):
+        for item in value.values():
+            set_read_only(item, seen)
+    elif type(value).__module__.startswith("ursinaxball."):
+        names = list(getattr(value, "__dict__", ()))
+        for cls in type(value).__mro__:
+            slots = getattr(cls, "__slots__", ())
+            names.extend([slots] if isinstance(slots, str) else slots)
+        for name in names:
+            set_read_only(getattr(value, name, None), seen)
 
 
-def load_stadium_hbs_base(file_name: BaseMap):
-    stadium_file = file_name.value
-    with pkg_resources.open_text(stadiums, stadium_file) as f:
-        data = json.load(f)
-    return Stadium(data)
+class StadiumCache:
+    """
+    A process-wide cache of compiled stadiums.
 
+    A file is looked up by its path, modification time and size, then by the
+    hash of its content, so an edited file is compiled again. When `cache_dir`
+    is set, the compiled stadiums are also pickled there and other processes
+    load them without parsing the file.
 
-def load_stadium_hbs(file_name: BaseMap | str):
+    The cached stadiums are shared, their arrays are read-only.
     """
-    Load a stadium from a file with extension hbs.
+
+    def __init__(self, cache_dir: str | Path | None = None):
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+        self.digests: dict[tuple[str, int, int], str] = {}
+        self.stadiums: dict[str, Stadium] = {}
+
+    def load(self, file_name: BaseMap | str) -> Stadium:
+        file_key = self.get_file_key(file_name)
+        digest = self.digests.get(file_key)
+        if digest is None:
+            content = self.read(file_name)
+            digest = hashlib.sha256(content).hexdigest()
+            if digest not in self.stadiums:
+                stadium = self.load_file(digest)
+                if stadium is None:
+                    stadium = Stadium(json.loads(content))
+                    self.save_file(digest, stadium)
+                set_read_only(stadium)
+                self.stadiums[digest] = stadium
+            self.digests[file_key] = digest
+        return self.stadiums[digest]
+
+    def clear(self) -> None:
+        self.digests.clear()
+        self.stadiums.clear()
+
+    @staticmethod
+    def get_file_key(file_name: BaseMap | str) -> tuple[str, int, int]:
+        if isinstance(file_name, BaseMap):
+            # The stadiums of the package do not change while it is imported
+            return (f"{stadiums.__name__}/{file_name.value}", 0, 0)
+        path = Path(file_name).resolve()
+        stat = path.stat()
+        return (path.as_posix(), stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def read(file_name: BaseMap | str) -> bytes:
+        if isinstance(file_name, BaseMap):
+            return pkg_resources.files(stadiums).joinpath(file_name.value).read_bytes()
+        return Path(file_name).read_bytes()
+
+    def get_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}-v{STADIUM_CACHE_VERSION}.pickle"
+
+    def load_file(self, digest: str) -> Stadium | None:
+        if self.cache_dir is None:
+            return None
+        path = self.get_path(digest)
+        try:
+            with path.open("rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (
+            OSError,
+            pickle.UnpicklingError,
+            EOFError,
+            AttributeError,
+            ImportError,
+            TypeError,
+        ) as e:
+            log.warning(f"Could not load the compiled stadium {path}: {e}")
+            return None
+
+    def save_file(self, digest: str, stadium: Stadium) -> None:
+        if self.cache_dir is None:
+            return
+        path = self.get_path(digest)
+        # Written under a unique name then renamed, so concurrent processes
+        # never read a partial file
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with temp_path.open("wb") as f:
+                pickle.dump(stadium, f, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_path.replace(path)
+        except OSError as e:
+            log.warning(f"Could not save the compiled stadium {path}: {e}")
+
+
+STADIUM_CACHE = StadiumCache(os.environ.get(STADIUM_CACHE_DIR_ENV))
+
+
+def load_stadium_compiled(file_name: BaseMap | str) -> Stadium:
+    """
+    Load a stadium from a file with extension hbs, through the stadium cache.
+    The returned stadium is shared, its arrays are read-only.
     """
     if not file_name.endswith(".hbs"):
         raise ValueError("File name must end with .hbs")
 
-    if isinstance(file_name, BaseMap):
-        return load_stadium_hbs_base(file_name)
-    else:
-        return load_stadium_hbs_str(file_name)
+    return STADIUM_CACHE.load(file_name)
+
+
+def load_stadium_hbs(file_name: BaseMap | str):
+    """
+    Load a stadium from a file with extension hbs.
+    """
+    return copy.deepcopy(load_stadium_compiled(file_name))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ursinaxball.objects.stadium_object import Stadium
+
+# Bounds of the size of a cell of the grid, in game units
+MIN_CELL_SIZE = 32
+MAX_CELLS = 4096
+
+
+class StaticGrid:
+    """
+    A class to represent a uniform grid over the static geometry of a stadium.
+
+    Every cell stores which segments and vertices a disc centered in it can
+    touch. The bounding box of each object is inflated by the largest disc
+    radius of the stadium plus a margin for the displacement of the disc while
+    its collisions are resolved, and by the bias of the segments. Arcs use the
+    bounding box of their whole circle. A disc centered outside of the grid
+    cannot touch any segment or vertex when it is looked up, and the objects
+    of a cell stay the only ones it can touch while it moves less than
+    `margin` minus its radius from there.
+    """
+
+    def __init__(self, stadium: Stadium):
+        self.max_radius = max(
+            [disc.radius for disc in stadium.discs] + [stadium.player_physics.radius]
+        )
+        self.margin = margin = 2 * self.max_radius
+
+        segment_boxes = np.array(
+            [
+                self.get_segment_box(segment, margin + abs(segment.bias))
+                for segment in stadium.segments
+            ],
+            dtype=float,
+        ).reshape(-1, 4)
+        vertex_boxes = np.array(
+            [
+                np.concatenate((vertex.position - margin, vertex.position + margin))
+                for vertex in stadium.vertices
+            ],
+            dtype=float,
+        ).reshape(-1, 4)
+        boxes = np.concatenate((segment_boxes, vertex_boxes))
+        if len(boxes) == 0:
+            boxes = np.zeros((1, 4))
+
+        self.x_min, self.y_min = boxes[:, :2].min(axis=0).tolist()
+        x_max, y_max = boxes[:, 2:].max(axis=0).tolist()
+        width = max(x_max - self.x_min, 1)
+        height = max(y_max - self.y_min, 1)
+        self.cell_size = max(MIN_CELL_SIZE, math.sqrt(width * height / MAX_CELLS))
+        self.num_x = math.ceil(width / self.cell_size)
+        self.num_y = math.ceil(height / self.cell_size)
+
+        self.segment_cells = self.fill_cells(segment_boxes)
+        self.vertex_cells = self.fill_cells(vertex_boxes)
+
+    @staticmethod
+    def get_segment_box(segment, margin: float) -> np.ndarray:
+        """
+        Returns the (x_min, y_min, x_max, y_max) box of a segment, inflated by margin
+        """
+        if segment.curve != 0:
+            center = segment.circle_center
+            extent = segment.circle_radius + margin
+            return np.concatenate((center - extent, center + extent))
+
+        points = np.array([vertex.position for vertex in segment.vertices])
+        return np.concatenate(
+            (points.min(axis=0) - margin, points.max(axis=0) + margin)
+        )
+
+    def fill_cells(self, boxes: np.ndarray) -> np.ndarray:
+        """
+        Returns the (cells, objects) matrix of the cells overlapped by each box
+        """
+        cells = np.zeros((self.num_x * self.num_y, len(boxes)), dtype=bool)
+        low = np.floor((boxes[:, :2] - (self.x_min, self.y_min)) / self.cell_size)
+        high = np.floor((boxes[:, 2:] - (self.x_min, self.y_min)) / self.cell_size)
+        low = np.clip(low, 0, (self.num_x - 1, self.num_y - 1)).astype(int)
+        high = np.clip(high, 0, (self.num_x - 1, self.num_y - 1)).astype(int)
+        for k, ((x_0, y_0), (x_1, y_1)) in enumerate(zip(low, high)):
+            cells_x = np.arange(x_0, x_1 + 1)
+            cells_y = np.arange(y_0, y_1 + 1)
+            cells[(cells_x[:, np.newaxis] * self.num_y + cells_y).ravel(), k] = True
+        return cells
+
+    def get_cell(self, x: float, y: float) -> int:
+        """
+        Returns the index of the cell containing the point, -1 if outside the grid
+        """
+        cell_x = (x - self.x_min) / self.cell_size
+        cell_y = (y - self.y_min) / self.cell_size
+        if not (0 <= cell_x < self.num_x and 0 <= cell_y < self.num_y):
+            return -1
+        return int(cell_x) * self.num_y + int(cell_y)
+
+    def get_cells(self, points: np.ndarray) -> np.ndarray:
+        """
+        Returns the index of the cell containing each of the (K, 2) points,
+        -1 for the points outside the grid
+        """
+        cells = (points - (self.x_min, self.y_min)) / self.cell_size
+        inside = (cells >= 0).all(axis=1) & (cells < (self.num_x, self.num_y)).all(
+            axis=1
+        )
+        cells = np.where(inside[:, np.newaxis], cells, 0).astype(int)
+        return np.where(inside, cells[:, 0] * self.num_y + cells[:, 1], -1)
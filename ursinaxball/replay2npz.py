@@ -0,0 +1,286 @@
+"""
+Converts a directory of action recordings (.hbar) into NumPy datasets.
+
+Every replay is re-simulated headlessly by a ReplayRunner in a process pool.
+The observations of the players (see ObservationBuilder) are sampled before
+the actions of every `--every` ticks, next to those actions and the outcome of
+the game. The samples are written as one .npz file per replay, or with
+`--dataset` as one directory of .npy arrays that np.load can memory-map, the
+samples of the game i being the rows game_offsets[i]:game_offsets[i + 1].
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import logging
+import multiprocessing as mp
+import shutil
+import time
+import traceback
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from ursinaxball.common_values import BaseMap, PhysicsBackend
+from ursinaxball.modules import ObservationBuilder
+from ursinaxball.modules.systems.game_config import GameConfig
+from ursinaxball.replay_runner import ReplayRunner
+
+log = logging.getLogger(__name__)
+
+# Arrays of the consolidated dataset, with one row per sample
+SAMPLE_ARRAYS = ("observations", "actions", "ticks")
+# Arrays of the consolidated dataset, with one row per game
+GAME_ARRAYS = ("scores", "winners", "teams")
+
+
+@dataclass
+class ReplayResult:
+    file_name: str
+    output_file: str = ""
+    num_ticks: int = 0
+    num_samples: int = 0
+    error: str | None = None
+
+
+def get_stadium_file(stadium: str) -> BaseMap | str:
+    """
+    Returns the BaseMap of a name such as "classic" or "classic.hbs", or the
+    path of any other stadium file
+    """
+    for base_map in BaseMap:
+        if stadium in (base_map.name.lower(), base_map.value):
+            return base_map
+    return stadium
+
+
+def convert_replay(
+    file_name: str,
+    output_dir: str,
+    config: GameConfig,
+    time_limit: int | None,
+    score_limit: int | None,
+    every: int,
+) -> ReplayResult:
+    """
+    Re-simulates one replay and saves its samples as output_dir/<name>.npz
+    """
+    result = ReplayResult(file_name)
+    game = None
+    try:
+        runner = ReplayRunner(file_name, config, time_limit, score_limit)
+        ticks = np.arange(0, runner.num_ticks, every)
+        game = runner.make_game()
+        builder = ObservationBuilder(game)
+        observations = np.zeros((len(ticks), *builder.new_buffer().shape), np.float32)
+
+        row = 0
+        for tick, actions in enumerate(runner.actions):
+            # Observations are taken before the actions of their tick
+            if row < len(ticks) and tick == ticks[row]:
+                builder.build(observations[row])
+                row += 1
+            game.step(actions)
+
+        output_file = Path(output_dir) / f"{Path(file_name).stem}.npz"
+        np.savez(
+            output_file,
+            observations=observations,
+            actions=runner.actions[ticks],
+            ticks=ticks.astype(np.int32),
+            scores=np.array([game.score.red, game.score.blue], dtype=np.int16),
+            winners=np.array(game.score.get_winner(), dtype=np.int8),
+            teams=np.array([player.team for player in game.players], dtype=np.int8),
+        )
+        result.output_file = str(output_file)
+        result.num_ticks = runner.num_ticks
+        result.num_samples = len(ticks)
+    except Exception:
+        result.error = traceback.format_exc()
+    finally:
+        if game is not None:
+            game.stop(save_recording=False)
+    return result
+
+
+def get_row_shapes(file_name: str) -> dict[str, tuple[tuple[int, ...], np.dtype]]:
+    """
+    Returns the shape and dtype of a row of every array of a replay in the
+    dataset: a sample for SAMPLE_ARRAYS, the game for GAME_ARRAYS
+    """
+    with np.load(file_name) as replay:
+        shapes = {name: replay[name].shape[1:] for name in SAMPLE_ARRAYS}
+        shapes.update({name: replay[name].shape for name in GAME_ARRAYS})
+        return {name: (shape, replay[name].dtype) for name, shape in shapes.items()}
+
+
+def consolidate(
+    results: Sequence[ReplayResult], output_dir: Path
+) -> list[ReplayResult]:
+    """
+    Concatenates the .npz files of the replays into the .npy arrays of the
+    dataset, in the order of the results.
+
+    The layout of the dataset is the most common shape and dtype of the rows
+    of the replays, the first replay breaking ties. The replays with another
+    layout, such as replays with other players, are left out with an error.
+
+    Returns:
+        list[ReplayResult]: The results of the replays in the dataset
+    """
+    row_shapes = [get_row_shapes(result.output_file) for result in results]
+    layouts = Counter(tuple(shapes.items()) for shapes in row_shapes)
+    reference = dict(layouts.most_common(1)[0][0])
+    included = []
+    for result, shapes in zip(results, row_shapes):
+        if shapes == reference:
+            included.append(result)
+            continue
+        rejected = ", ".join(
+            f"{name} {shape} {dtype} instead of {reference[name][0]} "
+            f"{reference[name][1]}"
+            for name, (shape, dtype) in shapes.items()
+            if (shape, dtype) != reference[name]
+        )
+        result.error = (
+            f"{result.file_name} has rows of {rejected}, "
+            "it cannot join the other replays of the dataset"
+        )
+        log.error(result.error)
+    results = included
+    shapes = {name: shape for name, (shape, _) in reference.items()}
+    dtypes = {name: dtype for name, (_, dtype) in reference.items()}
+    num_samples = sum(result.num_samples for result in results)
+
+    arrays = {
+        name: open_memmap(
+            output_dir / f"{name}.npy",
+            mode="w+",
+            dtype=dtypes[name],
+            shape=(num_samples, *shapes[name]),
+        )
+        for name in SAMPLE_ARRAYS
+    }
+    arrays.update(
+        {
+            name: open_memmap(
+                output_dir / f"{name}.npy",
+                mode="w+",
+                dtype=dtypes[name],
+                shape=(len(results), *shapes[name]),
+            )
+            for name in GAME_ARRAYS
+        }
+    )
+    offsets = np.zeros(len(results) + 1, dtype=np.int64)
+    for i, result in enumerate(results):
+        offsets[i + 1] = offsets[i] + result.num_samples
+        with np.load(result.output_file) as replay:
+            for name in SAMPLE_ARRAYS:
+                arrays[name][offsets[i] : offsets[i + 1]] = replay[name]
+            for name in GAME_ARRAYS:
+                arrays[name][i] = replay[name]
+    for array in arrays.values():
+        array.flush()
+
+    np.save(output_dir / "game_offsets.npy", offsets)
+    (output_dir / "files.txt").write_text(
+        "".join(f"{Path(result.file_name).name}\n" for result in results)
+    )
+    return results
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="ursinaxball-replay2npz",
+        description="Re-simulates .hbar replays into NumPy archives.",
+    )
+    parser.add_argument("input_dir", help="Directory of the .hbar replays")
+    parser.add_argument("output_dir", help="Directory of the NumPy archives")
+    parser.add_argument(
+        "--dataset",
+        action="store_true",
+        help="Write one memory-mappable dataset instead of one .npz per replay",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processes, one per CPU by default"
+    )
+    parser.add_argument("--every", type=int, default=1, help="Ticks between samples")
+    parser.add_argument(
+        "--stadium",
+        default=BaseMap.CLASSIC.value,
+        help="Stadium of the recorded games, a base map name or a .hbs file",
+    )
+    parser.add_argument("--time-limit", type=int, default=None)
+    parser.add_argument("--score-limit", type=int, default=None)
+    parser.add_argument(
+        "--physics-backend",
+        choices=[backend.value for backend in PhysicsBackend],
+        default=PhysicsBackend.NUMPY.value,
+        help="Backend of the recorded games, the backends differ by rounding",
+    )
+    args = parser.parse_args(argv)
+    if args.every < 1:
+        parser.error("--every must be at least 1")
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    files = sorted(str(path) for path in Path(args.input_dir).glob("*.hbar"))
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # In dataset mode, the .npz files of the replays are only temporary
+    replay_dir = output_dir / ".replays" if args.dataset else output_dir
+    replay_dir.mkdir(exist_ok=True)
+
+    config = GameConfig(
+        stadium_file=get_stadium_file(args.stadium),
+        enable_renderer=False,
+        enable_recorder=False,
+        logging_level=logging.WARNING,
+        physics_backend=PhysicsBackend(args.physics_backend),
+    )
+    convert = functools.partial(
+        convert_replay,
+        output_dir=str(replay_dir),
+        config=config,
+        time_limit=args.time_limit,
+        score_limit=args.score_limit,
+        every=args.every,
+    )
+
+    start = time.perf_counter()
+    try:
+        results = []
+        with mp.Pool(args.workers) as pool:
+            for result in pool.imap(convert, files):
+                if result.error is not None:
+                    log.error(f"Failed to convert {result.file_name}:\n{result.error}")
+                results.append(result)
+        converted = [result for result in results if result.error is None]
+        if args.dataset and converted:
+            converted = consolidate(converted, output_dir)
+    finally:
+        if args.dataset:
+            shutil.rmtree(replay_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start
+
+    num_ticks = sum(result.num_ticks for result in converted)
+    num_samples = sum(result.num_samples for result in converted)
+    print(
+        f"Converted {len(converted)}/{len(files)} replays in {elapsed:.1f}s: "
+        f"{num_ticks} ticks, {num_samples} samples, "
+        f"{len(converted) / elapsed:.2f} replays/s, {num_ticks / elapsed:.0f} "
+        f"ticks/s ({num_ticks / 60 / elapsed:.0f}x real time)"
+    )
+    return 0 if len(converted) == len(files) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ursinaxball.common_values import TeamID
+from ursinaxball.game import Game
+from ursinaxball.modules import GameActionRecorder, GameScore, PlayerHandler
+from ursinaxball.modules.systems.game_config import GameConfig
+from ursinaxball.modules.systems.game_recorder import input_translate_py
+
+
+class ReplayRunner:
+    """
+    Re-simulates an action recording (.hbar) headlessly.
+
+    The players are rebuilt from the player_info of the recording and the
+    packed inputs of every tick are decoded at once into a (T, P, 3) array.
+    Recordings do not store the stadium nor the limits of the game, they must
+    be the ones of the recorded game for the replay to follow it.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        config: GameConfig | None = None,
+        time_limit: int | None = None,
+        score_limit: int | None = None,
+        **kwargs,
+    ):
+        if config is None:
+            config = GameConfig(**kwargs)
+
+        self.config = dataclasses.replace(
+            config, enable_renderer=False, enable_recorder=False
+        )
+        self.time_limit = time_limit
+        self.score_limit = score_limit
+
+        recording = GameActionRecorder(None)
+        recording.read_from_file(file_name)
+        self.file_name = file_name
+        self.options: int = recording.options[0]
+        self.player_info: list = recording.player_info
+        self.actions: NDArray[np.int8] = input_translate_py(recording.inputs)
+
+    @property
+    def num_ticks(self) -> int:
+        return len(self.actions)
+
+    def make_game(self) -> Game:
+        """
+        Returns a started game with the players of the recording
+        """
+        game = Game(self.config)
+        game.score = GameScore(time_limit=self.time_limit, score_limit=self.score_limit)
+        game.add_players(
+            [PlayerHandler(name, team) for name, _, team in self.player_info]
+        )
+        game.start()
+        game.team_kickoff = TeamID(self.options // 8)
+        return game
+
+    def get_ticks(self, ticks: Iterable[int] | None = None) -> NDArray[np.intp]:
+        """
+        Returns the sorted indices of the requested ticks, every tick if None
+        """
+        if ticks is None:
+            return np.arange(self.num_ticks)
+        ticks = np.unique(np.fromiter(ticks, dtype=np.intp))
+        if ticks.size > 0 and (ticks[0] < 0 or ticks[-1] >= self.num_ticks):
+            raise ValueError(f"Ticks must be in [0, {self.num_ticks})")
+        return ticks
+
+    def run(self, ticks: Iterable[int] | None = None) -> Iterator[tuple[int, Game]]:
+        """
+        Replays the recording in a new game.
+
+        Args:
+            ticks: Indices of the ticks to yield, every tick if None. The
+                replay stops after the last one.
+
+        Yields:
+            tuple[int, Game]: The index of the tick and the game right after
+                the actions of that tick, in the order of the ticks. The game
+                is updated in place, take a snapshot or build an observation
+                to keep its state.
+        """
+        ticks = self.get_ticks(ticks)
+        if ticks.size == 0:
+            return
+        selected = np.zeros(ticks[-1] + 1, dtype=bool)
+        selected[ticks] = True
+
+        game = self.make_game()
+        try:
+            for tick, (actions, is_selected) in enumerate(
+                zip(self.actions, selected.tolist())
+            ):
+                game.step(actions)
+                if is_selected:
+                    yield tick, game
+        finally:
+            game.stop(save_recording=False)
+
+    def run_snapshots(self, ticks: Iterable[int] | None = None) -> NDArray[np.float64]:
+        """
+        Replays the recording and returns the snapshots of the game after the
+        requested ticks, see run and Game.snapshot
+
+        Returns:
+            NDArray[np.float64]: Array of shape (N, snapshot_size), in the
+                order of the ticks
+        """
+        ticks = self.get_ticks(ticks)
+        snapshots = np.empty((len(ticks), 0))
+        for row, (_, game) in enumerate(self.run(ticks)):
+            if row == 0:
+                snapshots = np.empty((len(ticks), game.snapshot_size))
+            game.snapshot(snapshots[row])
+        return snapshots
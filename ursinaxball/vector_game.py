@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ursinaxball.common_values import ActionBin, CollisionFlag, GameState, TeamID
+from ursinaxball.game import Game
+from ursinaxball.modules import GameScore, PlayerHandler
+from ursinaxball.modules.physics import GoalDetector
+from ursinaxball.modules.physics.batch_handler import (
+    resolve_collisions_batch,
+    update_discs_batch,
+)
+from ursinaxball.modules.physics.fn_batch import norm
+from ursinaxball.modules.systems.game_config import GameConfig
+from ursinaxball.objects import BatchPhysicsWorld
+
+log = logging.getLogger(__name__)
+
+
+class VectorGame:
+    """
+    K independent games on the same stadium, stepped in lockstep.
+
+    Each game is a regular headless Game, but the discs of all the games are
+    stored in one BatchPhysicsWorld of shape (K, N, ...). Player movement,
+    integration, collisions and goal detection run once across the batch.
+    Games that are done are reset in place at the end of the step.
+    """
+
+    def __init__(
+        self,
+        num_games: int,
+        config: GameConfig | None = None,
+        time_limit: int | None = None,
+        score_limit: int | None = None,
+        **kwargs,
+    ):
+        if config is None:
+            config = GameConfig(**kwargs)
+
+        self.config = dataclasses.replace(
+            config, enable_renderer=False, enable_recorder=False
+        )
+        self.num_games = num_games
+        self.games = [Game(self.config) for _ in range(num_games)]
+        for game in self.games:
+            game.score = GameScore(time_limit=time_limit, score_limit=score_limit)
+
+        self.world: BatchPhysicsWorld | None = None
+        # Winner of the last finished game of every slot, SPECTATOR if none
+        self.winners: NDArray[np.int_] = np.zeros(num_games, dtype=int)
+        self.kicking = np.zeros((num_games, 0), dtype=bool)
+        self.kick_cancel = np.zeros((num_games, 0), dtype=bool)
+
+    @property
+    def num_players(self) -> int:
+        return len(self.games[0].players)
+
+    def add_player(self, name: str, team: int) -> None:
+        """
+        Adds a player with the same name and team to every game
+        """
+        for game in self.games:
+            game.add_player(PlayerHandler(name, team))
+
+    def start(self) -> None:
+        for game in self.games:
+            game.start()
+        self._build_world()
+
+    def step(
+        self, actions: NDArray[np.int_], autoreset: bool = True
+    ) -> NDArray[np.bool_]:
+        """
+        Steps every game by one tick.
+
+        Args:
+            actions: Array of shape (K, P, 3) with the action of every player
+            autoreset: Whether to reset the games that are done. Otherwise they
+                are left in their final state until reset_game is called.
+
+        Returns:
+            NDArray[np.bool_]: Array of shape (K,), True where the game is done.
+                With autoreset, those games are already reset when the step
+                returns.
+        """
+        actions = np.asarray(actions)
+        expected_shape = (self.num_games, self.num_players, 3)
+        if actions.shape != expected_shape:
+            raise ValueError(
+                f"Actions must have shape {expected_shape}, got {actions.shape}"
+            )
+
+        self._resolve_movement(actions)
+        previous_positions = self.world.position[:, self.score_indices]
+        self._update_discs()
+        resolve_collisions_batch(
+            self.world,
+            self.games[0].stadium_game,
+            self.config.enable_disc_broadphase,
+        )
+        team_goals = self.goal_detector.check_batch(
+            previous_positions, self.world.position[:, self.score_indices]
+        )
+
+        dones = np.zeros(self.num_games, dtype=bool)
+        for k, game in enumerate(self.games):
+            team_goal = (
+                team_goals[k] if game.state == GameState.PLAYING else TeamID.SPECTATOR
+            )
+            dones[k] = game.update_game_state(team_goal)
+
+        if autoreset:
+            for k in np.flatnonzero(dones):
+                self.reset_game(k)
+
+        return dones
+
+    def reset_game(self, k: int) -> None:
+        """
+        Saves the winner of the game k into winners and resets it
+        """
+        self.winners[k] = self.games[k].score.get_winner()
+        self._reset_world(k)
+
+    def reset(self) -> None:
+        """
+        Resets every game
+        """
+        for k in range(self.num_games):
+            self._reset_world(k)
+        self.winners.fill(TeamID.SPECTATOR)
+
+    def stop(self) -> None:
+        for game in self.games:
+            game.stop(save_recording=False)
+        self.world = None
+
+    def _build_world(self) -> None:
+        """
+        Moves the discs of every game into one batch world
+        """
+        stadium = self.games[0].stadium_game
+        self.world = BatchPhysicsWorld(self.num_games, len(stadium.discs))
+        for k, game in enumerate(self.games):
+            game.stadium_game.build_world(self.world, k)
+
+        players = self.games[0].players
+        self.player_indices = np.array([p.disc.index for p in players], dtype=int)
+        self.player_physics = [p.disc for p in players]
+        self.kicking_damping = np.array([p.disc.kicking_damping for p in players])
+        self.score_indices = np.flatnonzero(
+            self.world.collision_group[0] & CollisionFlag.SCORE
+        )
+        self.kick_indices = np.flatnonzero(
+            np.bitwise_or.reduce(self.world.collision_group, axis=0)
+            & CollisionFlag.KICK
+        )
+
+        self.goal_detector = GoalDetector(stadium)
+
+        self.kicking = np.array(
+            [[p.kicking for p in game.players] for game in self.games], dtype=bool
+        ).reshape(self.num_games, -1)
+        self.kick_cancel = np.array(
+            [[p._kick_cancel for p in game.players] for game in self.games],  # noqa: SLF001
+            dtype=bool,
+        ).reshape(self.num_games, -1)
+
+    def _reset_world(self, k: int) -> None:
+        game = self.games[k]
+        game.reset(save_recording=False)
+        game.stadium_game.build_world(self.world, k)
+
+    def _resolve_movement(self, actions: NDArray[np.int_]) -> None:
+        """
+        Batched version of PlayerHandler.resolve_movement, players are resolved
+        in the same order, each one across every game at once
+        """
+        world = self.world
+        kick_action = actions[:, :, ActionBin.KICK]
+        self.kicking = kick_action == 1
+        self.kick_cancel &= kick_action != 0
+
+        for p, player_index in enumerate(self.player_indices):
+            physics = self.player_physics[p]
+            position_player = world.position[:, player_index]
+            velocity_player = world.velocity[:, player_index]
+            radius_player = world.radius[:, player_index]
+            is_kicking = self.kicking[:, p] & ~self.kick_cancel[:, p]
+            has_kicked = np.zeros(self.num_games, dtype=bool)
+
+            for disc_index in self.kick_indices:
+                if disc_index == player_index:
+                    continue
+                kickable = (
+                    world.collision_group[:, disc_index] & CollisionFlag.KICK
+                ) != 0
+                difference = world.position[:, disc_index] - position_player
+                dist = norm(difference)
+                touch = kickable & (
+                    dist - radius_player - world.radius[:, disc_index] < 4
+                )
+                if not touch.any():
+                    continue
+
+                kick = np.flatnonzero(touch & is_kicking)
+                if len(kick) > 0:
+                    normal = difference[kick] / dist[kick, np.newaxis]
+                    world.velocity[kick, disc_index] += normal * physics.kick_strength
+                    velocity_player[kick] += (
+                        normal
+                        * -physics.kickback
+                        * world.inverse_mass[kick, player_index, np.newaxis]
+                    )
+                    has_kicked[kick] = True
+
+                for k in np.flatnonzero(touch):
+                    game = self.games[k]
+                    game.players[p].player_data.update_touch(
+                        game.stadium_game, game.score
+                    )
+
+            self.kick_cancel[:, p] |= has_kicked
+            is_kicking = self.kicking[:, p] & ~self.kick_cancel[:, p]
+
+            input_vector = actions[:, p, :2].astype(float)
+            input_norm = norm(input_vector)[:, np.newaxis]
+            input_direction = np.divide(
+                input_vector,
+                input_norm,
+                out=np.zeros_like(input_vector),
+                where=input_norm > 0,
+            )
+            player_acceleration = np.where(
+                is_kicking, physics.kicking_acceleration, physics.acceleration
+            )
+            velocity_player += input_direction * player_acceleration[:, np.newaxis]
+
+        for game, kicking, kick_cancel in zip(
+            self.games, self.kicking.tolist(), self.kick_cancel.tolist()
+        ):
+            for player, player_kicking, player_kick_cancel in zip(
+                game.players, kicking, kick_cancel
+            ):
+                player.kicking = player_kicking
+                player._kick_cancel = player_kick_cancel  # noqa: SLF001
+
+    def _update_discs(self) -> None:
+        world = self.world
+        np.copyto(world.step_damping, world.damping)
+        is_kicking = self.kicking & ~self.kick_cancel
+        world.step_damping[:, self.player_indices] = np.where(
+            is_kicking,
+            self.kicking_damping,
+            world.damping[:, self.player_indices],
+        )
+        update_discs_batch(world)